@@ -44,6 +44,11 @@ class User(AbstractUser):
     
 
     objects = UserManager()
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='user_keyset_idx'),
+        ]
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []  # Remove username requirement since we use email
@@ -10,6 +10,7 @@ from datetime import timedelta
 import random
 import string
 
+from hamro_engineering.pagination import KeysetOrPageNumberPagination
 from .models import User, OTP, LoginAttempt
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, OTPVerificationSerializer,
@@ -260,6 +261,7 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetOrPageNumberPagination
 
 
 class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
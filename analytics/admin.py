@@ -1,5 +1,22 @@
 from django.contrib import admin
 
-# Note: Analytics app primarily provides views and calculations
-# If you have specific analytics models, register them here
-# For now, this file ensures the app is properly recognized by Django admin
+from .models import LeaderboardEntry, UserDailyStats
+
+
+@admin.register(UserDailyStats)
+class UserDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'tests_taken', 'average_score', 'accuracy', 'minutes_studied', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['user', 'date', 'tests_taken', 'score_sum', 'best_score', 'correct_count', 'attempted_count', 'minutes_studied', 'accuracy_sum', 'updated_at']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'timeframe', 'average_score', 'best_score', 'total_tests', 'total_time', 'updated_at']
+    list_filter = ['timeframe']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['timeframe', 'user', 'total_tests', 'score_sum', 'average_score', 'best_score', 'total_time', 'updated_at']
+    ordering = ['timeframe', '-average_score', '-total_tests']
@@ -0,0 +1,227 @@
+"""
+Per-student analytics computed with grouped queries.
+
+Overall totals and daily progress read the UserDailyStats rollup (a range
+scan of the user's rows) and the subject breakdown is a single ``GROUP BY``
+query over answer rows, plus the packed sheets of attempts whose rows were
+dropped (``KEEP_QUESTION_ATTEMPT_ROWS = False``), so the cost no longer grows with the number of subjects or days in
+the chart; a subject's topic breakdown is likewise one grouped query. The
+payloads are cached per user (and per subject) under a versioned namespace
+that is bumped whenever one of the user's attempts completes or is regraded.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from questions.answer_sheets import unpack
+from questions.caching import bump_version, versioned_key
+from questions.models import MockTestAttempt, Question, QuestionAttempt
+
+from .rollups import daily_series, user_totals
+
+STUDENT_ANALYTICS_TIMEOUT = 60 * 60  # 1 hour
+PROGRESS_DAYS = 30
+MAX_PROGRESS_DAYS = 365
+RECENT_ACTIVITY_LIMIT = 5
+
+
+def _namespace(user_id):
+    return f'student_analytics:{user_id}'
+
+
+def invalidate_student_analytics(user_id):
+    bump_version(_namespace(user_id))
+
+
+def overview(user):
+    totals = user_totals(user)
+    return {
+        'total_tests_taken': totals['tests_taken'],
+        'average_score': float(totals['average_score']),
+        'average_accuracy': float(totals['average_accuracy']),
+        'total_study_time_minutes': totals['minutes_studied'],
+    }
+
+
+def _packed_only_totals(user, group_fields, **question_filter):
+    """
+    ``{group: [answers, correct, timed answers, total seconds]}`` over the
+    user's completed attempts whose answers survive only as a packed sheet,
+    grouped by ``group_fields`` of the answered questions.
+    """
+    sheets = MockTestAttempt.objects.filter(
+        user=user, status='completed', answer_sheet__isnull=False,
+    ).exclude(
+        Exists(QuestionAttempt.objects.filter(test_attempt=OuterRef('pk')))
+    ).order_by().values_list('answer_sheet', flat=True)
+
+    per_question = defaultdict(lambda: [0, 0, 0, 0])
+    for sheet in sheets.iterator(chunk_size=100):
+        for answer in unpack(sheet):
+            totals = per_question[answer.question_id]
+            totals[0] += 1
+            if answer.is_correct:
+                totals[1] += 1
+            if answer.time_taken_seconds is not None:
+                totals[2] += 1
+                totals[3] += answer.time_taken_seconds
+
+    groups = defaultdict(lambda: [0, 0, 0, 0])
+    if per_question:
+        for question_id, *group in Question.objects.filter(
+            pk__in=list(per_question), **question_filter
+        ).values_list('id', *group_fields):
+            totals = groups[tuple(group)]
+            for index, value in enumerate(per_question[question_id]):
+                totals[index] += value
+    return groups
+
+
+def subject_performance(user):
+    totals = _packed_only_totals(user, ['topic__subject', 'topic__subject__name'])
+    rows = QuestionAttempt.objects.filter(test_attempt__user=user).values(
+        'question__topic__subject', 'question__topic__subject__name',
+    ).annotate(
+        total_questions=Count('id'),
+        correct_answers=Count('id', filter=Q(is_correct=True)),
+    ).order_by()
+    for row in rows:
+        subject_totals = totals[(row['question__topic__subject'], row['question__topic__subject__name'])]
+        subject_totals[0] += row['total_questions']
+        subject_totals[1] += row['correct_answers']
+
+    return [
+        {
+            'subject': name,
+            'total_questions': total_questions,
+            'correct_answers': correct_answers,
+            'accuracy': round(correct_answers / total_questions * 100, 2),
+        }
+        for (subject_id, name), (total_questions, correct_answers, _, _) in sorted(
+            totals.items(), key=lambda item: (item[0][1], item[0][0])
+        )
+    ]
+
+
+def subject_breakdown(user, subject):
+    """
+    A user's answers in one subject, per topic, from a single grouped query
+    plus the packed-only sheets. Returns None when the user has not answered any question of the subject.
+    """
+    totals = _packed_only_totals(
+        user, ['topic', 'topic__name', 'topic__difficulty_level'], topic__subject=subject,
+    )
+    rows = QuestionAttempt.objects.filter(
+        test_attempt__user=user, question__topic__subject=subject,
+    ).values(
+        'question__topic', 'question__topic__name', 'question__topic__difficulty_level',
+    ).annotate(
+        total_questions=Count('id'),
+        correct_answers=Count('id', filter=Q(is_correct=True)),
+        timed_answers=Count('time_taken_seconds'),
+        total_time=Sum('time_taken_seconds'),
+    ).order_by()
+    for row in rows:
+        topic_totals = totals[(
+            row['question__topic'], row['question__topic__name'], row['question__topic__difficulty_level'],
+        )]
+        topic_totals[0] += row['total_questions']
+        topic_totals[1] += row['correct_answers']
+        topic_totals[2] += row['timed_answers']
+        topic_totals[3] += row['total_time'] or 0
+
+    topics = []
+    total_questions = correct_answers = timed_answers = total_time = 0
+    for (topic_id, name, difficulty), (topic_questions, topic_correct, topic_timed, topic_time) in sorted(
+        totals.items(), key=lambda item: (item[0][1], item[0][0])
+    ):
+        topics.append({
+            'topic_name': name,
+            'total_questions': topic_questions,
+            'correct_answers': topic_correct,
+            'accuracy': round(topic_correct / topic_questions * 100, 2),
+            'average_time_seconds': round(topic_time / topic_timed, 2) if topic_timed else 0,
+            'difficulty': difficulty,
+        })
+        total_questions += topic_questions
+        correct_answers += topic_correct
+        timed_answers += topic_timed
+        total_time += topic_time
+    if not total_questions:
+        return None
+
+    return {
+        'subject': subject.name,
+        'overview': {
+            'total_questions': total_questions,
+            'correct_answers': correct_answers,
+            'accuracy': round(correct_answers / total_questions * 100, 2),
+            'average_time_per_question_seconds': round(total_time / timed_answers, 2) if timed_answers else 0,
+        },
+        'topic_breakdown': topics,
+    }
+
+
+def recent_activity(completed):
+    attempts = completed.select_related('mock_test').order_by('-completed_at')[:RECENT_ACTIVITY_LIMIT]
+    return [
+        {
+            'test_name': attempt.mock_test.name,
+            'score': float(attempt.score),
+            'accuracy': float(attempt.accuracy_percentage),
+            'completed_at': attempt.completed_at,
+        }
+        for attempt in attempts
+    ]
+
+
+def daily_progress(user, days=PROGRESS_DAYS):
+    """One point per local day for the last ``days`` days, today included."""
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    by_day = daily_series(user, first_day, today)
+
+    progress = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        row = by_day.get(day)
+        progress.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'score': float(row.average_score) if row else 0.0,
+            'tests_taken': row.tests_taken if row else 0,
+        })
+    return progress
+
+
+def compute_student_analytics(user, days=PROGRESS_DAYS):
+    completed = MockTestAttempt.objects.filter(user=user, status='completed')
+    return {
+        'overview': overview(user),
+        'subject_performance': subject_performance(user),
+        'recent_activity': recent_activity(completed),
+        'daily_progress': daily_progress(user, days),
+    }
+
+
+def get_student_analytics(user, days=PROGRESS_DAYS):
+    days = max(1, min(days, MAX_PROGRESS_DAYS))
+    # Daily progress depends on the current date, so it is part of the key.
+    cache_key = versioned_key(_namespace(user.id), 'payload', timezone.localdate().isoformat(), days)
+    data = cache.get(cache_key)
+    if data is None:
+        data = compute_student_analytics(user, days)
+        cache.set(cache_key, data, STUDENT_ANALYTICS_TIMEOUT)
+    return data
+
+
+def get_subject_analytics(user, subject):
+    cache_key = versioned_key(_namespace(user.id), 'subject', subject.id)
+    data = cache.get(cache_key)
+    if data is None:
+        # Cache "no data" as an empty dict so it is not recomputed on every request either.
+        data = subject_breakdown(user, subject) or {}
+        cache.set(cache_key, data, STUDENT_ANALYTICS_TIMEOUT)
+    return data or None
@@ -0,0 +1,177 @@
+"""
+Incrementally maintained leaderboards.
+
+LeaderboardEntry holds each user's standing per timeframe: all time, and
+rolling windows of the last 7 and 30 local days. A graded attempt is added to
+all three of the user's entries with one upsert, and a nightly job rolls the
+windows over by rebuilding them from the UserDailyStats rollup, which drops
+the day that left each window. A rebuild locks the entries it replaces before
+reading the rollup, so attempts graded while it runs are not lost.
+
+Standings are ordered by average score, then tests taken, then user id, and
+``leaderboard_rank_idx`` covers exactly that order. Top-N is a bounded index
+scan and neighbours are two bounded scans either side of the user's entry. A
+rank is read from the Redis sorted sets of ``rank_index`` in O(log n) when
+the cache Redis is configured and in step with the entry, and is otherwise an
+index-only count of the entries ahead, which grows with the rank. None of
+them touch raw attempts.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Q, Sum
+from django.utils import timezone
+
+from questions.stats import upsert_increments
+
+from . import rank_index
+from .models import LeaderboardEntry, UserDailyStats
+from .rollups import local_day
+
+TIMEFRAMES = ('all', 'week', 'month')
+WINDOW_DAYS = {'week': 7, 'month': 30}
+
+Standing = namedtuple('Standing', ['rank', 'entry'])
+
+
+def window_start(timeframe, today=None):
+    """First day counted by ``timeframe``, or None for all time."""
+    if timeframe not in WINDOW_DAYS:
+        return None
+    today = today or timezone.localdate()
+    return today - timedelta(days=WINDOW_DAYS[timeframe] - 1)
+
+
+def record_attempt(attempt, result):
+    """Add a freshly graded attempt to the user's entry in every timeframe."""
+    score = float(result.score)
+    minutes = attempt.time_taken_minutes or 0
+    timeframes = [
+        timeframe for timeframe in TIMEFRAMES
+        if timeframe not in WINDOW_DAYS or local_day(attempt.completed_at) >= window_start(timeframe)
+    ]
+    # average_score only gets a zero delta here; it is derived from the new totals below.
+    upsert_increments(
+        LeaderboardEntry, ('timeframe', 'user_id'), ['total_tests', 'score_sum', 'total_time', 'average_score'],
+        [(timeframe, attempt.user_id, 1, score, minutes, 0, score) for timeframe in timeframes],
+        maximum_columns=['best_score'],
+    )
+    entries = LeaderboardEntry.objects.filter(user_id=attempt.user_id, timeframe__in=timeframes)
+    entries.update(average_score=F('score_sum') / F('total_tests'))
+    _sync_rank_index(entries)
+
+
+def rebuild_leaderboard(timeframe, user_ids=None, today=None):
+    """
+    Recompute the entries of ``timeframe`` (for ``user_ids`` only, when
+    given) from the daily rollup. Returns the number of entries written.
+    """
+    rows = UserDailyStats.objects.filter(tests_taken__gt=0)
+    entries = LeaderboardEntry.objects.filter(timeframe=timeframe)
+    start = window_start(timeframe, today)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+
+    standings = rows.values('user_id').annotate(
+        total_tests=Sum('tests_taken'),
+        score_sum=Sum('score_sum'),
+        best_score=Max('best_score'),
+        total_time=Sum('minutes_studied'),
+    ).order_by()
+
+    with transaction.atomic():
+        # Lock the entries before reading the rollup: a grader that already
+        # added to an entry is waited for, so its attempt is in the read, and
+        # one that has not yet done so blocks until the new entries exist and
+        # then adds onto them.
+        list(entries.select_for_update().values_list('pk', flat=True))
+        standings = [
+            (timeframe, row['user_id'], row['total_tests'], row['score_sum'], row['total_time'], 0, row['best_score'])
+            for row in standings
+        ]
+        entries.delete()
+        # Upserted rather than bulk-created so that an entry inserted by a
+        # user's first attempt in the meantime is added onto, not a conflict.
+        upsert_increments(
+            LeaderboardEntry, ('timeframe', 'user_id'), ['total_tests', 'score_sum', 'total_time', 'average_score'],
+            standings, maximum_columns=['best_score'],
+        )
+        entries.update(average_score=F('score_sum') / F('total_tests'))
+        if user_ids is None:
+            transaction.on_commit(lambda: rank_index.replace(
+                timeframe, entries.values_list('user_id', 'average_score', 'total_tests').iterator(chunk_size=2000),
+            ))
+        else:
+            _sync_rank_index(entries, removed=[
+                (timeframe, user_id) for user_id in set(user_ids) - {row[1] for row in standings}
+            ])
+    return len(standings)
+
+
+def _sync_rank_index(entries, removed=()):
+    """Index ``entries`` as they stand now once the current transaction commits."""
+    if rank_index.client() is None:
+        return
+    rows = list(entries.values_list('timeframe', 'user_id', 'average_score', 'total_tests'))
+    transaction.on_commit(lambda: rank_index.sync(rows, removed))
+
+
+def roll_over(today=None):
+    """Rebuild the rolling windows so that days which left them stop counting."""
+    return {timeframe: rebuild_leaderboard(timeframe, today=today) for timeframe in WINDOW_DAYS}
+
+
+def refresh_users(user_ids):
+    """Recompute a few users' entries in every timeframe, e.g. after their attempts were regraded."""
+    for timeframe in TIMEFRAMES:
+        rebuild_leaderboard(timeframe, user_ids=user_ids)
+
+
+def _standings(timeframe):
+    return LeaderboardEntry.objects.filter(timeframe=timeframe).select_related('user')
+
+
+def _ahead_of(entry):
+    return (
+        Q(average_score__gt=entry.average_score)
+        | Q(average_score=entry.average_score, total_tests__gt=entry.total_tests)
+        | Q(average_score=entry.average_score, total_tests=entry.total_tests, user_id__lt=entry.user_id)
+    )
+
+
+def top(timeframe, limit):
+    entries = _standings(timeframe).order_by('-average_score', '-total_tests', 'user_id')[:limit]
+    return [Standing(rank, entry) for rank, entry in enumerate(entries, start=1)]
+
+
+def rank_of(entry):
+    rank = rank_index.rank(entry)
+    if rank is not None:
+        return rank
+    return LeaderboardEntry.objects.filter(_ahead_of(entry), timeframe=entry.timeframe).count() + 1
+
+
+def standing(timeframe, user):
+    entry = _standings(timeframe).filter(user=user).first()
+    if entry is None:
+        return None
+    return Standing(rank_of(entry), entry)
+
+
+def neighbours(standing, window):
+    """Up to ``window`` standings either side of ``standing``, in rank order, itself included."""
+    entry = standing.entry
+    standings = _standings(entry.timeframe)
+    above = list(standings.filter(_ahead_of(entry)).order_by('average_score', 'total_tests', '-user_id')[:window])
+    below = list(standings.exclude(_ahead_of(entry)).exclude(pk=entry.pk).order_by(
+        '-average_score', '-total_tests', 'user_id'
+    )[:window])
+    return (
+        [Standing(standing.rank - offset, other) for offset, other in reversed(list(enumerate(above, start=1)))]
+        + [standing]
+        + [Standing(standing.rank + offset, other) for offset, other in enumerate(below, start=1)]
+    )
@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from analytics.rollups import rebuild_daily_stats
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}, expected YYYY-MM-DD.')
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user daily stats rollup from completed attempts, optionally for a date range or some users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date, help='First day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', type=_date, help='Last day to rebuild (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Only rebuild this user id.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end.')
+        count = rebuild_daily_stats(start=start, end=end, user_ids=options['user_ids'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Daily stats rebuilt: {count} user-days.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from analytics.leaderboards import TIMEFRAMES, rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recompute leaderboard standings from the daily stats rollup (run rebuild_daily_stats first if it is stale).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeframe', choices=TIMEFRAMES, action='append', dest='timeframes')
+
+    def handle(self, *args, **options):
+        for timeframe in options['timeframes'] or TIMEFRAMES:
+            count = rebuild_leaderboard(timeframe)
+            self.stdout.write(self.style.SUCCESS(f'{timeframe}: {count} entries.'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('tests_taken', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('correct_count', models.IntegerField(default=0)),
+                ('attempted_count', models.IntegerField(default=0)),
+                ('minutes_studied', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user daily stats',
+                'ordering': ['user', 'date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userdailystats',
+            name='best_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timeframe', models.CharField(choices=[('all', 'All Time'), ('week', 'Last 7 Days'), ('month', 'Last 30 Days')], max_length=10)),
+                ('total_tests', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('average_score', models.FloatField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('total_time', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'leaderboard entries',
+                'indexes': [models.Index(fields=['timeframe', '-average_score', '-total_tests', 'user'], name='leaderboard_rank_idx')],
+                'unique_together': {('timeframe', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userdailystats',
+            name='accuracy_sum',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import models
+
+
+class UserDailyStats(models.Model):
+    """Per-user, per-day rollup of completed attempts, keyed on the local date of completion."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    tests_taken = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    correct_count = models.IntegerField(default=0)
+    attempted_count = models.IntegerField(default=0)
+    minutes_studied = models.IntegerField(default=0)
+    accuracy_sum = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'date']
+        ordering = ['user', 'date']
+        verbose_name_plural = 'user daily stats'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+    
+    @property
+    def average_score(self):
+        return round(self.score_sum / self.tests_taken, 2) if self.tests_taken else 0
+    
+    @property
+    def accuracy(self):
+        return round(self.correct_count / self.attempted_count * 100, 2) if self.attempted_count else 0
+
+
+class LeaderboardEntry(models.Model):
+    """A user's standing in one leaderboard timeframe, kept current as attempts complete."""
+    TIMEFRAME_CHOICES = [
+        ('all', 'All Time'),
+        ('week', 'Last 7 Days'),
+        ('month', 'Last 30 Days'),
+    ]
+    
+    timeframe = models.CharField(max_length=10, choices=TIMEFRAME_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    total_tests = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    average_score = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    total_time = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['timeframe', 'user']
+        indexes = [
+            # Standings order; top-N, rank counts and neighbour windows are range scans on it.
+            models.Index(fields=['timeframe', '-average_score', '-total_tests', 'user'], name='leaderboard_rank_idx'),
+        ]
+        verbose_name_plural = 'leaderboard entries'
+    
+    def __str__(self):
+        return f"{self.timeframe} - {self.user.username}"
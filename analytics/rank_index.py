@@ -0,0 +1,133 @@
+"""
+Leaderboard ranks from Redis sorted sets.
+
+Each timeframe has a sorted set on the cache Redis (``REDIS_CACHE_URL``) whose
+score is the entry's average score and whose member encodes total tests and
+user id at fixed width, so ZREVRANK orders members exactly like
+``leaderboard_rank_idx`` (average score, then tests taken, both descending,
+then user id ascending) and answers a rank in O(log n). A hash maps each user
+to their current member so an update can drop the old one.
+
+The sets are an index over LeaderboardEntry, not a source of truth: entries
+are synced after the transaction that changed them commits, and the nightly
+rebuild replaces a whole set. ``rank`` only answers when the user's member
+and score match the entry it is given; otherwise (no Redis configured, Redis
+unreachable, or the user's index entry is behind) it returns None and the
+caller counts the entries ahead in the database.
+"""
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+USER_ID_LIMIT = 2 ** 63 - 1  # BigAutoField
+
+# KEYS: sorted set, member hash; ARGV: user id, score, member ('' removes the user).
+_UPDATE_SCRIPT = """
+local old = redis.call('HGET', KEYS[2], ARGV[1])
+if old then redis.call('ZREM', KEYS[1], old) end
+if ARGV[3] == '' then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+else
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+    redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+end
+"""
+_CHUNK_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def _client(url):
+    return redis.Redis.from_url(url)
+
+
+def client():
+    url = getattr(settings, 'REDIS_CACHE_URL', None)
+    return _client(url) if url else None
+
+
+def _keys(timeframe):
+    return f'analytics:rank:{timeframe}', f'analytics:rank:{timeframe}:members'
+
+
+def member(user_id, total_tests):
+    # Equal scores are ranked by reverse lexicographic member: more tests, then the lower user id, first.
+    return f'{total_tests:010d}:{USER_ID_LIMIT - user_id:019d}'
+
+
+def sync(entries, removed=()):
+    """
+    Index ``(timeframe, user_id, average_score, total_tests)`` entries and
+    drop the ``(timeframe, user_id)`` pairs in ``removed``.
+    """
+    redis_client = client()
+    if redis_client is None:
+        return
+    update = redis_client.register_script(_UPDATE_SCRIPT)
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        for timeframe, user_id, average_score, total_tests in entries:
+            update(keys=_keys(timeframe), args=[user_id, average_score, member(user_id, total_tests)], client=pipeline)
+        for timeframe, user_id in removed:
+            update(keys=_keys(timeframe), args=[user_id, 0, ''], client=pipeline)
+        pipeline.execute()
+    except redis.RedisError:
+        pass  # ranks fall back to the database until the next sync or rebuild
+
+
+def replace(timeframe, entries):
+    """Rebuild the whole set of ``timeframe`` from ``(user_id, average_score, total_tests)`` entries."""
+    redis_client = client()
+    if redis_client is None:
+        return
+    ranks, members = _keys(timeframe)
+    building = [f'{ranks}:building', f'{members}:building']
+    try:
+        redis_client.delete(*building)
+        pipeline = redis_client.pipeline(transaction=False)
+        chunk = []
+        indexed = 0
+        for user_id, average_score, total_tests in entries:
+            chunk.append((user_id, average_score, member(user_id, total_tests)))
+            indexed += 1
+            if len(chunk) >= _CHUNK_SIZE:
+                _add(pipeline, building, chunk)
+                pipeline.execute()
+                chunk = []
+        _add(pipeline, building, chunk)
+        pipeline.execute()
+
+        # Swap the new set in atomically; an empty timeframe just clears the old one.
+        pipeline = redis_client.pipeline()
+        pipeline.delete(ranks, members)
+        if indexed:
+            pipeline.rename(building[0], ranks)
+            pipeline.rename(building[1], members)
+        pipeline.execute()
+    except redis.RedisError:
+        pass
+
+
+def _add(pipeline, keys, chunk):
+    if chunk:
+        pipeline.zadd(keys[0], {code: score for _, score, code in chunk})
+        pipeline.hset(keys[1], mapping={user_id: code for user_id, _, code in chunk})
+
+
+def rank(entry):
+    """The 1-based rank of ``entry``, or None when the index cannot vouch for it."""
+    redis_client = client()
+    if redis_client is None:
+        return None
+    ranks, _ = _keys(entry.timeframe)
+    code = member(entry.user_id, entry.total_tests)
+    try:
+        pipeline = redis_client.pipeline(transaction=False)
+        pipeline.zrevrank(ranks, code)
+        pipeline.zscore(ranks, code)
+        position, score = pipeline.execute()
+    except redis.RedisError:
+        return None
+    if position is None or score != entry.average_score:
+        return None
+    return position + 1
@@ -0,0 +1,170 @@
+"""
+The per-user daily performance rollup.
+
+UserDailyStats holds one row per user per local day with the totals of the
+attempts completed that day. Grading adds each attempt with a single
+``INSERT ... ON CONFLICT DO UPDATE``, so readers (progress charts, the
+dashboard, achievement checks) scan a short range of the ``(user, date)``
+unique index instead of aggregating raw attempts. ``rebuild_daily_stats``
+recomputes any date range from the attempts themselves; it locks the rows it
+replaces before reading the attempts, so grading that races with it is
+either included in the read or added onto the rebuilt rows afterwards.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from questions.answer_sheets import unpack
+from questions.models import MockTestAttempt, QuestionAttempt
+from questions.stats import upsert_increments
+
+from .models import UserDailyStats
+
+ROLLUP_COLUMNS = ['tests_taken', 'score_sum', 'correct_count', 'attempted_count', 'minutes_studied', 'accuracy_sum']
+
+
+def local_day(moment):
+    return timezone.localtime(moment).date()
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def record_attempt(attempt, result):
+    """Fold a freshly graded attempt into its user's row for the day."""
+    upsert_increments(UserDailyStats, ('user_id', 'date'), ROLLUP_COLUMNS, [(
+        attempt.user_id, local_day(attempt.completed_at),
+        1, float(result.score), result.correct_answers, result.answered, attempt.time_taken_minutes or 0,
+        float(result.accuracy), float(result.score),
+    )], maximum_columns=['best_score'])
+
+
+def _answer_counts(attempt_ids):
+    """``{attempt_id: (correct, attempted)}`` from answer rows, for attempts without a packed sheet."""
+    rows = QuestionAttempt.objects.filter(test_attempt_id__in=attempt_ids).values('test_attempt_id').annotate(
+        correct=Count('id', filter=Q(is_correct=True)),
+        attempted=Count('selected_option'),
+    ).order_by()
+    return {row['test_attempt_id']: (row['correct'], row['attempted']) for row in rows}
+
+
+def rebuild_daily_stats(start=None, end=None, user_ids=None, batch_size=1000):
+    """
+    Recompute the rollup rows dated ``start`` to ``end`` (inclusive, either
+    open-ended when None) for ``user_ids`` (all users when None). Returns
+    the number of rows written.
+    """
+    attempts = MockTestAttempt.objects.filter(status='completed', completed_at__isnull=False)
+    rows = UserDailyStats.objects.all()
+    if start is not None:
+        attempts = attempts.filter(completed_at__gte=day_start(start))
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        attempts = attempts.filter(completed_at__lt=day_start(end + timedelta(days=1)))
+        rows = rows.filter(date__lte=end)
+    if user_ids is not None:
+        attempts = attempts.filter(user_id__in=user_ids)
+        rows = rows.filter(user_id__in=user_ids)
+
+    totals = defaultdict(lambda: [0, 0.0, 0, 0, 0, 0.0])
+    best_scores = defaultdict(float)
+    batch = []
+
+    def fold(batch):
+        counts = _answer_counts([row[0] for row in batch if not row[5]])
+        for attempt_id, user_id, completed_at, score, minutes, accuracy, sheet in batch:
+            if sheet:
+                answers = unpack(sheet)
+                correct = sum(1 for answer in answers if answer.is_correct)
+                attempted = sum(1 for answer in answers if answer.selected_option_id is not None)
+            else:
+                correct, attempted = counts.get(attempt_id, (0, 0))
+            key = (user_id, local_day(completed_at))
+            best_scores[key] = max(best_scores[key], float(score or 0))
+            total = totals[key]
+            total[0] += 1
+            total[1] += float(score or 0)
+            total[2] += correct
+            total[3] += attempted
+            total[4] += minutes or 0
+            total[5] += float(accuracy or 0)
+
+    with transaction.atomic():
+        # Lock the rows before reading the attempts: a grader that already
+        # added to a row is waited for, so its attempt is in the read, and
+        # one that has not yet done so blocks until the rows are rebuilt and
+        # then adds onto them.
+        list(rows.select_for_update().values_list('pk', flat=True))
+        values = attempts.order_by().values_list(
+            'id', 'user_id', 'completed_at', 'score', 'time_taken_minutes', 'accuracy_percentage', 'answer_sheet',
+        ).iterator(chunk_size=batch_size)
+        for row in values:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                fold(batch)
+                batch = []
+        fold(batch)
+
+        rows.delete()
+        # Upserted rather than bulk-created so that a row inserted by a
+        # user's first attempt of the day in the meantime is added onto.
+        upsert_increments(UserDailyStats, ('user_id', 'date'), ROLLUP_COLUMNS, [
+            (user_id, day, *total, best_scores[(user_id, day)])
+            for (user_id, day), total in totals.items()
+        ], maximum_columns=['best_score'])
+    return len(totals)
+
+
+def refresh_attempts(attempt_ids):
+    """Recompute the rows that the given completed attempts fall on, e.g. after a regrade."""
+    users_by_day = defaultdict(set)
+    for user_id, completed_at in MockTestAttempt.objects.filter(
+        pk__in=attempt_ids, status='completed', completed_at__isnull=False
+    ).values_list('user_id', 'completed_at'):
+        users_by_day[local_day(completed_at)].add(user_id)
+    for day, user_ids in users_by_day.items():
+        rebuild_daily_stats(start=day, end=day, user_ids=user_ids)
+
+
+def user_totals(user, start=None):
+    """Totals over a user's rows, optionally from ``start`` onwards."""
+    rows = UserDailyStats.objects.filter(user=user)
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    totals = rows.aggregate(**{column: Sum(column) for column in ROLLUP_COLUMNS})
+    totals = {column: totals[column] or 0 for column in ROLLUP_COLUMNS}
+    tests, attempted = totals['tests_taken'], totals['attempted_count']
+    totals['average_score'] = round(totals['score_sum'] / tests, 2) if tests else 0
+    totals['accuracy'] = round(totals['correct_count'] / attempted * 100, 2) if attempted else 0
+    totals['average_accuracy'] = round(totals['accuracy_sum'] / tests, 2) if tests else 0
+    return totals
+
+
+def daily_series(user, first_day, last_day):
+    """The user's rows from ``first_day`` to ``last_day``, keyed by date."""
+    rows = UserDailyStats.objects.filter(user=user, date__range=(first_day, last_day))
+    return {row.date: row for row in rows}
+
+
+def current_streak(user, today=None):
+    """Consecutive days with a completed test, ending today (or yesterday if today has none yet)."""
+    today = today or timezone.localdate()
+    expected = today
+    streak = 0
+    days = UserDailyStats.objects.filter(
+        user=user, date__lte=today, tests_taken__gt=0
+    ).order_by('-date').values_list('date', flat=True)
+    for day in days.iterator(chunk_size=64):
+        if day == expected:
+            streak += 1
+        elif streak == 0 and day == today - timedelta(days=1):
+            streak = 1
+            expected = day
+        else:
+            break
+        expected -= timedelta(days=1)
+    return streak
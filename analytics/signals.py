@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from notifications.achievements import check_achievements
+from questions.grading import attempt_graded
+from questions.models import MockTestAttempt
+from questions.regrade import attempts_regraded
+
+from . import leaderboards
+from .aggregates import invalidate_student_analytics
+from .rollups import record_attempt, refresh_attempts
+
+
+@receiver(attempt_graded)
+def roll_up_attempt(sender, attempt, result, **kwargs):
+    record_attempt(attempt, result)
+    leaderboards.record_attempt(attempt, result)
+    transaction.on_commit(lambda: check_achievements(attempt.user_id))
+
+
+@receiver(post_save, sender=MockTestAttempt)
+def attempt_completed(sender, instance, raw=False, **kwargs):
+    if raw or instance.status != 'completed':
+        return
+    invalidate_student_analytics(instance.user_id)
+
+
+@receiver(attempts_regraded)
+def attempts_rescored(sender, attempt_ids, user_ids, **kwargs):
+    refresh_attempts(attempt_ids)
+    leaderboards.refresh_users(user_ids)
+    for user_id in user_ids:
+        invalidate_student_analytics(user_id)
@@ -0,0 +1,117 @@
+"""
+The admin metrics snapshot.
+
+Admin metrics are full-table aggregates, so they are computed by a periodic
+job instead of per request and stored in the cache together with the time
+they were computed. Requests are served from the snapshot with a
+stale-while-revalidate policy: a snapshot younger than ``SNAPSHOT_FRESH_SECONDS``
+is returned as is; an older one is still returned, marked stale, while a
+single refresh is queued (or run inline when Celery is not in use). Only a
+cold cache otherwise computes the snapshot inside a request.
+
+The beat worker and the web processes meet through the default cache, which
+is why it must be shared between processes; ``questions.checks`` refuses to
+start with a per-process cache whenever Celery runs the refresh.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from payments.models import PaymentTransaction, UserSubscription
+from questions.caching import acquire_lock, release_lock
+from questions.models import MockTestAttempt, MockTestQuestion, Question, Subject
+
+User = get_user_model()
+
+SNAPSHOT_CACHE_KEY = 'analytics:admin_snapshot'
+SNAPSHOT_LOCK_NAME = 'analytics:admin_snapshot'
+SNAPSHOT_FRESH_SECONDS = 10 * 60  # twice the beat interval, so a healthy schedule never serves stale
+SNAPSHOT_TIMEOUT = 60 * 60 * 24  # keep serving a stale snapshot for up to a day
+SNAPSHOT_LOCK_TIMEOUT = 5 * 60
+
+
+def compute_admin_metrics():
+    """Compute the admin metrics with one aggregate query per table."""
+    now = timezone.now()
+    users = User.objects.filter(user_type='student').aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(last_login__gte=now - timedelta(days=30))),
+        recent_registrations=Count('id', filter=Q(date_joined__gte=now - timedelta(days=7))),
+    )
+    attempts = MockTestAttempt.objects.aggregate(
+        total_attempts=Count('id'),
+        completed_tests=Count('id', filter=Q(status='completed')),
+        average_score=Avg('score', filter=Q(status='completed')),
+    )
+    total_revenue = PaymentTransaction.objects.filter(status='completed').aggregate(total=Sum('amount'))['total'] or 0
+    active_subscriptions = UserSubscription.objects.filter(status='active').count()
+
+    question_counts = dict(
+        Question.objects.values_list('topic__subject').annotate(count=Count('id')).order_by()
+    )
+    test_counts = dict(
+        MockTestQuestion.objects.values_list('question__topic__subject').annotate(
+            count=Count('mock_test', distinct=True)
+        ).order_by()
+    )
+    subject_stats = [
+        {
+            'name': name,
+            'question_count': question_counts.get(subject_id, 0),
+            'test_count': test_counts.get(subject_id, 0),
+        }
+        for subject_id, name in Subject.objects.values_list('id', 'name')
+    ]
+
+    return {
+        'user_statistics': users,
+        'test_statistics': {
+            'total_attempts': attempts['total_attempts'],
+            'completed_tests': attempts['completed_tests'],
+            'average_score': float(attempts['average_score'] or 0),
+        },
+        'financial_statistics': {
+            'total_revenue': float(total_revenue),
+            'active_subscriptions': active_subscriptions,
+        },
+        'subject_statistics': subject_stats,
+    }
+
+
+def refresh_admin_snapshot(lock_token=None):
+    """Compute and cache a new snapshot, releasing the revalidation lock when given its token."""
+    snapshot = {'as_of': timezone.now(), 'metrics': compute_admin_metrics()}
+    cache.set(SNAPSHOT_CACHE_KEY, snapshot, SNAPSHOT_TIMEOUT)
+    if lock_token is not None:
+        release_lock(SNAPSHOT_LOCK_NAME, lock_token)
+    return snapshot
+
+
+def _revalidate():
+    """Refresh a stale snapshot once; returns the new snapshot when it was computed inline."""
+    # The lock is shared by all processes, so one request per stale period triggers a refresh.
+    token = acquire_lock(SNAPSHOT_LOCK_NAME, SNAPSHOT_LOCK_TIMEOUT)
+    if token is None:
+        return None
+    if getattr(settings, 'USE_CELERY_ASYNC', False):
+        from .tasks import refresh_admin_snapshot as refresh_task
+        refresh_task.delay(token)
+        return None
+    return refresh_admin_snapshot(token)
+
+
+def get_admin_snapshot():
+    """Return ``(snapshot, is_stale)``, where ``snapshot`` has ``as_of`` and ``metrics``."""
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        return refresh_admin_snapshot(), False
+    if (timezone.now() - snapshot['as_of']).total_seconds() > SNAPSHOT_FRESH_SECONDS:
+        refreshed = _revalidate()
+        if refreshed is not None:
+            return refreshed, False
+        return snapshot, True
+    return snapshot, False
@@ -0,0 +1,18 @@
+from celery import shared_task
+
+from . import snapshots
+from .leaderboards import roll_over
+
+
+@shared_task
+def roll_over_leaderboards():
+    """Drop days that left the weekly and monthly leaderboard windows"""
+    counts = roll_over()
+    return ", ".join(f"{timeframe}: {count} entries" for timeframe, count in counts.items())
+
+
+@shared_task(ignore_result=True)
+def refresh_admin_snapshot(lock_token=None):
+    """Recompute the cached admin metrics snapshot"""
+    snapshot = snapshots.refresh_admin_snapshot(lock_token)
+    return f"Admin snapshot as of {snapshot['as_of']:%Y-%m-%d %H:%M:%S}"
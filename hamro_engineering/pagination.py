@@ -0,0 +1,122 @@
+"""
+Pagination shared by the API apps.
+
+``KeysetOrPageNumberPagination`` keeps the default page-number behaviour and
+adds an opt-in keyset mode: a request that carries a ``cursor`` query
+parameter (empty for the first page) is paginated on ``(created_at, id)``
+descending. Keyset pages are a single indexed range query with no
+``COUNT(*)`` and no ``OFFSET``, so page 5,000 costs the same as page 1.
+
+That order is the only one keyset mode can page through: a request that
+also passes ``ordering`` is rejected with 400, and search results are
+filtered as usual but come newest first rather than by rank. A malformed
+cursor is a 400 as well.
+"""
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    ordering_fields = ('created_at', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+    ordering_not_allowed_message = 'ordering cannot be combined with cursor; keyset pages are newest first'
+
+    def encode_cursor(self, instance):
+        created_at, pk = (getattr(instance, field) for field in self.ordering_fields)
+        raw = f'{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+        if created_at is None:
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+        return created_at, pk
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({api_settings.ORDERING_PARAM: self.ordering_not_allowed_message})
+        created_field, id_field = self.ordering_fields
+        queryset = queryset.order_by(f'-{created_field}', f'-{id_field}')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{created_field}__lt': created_at}) |
+                Q(**{created_field: created_at, f'{id_field}__lt': pk})
+            )
+
+        page_size = self.get_page_size(request)
+        # Fetch one extra row to know whether another page exists without counting.
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class KeysetOrPageNumberPagination(BasePagination):
+    """Page-number pagination by default; keyset pagination when ``cursor`` is passed."""
+    keyset_class = KeysetPagination
+    page_number_class = PageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.paginator = self.keyset_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_class().get_paginated_response_schema(schema)
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -148,10 +149,64 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-autosaved-answers': {
+        'task': 'questions.tasks.flush_autosaved_answers',
+        'schedule': 5.0,
+    },
+    'expire-overdue-attempts': {
+        'task': 'questions.tasks.expire_overdue_attempts',
+        'schedule': 60.0,
+    },
+    'build-practice-packs': {
+        'task': 'questions.tasks.build_practice_packs',
+        'schedule': 60.0 * 60,
+    },
+    'refresh-admin-snapshot': {
+        'task': 'analytics.tasks.refresh_admin_snapshot',
+        'schedule': 60.0 * 5,
+    },
+    'roll-over-leaderboards': {
+        'task': 'analytics.tasks.roll_over_leaderboards',
+        'schedule': crontab(hour=0, minute=1),
+    },
+}
+
+# Seconds of autosaved answers that may sit in the cache before being written
+ANSWER_AUTOSAVE_FLUSH_SECONDS = 5
+
+# What happens to attempts left in progress past their test's duration: 'grade' or 'abandon'
+EXPIRED_ATTEMPT_ACTION = 'grade'
+ATTEMPT_EXPIRY_GRACE_SECONDS = 60
+
+# Graded attempts always store a packed answer sheet; set to False to drop their per-question rows
+KEEP_QUESTION_ATTEMPT_ROWS = True
 
 # Development setting - set to False to run tasks synchronously
 USE_CELERY_ASYNC = False
 
+# Cache shared by every web and Celery process: autosave buffers, cache locks and
+# the admin analytics snapshot must not live in per-process memory. Set
+# REDIS_CACHE_URL (e.g. redis://localhost:6379/1) for any multi-process setup.
+REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# A per-process cache is only safe for single-process development; the system
+# check questions.E001 fails startup otherwise
+ALLOW_PROCESS_LOCAL_CACHE = DEBUG and not USE_CELERY_ASYNC
+
 # Payment gateway settings
 KHALTI_SECRET_KEY = 'test_khalti_key_123'
 ESEWA_MERCHANT_ID = 'test_esewa_id_123'
@@ -161,6 +216,9 @@ PHONEPE_MERCHANT_ID = 'test_phonepe_id_123'
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Worker processes used to extract PDF pages during question imports
+QUESTION_IMPORT_WORKERS = 4
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,70 @@
+"""
+Achievement checks.
+
+Achievements whose progress can be read off the UserDailyStats rollup are
+checked after each graded attempt with a couple of queries: one to find the
+active achievements the user has not unlocked yet, one for the user's totals
+(and one more for the streak when a streak achievement is pending). The
+threshold comes from ``Achievement.criteria``, e.g. ``{"threshold": 10}``;
+accuracy achievements may also set ``min_questions``.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from analytics.rollups import current_streak, user_totals
+
+from .models import Achievement, Notification, UserAchievement
+
+ROLLUP_ACHIEVEMENT_TYPES = ('test_count', 'streak', 'accuracy', 'time_spent')
+
+
+def _progress(achievement_type, totals, streak):
+    if achievement_type == 'test_count':
+        return totals['tests_taken']
+    if achievement_type == 'streak':
+        return streak
+    if achievement_type == 'accuracy':
+        return totals['accuracy']
+    return totals['minutes_studied']
+
+
+def check_achievements(user_id):
+    """Unlock every rollup-based achievement the user now qualifies for; returns the unlocked ones."""
+    pending = list(Achievement.objects.filter(
+        is_active=True, achievement_type__in=ROLLUP_ACHIEVEMENT_TYPES,
+    ).exclude(
+        Exists(UserAchievement.objects.filter(user_id=user_id, achievement=OuterRef('pk')))
+    ))
+    if not pending:
+        return []
+
+    totals = user_totals(user_id)
+    streak = current_streak(user_id) if any(a.achievement_type == 'streak' for a in pending) else 0
+
+    unlocked = []
+    for achievement in pending:
+        threshold = achievement.criteria.get('threshold')
+        if threshold is None:
+            continue
+        if achievement.achievement_type == 'accuracy' and totals['attempted_count'] < achievement.criteria.get('min_questions', 0):
+            continue
+        if _progress(achievement.achievement_type, totals, streak) >= threshold:
+            unlocked.append(achievement)
+
+    if unlocked:
+        with transaction.atomic():
+            UserAchievement.objects.bulk_create(
+                [UserAchievement(user_id=user_id, achievement=achievement) for achievement in unlocked],
+                ignore_conflicts=True,
+            )
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=user_id,
+                    notification_type='achievement',
+                    title=f"Achievement unlocked: {achievement.name}",
+                    message=achievement.description,
+                    data={'achievement_id': achievement.id, 'points': achievement.points},
+                )
+                for achievement in unlocked
+            ])
+    return unlocked
@@ -46,6 +46,9 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.recipient.username} - {self.title}"
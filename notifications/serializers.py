@@ -9,7 +9,7 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = [
-            'id', 'user', 'title', 'message', 'notification_type',
+            'id', 'recipient', 'title', 'message', 'notification_type',
             'is_read', 'read_at', 'created_at'
         ]
 
@@ -14,6 +14,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
+from hamro_engineering.pagination import KeysetOrPageNumberPagination
 from .models import (
     Notification, Announcement, UserNotificationPreference, 
     Achievement, UserAchievement
@@ -28,9 +29,10 @@ from .serializers import (
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetOrPageNumberPagination
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(recipient=self.request.user).order_by('-created_at')
 
 
 class NotificationDetailView(generics.RetrieveAPIView):
@@ -38,7 +40,7 @@ class NotificationDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        return Notification.objects.filter(recipient=self.request.user)
 
 
 class MarkNotificationReadView(generics.GenericAPIView):
@@ -48,7 +50,7 @@ class MarkNotificationReadView(generics.GenericAPIView):
         notification = get_object_or_404(
             Notification, 
             pk=pk, 
-            user=request.user
+            recipient=request.user
         )
         
         notification.is_read = True
@@ -65,7 +67,7 @@ class MarkAllNotificationsReadView(generics.GenericAPIView):
     
     def post(self, request):
         Notification.objects.filter(
-            user=request.user,
+            recipient=request.user,
             is_read=False
         ).update(
             is_read=True,
@@ -99,6 +99,9 @@ class PaymentTransaction(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='payment_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.transaction_id} ({self.status})"
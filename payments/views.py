@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import timedelta
 
+from hamro_engineering.pagination import KeysetOrPageNumberPagination
 from .models import (
     SubscriptionPlan, UserSubscription, PaymentTransaction, 
     PaymentGateway, Refund
@@ -79,6 +80,7 @@ class SubscribeView(generics.GenericAPIView):
 class PaymentTransactionListView(generics.ListAPIView):
     serializer_class = PaymentTransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetOrPageNumberPagination
     
     def get_queryset(self):
         return PaymentTransaction.objects.filter(user=self.request.user)
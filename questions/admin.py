@@ -1,5 +1,8 @@
-from django.contrib import admin
-from .models import Subject, Topic, Question, QuestionOption, MockTest, MockTestQuestion, MockTestAttempt, QuestionAttempt, BookmarkedQuestion
+from django.conf import settings
+from django.contrib import admin, messages
+from .generator import BlueprintError, generate_mock_test
+from .tasks import regrade_questions_task
+from .models import Subject, Topic, Question, QuestionOption, MockTest, MockTestQuestion, MockTestAttempt, QuestionAttempt, BookmarkedQuestion, PublishedPaper, PracticePack, QuestionImportJob, QuestionFingerprint, QuestionStats, MockTestBlueprint
 
 
 @admin.register(Subject)
@@ -18,12 +21,55 @@ class TopicAdmin(admin.ModelAdmin):
     ordering = ['subject__name', 'name']
 
 
+def _regrade(model_admin, request, question_ids):
+    if getattr(settings, 'USE_CELERY_ASYNC', False):
+        regrade_questions_task.delay(question_ids)
+        model_admin.message_user(request, f"Queued a regrade of attempts that answered {len(question_ids)} questions.")
+    else:
+        model_admin.message_user(request, regrade_questions_task(question_ids))
+
+
+class PossibleDuplicateFilter(admin.SimpleListFilter):
+    title = 'possible duplicate'
+    parameter_name = 'duplicate'
+    
+    def lookups(self, request, model_admin):
+        return [('yes', 'Yes'), ('no', 'No')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.filter(fingerprint__duplicate_of__isnull=False)
+        if self.value() == 'no':
+            return queryset.exclude(fingerprint__duplicate_of__isnull=False)
+        return queryset
+
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['question_text', 'topic', 'difficulty', 'question_type', 'is_active', 'created_at']
-    list_filter = ['topic__subject', 'topic', 'difficulty', 'question_type', 'is_active', 'created_at']
+    list_filter = ['topic__subject', 'topic', 'difficulty', 'question_type', 'is_active', PossibleDuplicateFilter, 'created_at']
     search_fields = ['question_text', 'explanation', 'topic__name', 'topic__subject__name']
     ordering = ['-created_at']
+    actions = ['regrade_attempts']
+    
+    def regrade_attempts(self, request, queryset):
+        question_ids = list(queryset.values_list('id', flat=True))
+        _regrade(self, request, question_ids)
+    regrade_attempts.short_description = "Regrade attempts of selected questions"
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # The fingerprint is refreshed by signals once the question and its options are saved.
+        fingerprint = QuestionFingerprint.objects.filter(
+            question=form.instance, duplicate_of__isnull=False
+        ).first()
+        if fingerprint:
+            self.message_user(
+                request,
+                f"This question looks like a duplicate of question #{fingerprint.duplicate_of_id} "
+                f"({fingerprint.similarity:.0%} similar).",
+                level=messages.WARNING
+            )
 
 
 @admin.register(QuestionOption)
@@ -32,6 +78,12 @@ class QuestionOptionAdmin(admin.ModelAdmin):
     list_filter = ['is_correct', 'order', 'question__topic__subject']
     search_fields = ['option_text', 'question__question_text']
     ordering = ['question', 'order']
+    actions = ['regrade_attempts']
+    
+    def regrade_attempts(self, request, queryset):
+        question_ids = list(queryset.values_list('question_id', flat=True).distinct())
+        _regrade(self, request, question_ids)
+    regrade_attempts.short_description = "Regrade attempts of the selected options' questions"
 
 
 @admin.register(MockTest)
@@ -42,6 +94,25 @@ class MockTestAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
 
 
+@admin.register(MockTestBlueprint)
+class MockTestBlueprintAdmin(admin.ModelAdmin):
+    list_display = ['name', 'test_type', 'duration_minutes', 'total_marks', 'exclude_recent_days', 'updated_at']
+    list_filter = ['test_type', 'created_at']
+    search_fields = ['name', 'description']
+    ordering = ['name']
+    actions = ['generate_mock_tests']
+    
+    def generate_mock_tests(self, request, queryset):
+        for blueprint in queryset:
+            try:
+                mock_test = generate_mock_test(blueprint, created_by=request.user)
+            except BlueprintError as e:
+                self.message_user(request, f"{blueprint.name}: {e}", level=messages.ERROR)
+                continue
+            self.message_user(request, f"Generated '{mock_test.name}' with {mock_test.total_questions} questions.")
+    generate_mock_tests.short_description = "Generate a mock test from selected blueprints"
+
+
 @admin.register(MockTestQuestion)
 class MockTestQuestionAdmin(admin.ModelAdmin):
     list_display = ['mock_test', 'question', 'order', 'marks']
@@ -50,6 +121,24 @@ class MockTestQuestionAdmin(admin.ModelAdmin):
     ordering = ['mock_test', 'order']
 
 
+@admin.register(PublishedPaper)
+class PublishedPaperAdmin(admin.ModelAdmin):
+    list_display = ['mock_test', 'version', 'content_hash', 'is_current', 'created_at']
+    list_filter = ['is_current', 'created_at']
+    search_fields = ['mock_test__name', 'content_hash']
+    readonly_fields = ['mock_test', 'version', 'content_hash', 'payload', 'is_current', 'created_at']
+    ordering = ['mock_test', '-version']
+
+
+@admin.register(PracticePack)
+class PracticePackAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'version', 'question_count', 'size', 'watermark', 'is_current', 'created_at']
+    list_filter = ['is_current', 'subject']
+    exclude = ['payload']
+    readonly_fields = ['subject', 'version', 'content_hash', 'watermark', 'question_count', 'size', 'is_current', 'created_at']
+    ordering = ['subject', '-version']
+
+
 @admin.register(MockTestAttempt)
 class MockTestAttemptAdmin(admin.ModelAdmin):
     list_display = ['user', 'mock_test', 'status', 'score', 'started_at', 'completed_at']
@@ -72,3 +161,21 @@ class BookmarkedQuestionAdmin(admin.ModelAdmin):
     list_filter = ['created_at', 'question__topic__subject']
     search_fields = ['user__username', 'question__question_text']
     ordering = ['-created_at']
+
+
+@admin.register(QuestionImportJob)
+class QuestionImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'source', 'topic', 'status', 'processed_units', 'total_units', 'imported_count', 'error_count', 'created_at']
+    list_filter = ['source', 'status', 'created_at']
+    search_fields = ['file', 'created_by__username']
+    readonly_fields = ['total_units', 'processed_units', 'imported_count', 'error_count', 'errors', 'started_at', 'finished_at']
+    ordering = ['-created_at']
+
+
+@admin.register(QuestionStats)
+class QuestionStatsAdmin(admin.ModelAdmin):
+    list_display = ['question', 'attempts', 'correct_count', 'p_value', 'mean_time_seconds', 'observed_difficulty', 'updated_at']
+    search_fields = ['question__question_text']
+    readonly_fields = ['question', 'attempts', 'correct_count', 'timed_attempts', 'total_time_seconds', 'updated_at']
+    list_select_related = ['question__topic']
+    ordering = ['-attempts']
@@ -0,0 +1,84 @@
+"""
+Answer sheet persistence for mock test attempts.
+
+Answers are written as a batch: one validation query and one upsert on the
+``(test_attempt, question)`` unique constraint per call, regardless of how many
+answers the batch carries.
+"""
+from django.db import transaction
+
+from .grading import get_answer_key
+from .models import QuestionAttempt, QuestionOption
+
+ANSWER_UPDATE_FIELDS = ['selected_option', 'is_correct', 'time_taken_seconds', 'is_marked_for_review']
+
+
+class AnswerSheetError(ValueError):
+    """Raised when a batch references questions or options outside the paper."""
+
+
+def validate_answers(mock_test_id, answers):
+    """
+    Check that every answer targets a question on the paper and, when an option
+    is selected, that the option belongs to that question.
+    """
+    paper_question_ids = get_answer_key(mock_test_id).keys()
+    errors = {}
+
+    for answer in answers:
+        if answer['question'] not in paper_question_ids:
+            errors[answer['question']] = 'Question is not part of this mock test.'
+
+    option_ids = {a['selected_option'] for a in answers if a.get('selected_option') is not None}
+    if option_ids:
+        option_questions = dict(
+            QuestionOption.objects.filter(id__in=option_ids).values_list('id', 'question_id')
+        )
+        for answer in answers:
+            option_id = answer.get('selected_option')
+            if option_id is not None and option_questions.get(option_id) != answer['question']:
+                errors.setdefault(answer['question'], 'Selected option does not belong to this question.')
+
+    if errors:
+        raise AnswerSheetError(errors)
+
+
+def upsert_answers(attempt_answers):
+    """
+    Write ``(attempt_id, answer)`` pairs, possibly spanning several attempts,
+    with one upsert in a single transaction. Answers must already be validated.
+    """
+    rows = [
+        QuestionAttempt(
+            test_attempt_id=attempt_id,
+            question_id=answer['question'],
+            selected_option_id=answer.get('selected_option'),
+            is_correct=None,
+            time_taken_seconds=answer.get('time_taken_seconds'),
+            is_marked_for_review=answer.get('is_marked_for_review', False),
+        )
+        for attempt_id, answer in attempt_answers
+    ]
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        QuestionAttempt.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['test_attempt', 'question'],
+            update_fields=ANSWER_UPDATE_FIELDS,
+        )
+    return len(rows)
+
+
+def save_answers(attempt, answers):
+    """
+    Upsert a batch of answers for an attempt in a single transaction.
+
+    Each answer is a dict with ``question`` and optional ``selected_option``,
+    ``time_taken_seconds`` and ``is_marked_for_review``; it replaces the stored
+    state for that question. Returns the number of answers written.
+    """
+    validate_answers(attempt.mock_test_id, answers)
+    return upsert_answers((attempt.id, answer) for answer in answers)
@@ -0,0 +1,77 @@
+"""
+Versioned cache namespaces.
+
+Derived data (answer keys, question pools, papers) is cached under a key that
+embeds a version number. Invalidating a namespace bumps its version, so every
+process stops reading the old entries at once and they simply expire.
+
+The module also provides short-lived cache locks built on the atomic
+``cache.add``. Like the rest of the cache they only exclude other processes
+when the cache is shared between them (see ``questions.checks``).
+"""
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f'questions:version:{namespace}'
+
+
+def get_version(namespace):
+    # Seed with a timestamp so an evicted version never collides with
+    # entries that are still cached under an older version number.
+    return cache.get_or_set(_version_key(namespace), int(time.time()), None)
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), int(time.time()), None)
+
+
+def versioned_key(namespace, *parts):
+    suffix = ':'.join(str(part) for part in parts)
+    return f'questions:{namespace}:v{get_version(namespace)}:{suffix}'
+
+
+class LockTimeout(Exception):
+    """Raised when a cache lock could not be acquired in time."""
+
+
+def _lock_key(name):
+    return f'questions:lock:{name}'
+
+
+def acquire_lock(name, timeout=10, wait=0):
+    """
+    Try to take the lock ``name`` for at most ``timeout`` seconds, polling for
+    up to ``wait`` seconds. Returns a token for ``release_lock``, or None.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    while not cache.add(_lock_key(name), token, timeout):
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+    return token
+
+
+def release_lock(name, token):
+    # Only release our own lock; after a timeout it may belong to someone else.
+    if cache.get(_lock_key(name)) == token:
+        cache.delete(_lock_key(name))
+
+
+@contextmanager
+def cache_lock(name, timeout=10, wait=5):
+    token = acquire_lock(name, timeout, wait)
+    if token is None:
+        raise LockTimeout(name)
+    try:
+        yield
+    finally:
+        release_lock(name, token)
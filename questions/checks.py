@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Autosave buffers, cache locks and cached snapshots are shared between web
+    and worker processes through the default cache, so it must not be
+    process-local outside single-process development.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS or getattr(settings, 'ALLOW_PROCESS_LOCAL_CACHE', False):
+        return []
+    return [Error(
+        f'The default cache ({backend}) is private to each process.',
+        hint='Set REDIS_CACHE_URL so that web and Celery processes share autosave buffers and locks.',
+        id='questions.E001',
+    )]
@@ -0,0 +1,135 @@
+"""
+Deadline enforcement for mock test attempts.
+
+An attempt is overdue once ``started_at + mock_test.duration_minutes`` (plus a
+short grace period for in-flight saves) has passed. Overdue attempts are
+expired lazily when their owner touches them and in bulk by a periodic
+sweeper. Depending on ``EXPIRED_ATTEMPT_ACTION`` they are either graded as if
+submitted at the deadline (``'grade'``) or marked ``abandoned``.
+
+The sweeper runs one range query per distinct test duration on the
+``(status, started_at)`` index, so its cost follows the number of overdue
+attempts rather than the size of the table. Grading takes the attempt's
+autosave buffer lock before its row lock (see ``autosave.closing_buffer``);
+the sweeper skips attempts whose buffer is busy and expires them next run.
+"""
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .autosave import closing_buffer, discard_buffer, discard_buffers
+from .caching import LockTimeout
+from .grading import grade_attempt
+from .models import MockTest, MockTestAttempt
+
+EXPIRY_ACTIONS = ('grade', 'abandon')
+
+
+def grace_period():
+    return timedelta(seconds=getattr(settings, 'ATTEMPT_EXPIRY_GRACE_SECONDS', 60))
+
+
+def expiry_action():
+    action = getattr(settings, 'EXPIRED_ATTEMPT_ACTION', 'grade')
+    if action not in EXPIRY_ACTIONS:
+        raise ValueError(f"EXPIRED_ATTEMPT_ACTION must be one of {EXPIRY_ACTIONS}, not '{action}'")
+    return action
+
+
+def deadline(attempt):
+    return attempt.started_at + timedelta(minutes=attempt.mock_test.duration_minutes)
+
+
+def is_overdue(attempt, now=None):
+    return (
+        attempt.status == 'in_progress'
+        and (now or timezone.now()) > deadline(attempt) + grace_period()
+    )
+
+
+def _expire_locked(attempt, action):
+    if action == 'grade':
+        grade_attempt(attempt, completed_at=deadline(attempt))
+    else:
+        attempt.status = 'abandoned'
+        attempt.completed_at = deadline(attempt)
+        attempt.save(update_fields=['status', 'completed_at'])
+
+
+def expire_attempt(attempt, action=None, wait=5):
+    """
+    Expire one overdue attempt, re-checking its status under a row lock so a
+    concurrent submit wins. Returns True if this call expired it. Raises
+    ``LockTimeout`` when grading and the autosave buffer stays locked for
+    ``wait`` seconds.
+    """
+    action = action or expiry_action()
+    buffer = closing_buffer(attempt.pk, wait) if action == 'grade' else nullcontext()
+    with buffer, transaction.atomic():
+        locked = MockTestAttempt.objects.select_for_update(of=('self',)).select_related('mock_test').filter(
+            pk=attempt.pk, status='in_progress'
+        ).first()
+        if locked is None or not is_overdue(locked):
+            return False
+        _expire_locked(locked, action)
+    discard_buffer(locked.id)
+    attempt.refresh_from_db()
+    return True
+
+
+def overdue_attempts(now=None, **filters):
+    """
+    Yield ``(duration_minutes, queryset)`` covering every overdue in-progress
+    attempt: one range query on the ``(status, started_at)`` index per
+    distinct test duration.
+    """
+    cutoff = (now or timezone.now()) - grace_period()
+    durations = MockTest.objects.filter(
+        attempts__status='in_progress', **{f'attempts__{key}': value for key, value in filters.items()}
+    ).order_by().values_list('duration_minutes', flat=True).distinct()
+
+    for duration in durations:
+        yield duration, MockTestAttempt.objects.filter(
+            status='in_progress',
+            started_at__lt=cutoff - timedelta(minutes=duration),
+            mock_test__duration_minutes=duration,
+            **filters,
+        )
+
+
+def expire_overdue_attempts(batch_size=500, action=None, **filters):
+    """
+    Expire every overdue attempt (optionally narrowed by ``filters`` such as
+    ``user=...``) in batches of ``batch_size``. Abandoning is a single UPDATE
+    per batch; grading expires each attempt in turn, skipping those whose
+    autosave buffer is busy. Returns the number of attempts expired.
+    """
+    action = action or expiry_action()
+    now = timezone.now()
+    expired = 0
+
+    for duration, overdue in overdue_attempts(now, **filters):
+        attempt_ids = list(overdue.order_by('started_at').values_list('id', flat=True))
+        for start in range(0, len(attempt_ids), batch_size):
+            batch = overdue.filter(pk__in=attempt_ids[start:start + batch_size])
+            if action == 'grade':
+                for attempt in batch.select_related('mock_test'):
+                    try:
+                        expired += expire_attempt(attempt, action, wait=0)
+                    except LockTimeout:
+                        continue  # a save is flushing; the next sweep expires it
+                continue
+            with transaction.atomic():
+                batch_ids = list(batch.select_for_update(of=('self',)).values_list('id', flat=True))
+                MockTestAttempt.objects.filter(pk__in=batch_ids).update(
+                    status='abandoned',
+                    completed_at=F('started_at') + timedelta(minutes=duration),
+                )
+            discard_buffers(batch_ids)
+            expired += len(batch_ids)
+
+    return expired
@@ -1,4 +1,12 @@
 from django import forms
 
+from .models import Topic
+
+
 class PDFUploadForm(forms.Form):
     pdf_file = forms.FileField(label="Upload PDF file", required=True)
+    topic = forms.ModelChoiceField(
+        queryset=Topic.objects.select_related('subject'),
+        required=False,
+        help_text="Topic for the imported questions (defaults to the first topic of the first subject)."
+    )
@@ -0,0 +1,185 @@
+"""
+Blueprint-driven mock test generation.
+
+Active question ids are held in a per-process index bucketed by
+``(topic, difficulty)`` and rebuilt with one query when the question bank
+version changes (see ``sampling``). Filling a blueprint draws from those
+buckets in memory, so a 200-question paper costs a handful of queries: the
+recently-used exclusion list, the MockTest insert and one ``bulk_create`` of
+its MockTestQuestion rows.
+"""
+import bisect
+import random
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import get_version
+from .models import Question, MockTest, MockTestQuestion
+from .sampling import QUESTION_BANK_NAMESPACE
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+MAX_QUESTIONS = 200
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class BlueprintError(ValueError):
+    pass
+
+
+class QuestionIndex:
+    def __init__(self, rows):
+        self.buckets = defaultdict(list)
+        self.subject_topics = defaultdict(set)
+        for question_id, topic_id, subject_id, difficulty in rows:
+            self.buckets[(topic_id, difficulty)].append(question_id)
+            self.subject_topics[subject_id].add(topic_id)
+
+    def select(self, subject_id=None, topic_id=None, difficulty=None):
+        """Return the buckets matching a section's filters."""
+        if topic_id is not None:
+            topics = [topic_id]
+        elif subject_id is not None:
+            topics = self.subject_topics.get(subject_id, ())
+        else:
+            topics = {topic for topic, _ in self.buckets}
+        difficulties = [difficulty] if difficulty else DIFFICULTIES
+        return [
+            self.buckets[(topic, level)] for topic in topics for level in difficulties
+            if self.buckets.get((topic, level))
+        ]
+
+
+def get_question_index():
+    global _index
+    version = get_version(QUESTION_BANK_NAMESPACE)
+    if _index is not None and _index[0] == version:
+        return _index[1]
+
+    rows = Question.objects.filter(is_active=True, topic__is_active=True).order_by().values_list(
+        'id', 'topic_id', 'topic__subject_id', 'difficulty'
+    )
+    index = QuestionIndex(rows.iterator(chunk_size=5000))
+    with _index_lock:
+        _index = (version, index)
+    return index
+
+
+def validate_sections(sections, total_marks=None):
+    if not isinstance(sections, list) or not sections:
+        raise BlueprintError('A blueprint needs at least one section.')
+
+    question_count = marks = 0
+    for number, section in enumerate(sections, start=1):
+        if not isinstance(section, dict):
+            raise BlueprintError(f'Section {number} must be an object.')
+        count = section.get('count')
+        if not isinstance(count, int) or count < 1:
+            raise BlueprintError(f'Section {number} needs a positive integer count.')
+        if section.get('difficulty') not in (None, *DIFFICULTIES):
+            raise BlueprintError(f'Section {number} has an unknown difficulty.')
+        section_marks = section.get('marks', 1)
+        if not isinstance(section_marks, int) or section_marks < 1:
+            raise BlueprintError(f'Section {number} needs positive integer marks.')
+        question_count += count
+        marks += count * section_marks
+
+    if question_count > MAX_QUESTIONS:
+        raise BlueprintError(f'A mock test can have at most {MAX_QUESTIONS} questions ({question_count} requested).')
+    if total_marks is not None and total_marks != marks:
+        raise BlueprintError(f'Sections add up to {marks} marks, expected {total_marks}.')
+    return question_count, marks
+
+
+def draw(buckets, k, exclude):
+    """
+    Draw ``k`` distinct ids from a list of buckets without concatenating them:
+    positions are picked over the combined length and mapped back with bisect.
+    Ids in ``exclude`` are skipped, and drawn ids are added to it.
+    """
+    offsets = []
+    total = 0
+    for bucket in buckets:
+        offsets.append(total)
+        total += len(bucket)
+
+    def question_at(position):
+        bucket_number = bisect.bisect_right(offsets, position) - 1
+        return buckets[bucket_number][position - offsets[bucket_number]]
+
+    chosen = []
+    tried = set()
+    # Rejection sampling is O(k) while most positions are still usable; once
+    # half have been tried, finish over a shuffle of whatever is left.
+    while len(chosen) < k and len(tried) < total // 2:
+        position = random.randrange(total)
+        if position in tried:
+            continue
+        tried.add(position)
+        question_id = question_at(position)
+        if question_id not in exclude:
+            chosen.append(question_id)
+            exclude.add(question_id)
+
+    if len(chosen) < k:
+        remaining = [position for position in range(total) if position not in tried]
+        random.shuffle(remaining)
+        for position in remaining:
+            question_id = question_at(position)
+            if question_id not in exclude:
+                chosen.append(question_id)
+                exclude.add(question_id)
+                if len(chosen) == k:
+                    break
+    return chosen
+
+
+def recently_used_question_ids(days):
+    if not days:
+        return set()
+    since = timezone.now() - timedelta(days=days)
+    return set(
+        MockTestQuestion.objects.filter(mock_test__created_at__gte=since)
+        .values_list('question_id', flat=True)
+    )
+
+
+def generate_mock_test(blueprint, name=None, created_by=None):
+    """Create a MockTest filled according to a MockTestBlueprint."""
+    question_count, _ = validate_sections(blueprint.sections, blueprint.total_marks)
+    index = get_question_index()
+    exclude = recently_used_question_ids(blueprint.exclude_recent_days)
+
+    slots = []
+    for number, section in enumerate(blueprint.sections, start=1):
+        buckets = index.select(section.get('subject'), section.get('topic'), section.get('difficulty'))
+        question_ids = draw(buckets, section['count'], exclude)
+        if len(question_ids) < section['count']:
+            raise BlueprintError(
+                f"Section {number} needs {section['count']} questions but only "
+                f"{len(question_ids)} unused active questions match it."
+            )
+        slots.extend((question_id, section.get('marks', 1)) for question_id in question_ids)
+
+    with transaction.atomic():
+        mock_test = MockTest.objects.create(
+            name=name or f"{blueprint.name} ({timezone.localdate():%Y-%m-%d})",
+            description=blueprint.description or blueprint.name,
+            test_type=blueprint.test_type,
+            duration_minutes=blueprint.duration_minutes,
+            total_questions=question_count,
+            passing_score=blueprint.passing_score,
+            is_free=blueprint.is_free,
+            price=blueprint.price,
+            created_by=created_by,
+        )
+        MockTestQuestion.objects.bulk_create([
+            MockTestQuestion(mock_test=mock_test, question_id=question_id, order=order, marks=marks)
+            for order, (question_id, marks) in enumerate(slots, start=1)
+        ])
+    return mock_test
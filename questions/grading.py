@@ -0,0 +1,175 @@
+"""
+Grading engine for mock test attempts.
+
+Each MockTest has a compiled answer key (question id -> correct option ids and
+marks) that is cached under a versioned key. Any change to the paper or to an
+option's correctness bumps the version, so stale keys are never read and no
+explicit delete is needed across cache nodes.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import answer_sheets, reviews
+from .caching import get_version, bump_version, versioned_key
+from .models import MockTestQuestion, QuestionOption, QuestionAttempt
+from .stats import record_answers
+
+ANSWER_KEY_TIMEOUT = 60 * 60 * 6  # 6 hours
+
+# Sent inside the grading transaction with ``attempt`` and its GradeResult ``result``.
+attempt_graded = Signal()
+
+AnswerKeyEntry = namedtuple('AnswerKeyEntry', ['correct_option_ids', 'marks'])
+GradeResult = namedtuple('GradeResult', [
+    'total_questions', 'answered', 'correct_answers',
+    'obtained_marks', 'total_marks', 'score', 'accuracy',
+])
+
+
+def _answer_key_namespace(mock_test_id):
+    return f'answer_key:{mock_test_id}'
+
+
+def get_answer_key_version(mock_test_id):
+    return get_version(_answer_key_namespace(mock_test_id))
+
+
+def invalidate_answer_key(mock_test_id):
+    bump_version(_answer_key_namespace(mock_test_id))
+
+
+def compile_answer_key(mock_test_id):
+    """Build the answer key for a mock test with two queries."""
+    marks_by_question = dict(
+        MockTestQuestion.objects.filter(mock_test_id=mock_test_id)
+        .values_list('question_id', 'marks')
+    )
+    correct = {question_id: set() for question_id in marks_by_question}
+    options = QuestionOption.objects.filter(
+        question_id__in=list(marks_by_question), is_correct=True
+    ).values_list('question_id', 'id')
+    for question_id, option_id in options:
+        correct[question_id].add(option_id)
+
+    return {
+        question_id: AnswerKeyEntry(frozenset(correct[question_id]), marks)
+        for question_id, marks in marks_by_question.items()
+    }
+
+
+def get_answer_key(mock_test_id):
+    """Return the cached answer key for a mock test, compiling it on a miss."""
+    cache_key = versioned_key(_answer_key_namespace(mock_test_id), 'compiled')
+    answer_key = cache.get(cache_key)
+    if answer_key is None:
+        answer_key = compile_answer_key(mock_test_id)
+        cache.set(cache_key, answer_key, ANSWER_KEY_TIMEOUT)
+    return answer_key
+
+
+def grade_answers(answer_key, selections):
+    """
+    Grade an answer sheet against an answer key in a single pass.
+
+    ``selections`` maps question id -> selected option id (or None when the
+    question was left unanswered). Returns a ``(GradeResult, verdicts)`` pair
+    where ``verdicts`` maps question id -> is_correct (None when unanswered).
+    Questions that are not part of the paper are ignored.
+    """
+    verdicts = {}
+    answered = correct_answers = obtained_marks = 0
+
+    for question_id, option_id in selections.items():
+        entry = answer_key.get(question_id)
+        if entry is None:
+            continue
+        if option_id is None:
+            verdicts[question_id] = None
+            continue
+        answered += 1
+        is_correct = option_id in entry.correct_option_ids
+        verdicts[question_id] = is_correct
+        if is_correct:
+            correct_answers += 1
+            obtained_marks += entry.marks
+
+    total_marks = sum(entry.marks for entry in answer_key.values())
+    score = (obtained_marks / total_marks) * 100 if total_marks > 0 else 0
+    accuracy = (correct_answers / answered) * 100 if answered > 0 else 0
+
+    result = GradeResult(
+        total_questions=len(answer_key),
+        answered=answered,
+        correct_answers=correct_answers,
+        obtained_marks=obtained_marks,
+        total_marks=total_marks,
+        score=round(score, 2),
+        accuracy=round(accuracy, 2),
+    )
+    return result, verdicts
+
+
+def grade_attempt(attempt, completed_at=None):
+    """
+    Grade and complete a MockTestAttempt.
+
+    Costs a constant number of queries regardless of paper length: one read of
+    the attempt's answers, one bulk update of ``is_correct`` (or one delete of
+    the rows when they are not kept) and one update of the attempt itself,
+    which also stores the packed answer sheet, plus the item statistics
+    upserts, review queue inserts and whatever ``attempt_graded`` receivers
+    run (and two queries on an answer key cache miss).
+    """
+    answer_key = get_answer_key(attempt.mock_test_id)
+    question_attempts = list(
+        QuestionAttempt.objects.filter(test_attempt=attempt)
+        .only('id', 'question_id', 'selected_option_id', 'is_correct', 'time_taken_seconds', 'is_marked_for_review')
+    )
+    result, verdicts = grade_answers(
+        answer_key,
+        {qa.question_id: qa.selected_option_id for qa in question_attempts},
+    )
+
+    changed = []
+    for qa in question_attempts:
+        verdict = verdicts.get(qa.question_id)
+        if qa.is_correct != verdict:
+            qa.is_correct = verdict
+            changed.append(qa)
+
+    paper_order = {question_id: position for position, question_id in enumerate(answer_key)}
+    graded = sorted(
+        (qa for qa in question_attempts if qa.question_id in paper_order),
+        key=lambda qa: paper_order[qa.question_id],
+    )
+
+    completed_at = completed_at or timezone.now()
+    attempt.answer_sheet = answer_sheets.pack(graded)
+    attempt.status = 'completed'
+    attempt.completed_at = completed_at
+    attempt.score = result.score
+    attempt.total_marks = result.total_marks
+    attempt.accuracy_percentage = result.accuracy
+    attempt.time_taken_minutes = int((completed_at - attempt.started_at).total_seconds() // 60)
+
+    with transaction.atomic():
+        if not answer_sheets.keep_rows():
+            QuestionAttempt.objects.filter(test_attempt=attempt).delete()
+        elif changed:
+            QuestionAttempt.objects.bulk_update(changed, ['is_correct'])
+        attempt.save(update_fields=[
+            'status', 'completed_at', 'score', 'total_marks',
+            'accuracy_percentage', 'time_taken_minutes', 'answer_sheet',
+        ])
+        record_answers(
+            (qa.question_id, qa.selected_option_id, qa.is_correct, qa.time_taken_seconds)
+            for qa in graded
+        )
+        reviews.add_wrong_answers((attempt.user_id, qa.question_id) for qa in graded if qa.is_correct is False)
+        attempt_graded.send(sender=type(attempt), attempt=attempt, result=result)
+
+    return result
@@ -0,0 +1,455 @@
+"""
+Background question ingestion.
+
+PDF imports run as a QuestionImportJob: pages are extracted in chunks by a
+process pool and streamed, in order, through a block parser built on
+precompiled regexes. Parsed questions are written with ``bulk_create`` in
+batches, one transaction per batch, after near-duplicates have been filtered
+out, and the job row records progress and per-block errors as it goes.
+
+Spreadsheet imports (XLSX or CSV, one question per row) stream rows through a
+validating generator, resolve subject/topic names from an in-memory map built
+with a single query, and share the same batched writer.
+"""
+import csv
+import multiprocessing
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+import pdfplumber
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Subject, Topic, Question, QuestionOption, QuestionImportJob
+from .sampling import invalidate_question_pools
+from .similarity import find_duplicates, index_questions, signature
+
+BATCH_SIZE = 200
+PAGES_PER_CHUNK = 10
+
+QUESTION_SPLIT_RE = re.compile(r'(?:^|\n)\d+\. ')
+OPTION_RE = re.compile(r'([A-D])\)\s*(.+)')
+ANSWER_RE = re.compile(r'Answer[:\s]+([A-D])', re.IGNORECASE)
+
+# A validated question ready to insert; ``options`` is a list of (text, is_correct).
+ParsedQuestion = namedtuple('ParsedQuestion', [
+    'question_text', 'options', 'topic_id', 'difficulty', 'marks', 'explanation', 'question_type',
+], defaults=['medium', 1, None, 'mcq'])
+
+
+class BlockError(ValueError):
+    pass
+
+
+class RowError(ValueError):
+    pass
+
+
+def parse_block(block, topic_id):
+    """
+    Parse one numbered MCQ block of the form::
+
+        Question text
+        A) option
+        B) option
+        Answer: B
+
+    Returns None for blocks that are too short to be a question (headers,
+    page furniture) and raises BlockError for malformed questions.
+    """
+    lines = block.strip().split('\n')
+    if len(lines) < 3:
+        return None
+
+    question_text = lines[0].strip()
+    options = []
+    answer = None
+    for line in lines[1:]:
+        opt_match = OPTION_RE.match(line)
+        if opt_match:
+            options.append((opt_match.group(1).upper(), opt_match.group(2).strip()))
+        ans_match = ANSWER_RE.match(line)
+        if ans_match:
+            answer = ans_match.group(1).upper()
+
+    if not question_text or len(options) < 2 or not answer:
+        raise BlockError(f"Skipped: '{question_text[:40]}...' (missing options/answer)")
+
+    return ParsedQuestion(
+        question_text=question_text,
+        options=[(text, key == answer) for key, text in options],
+        topic_id=topic_id,
+    )
+
+
+def extract_pages(args):
+    """Process pool worker: extract the text of pages [start, stop) of a PDF."""
+    path, start, stop = args
+    with pdfplumber.open(path) as pdf:
+        return '\n'.join(pdf.pages[i].extract_text() or '' for i in range(start, stop))
+
+
+def iter_page_chunks(path, page_count, workers):
+    """Yield ``(pages_done, text)`` for consecutive page chunks, in page order."""
+    chunks = [
+        (path, start, min(start + PAGES_PER_CHUNK, page_count))
+        for start in range(0, page_count, PAGES_PER_CHUNK)
+    ]
+    # Celery's prefork workers are daemonic and cannot start child processes.
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        results = map(extract_pages, chunks)
+        for (_, _, stop), text in zip(chunks, results):
+            yield stop, text
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (_, _, stop), text in zip(chunks, executor.map(extract_pages, chunks)):
+            yield stop, text
+
+
+def iter_blocks(chunks):
+    """
+    Split streamed page text into question blocks. The last block of a chunk
+    is held back because the question may continue on the next page.
+    """
+    buffer = ''
+    pages_done = 0
+    for pages_done, text in chunks:
+        buffer = f'{buffer}\n{text}' if buffer else text
+        blocks = QUESTION_SPLIT_RE.split(buffer)
+        buffer = blocks.pop()
+        for block in blocks:
+            if block.strip():
+                yield pages_done, block
+    if buffer.strip():
+        yield pages_done, buffer
+
+
+def write_questions(parsed_questions, created_by_id=None):
+    """Insert a batch of ParsedQuestions and their options in one transaction."""
+    with transaction.atomic():
+        questions = Question.objects.bulk_create([
+            Question(
+                topic_id=parsed.topic_id,
+                question_text=parsed.question_text,
+                question_type=parsed.question_type,
+                difficulty=parsed.difficulty,
+                marks=parsed.marks,
+                explanation=parsed.explanation,
+                is_active=True,
+                created_by_id=created_by_id,
+            )
+            for parsed in parsed_questions
+        ])
+        QuestionOption.objects.bulk_create([
+            QuestionOption(question=question, option_text=text, is_correct=is_correct, order=order)
+            for question, parsed in zip(questions, parsed_questions)
+            for order, (text, is_correct) in enumerate(parsed.options, start=1)
+        ])
+    return questions
+
+
+class JobProgress:
+    """
+    Buffers results for a QuestionImportJob and flushes them in batches.
+    Near-duplicates of existing questions, or of earlier questions in the same
+    import, are skipped and reported instead of being written.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.pending = []
+        self.errors = []
+
+    def add(self, label, parsed):
+        self.pending.append((label, parsed))
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def _drop_duplicates(self):
+        items = [(parsed.question_text, [text for text, _ in parsed.options]) for _, parsed in self.pending]
+        signatures = [signature(*item) for item in items]
+        matches = find_duplicates(items, signatures=signatures)
+        unique = []
+        for (label, parsed), sig, match in zip(self.pending, signatures, matches):
+            if match is None:
+                unique.append((parsed, sig))
+            elif match.question_id is not None:
+                self.error(f'{label}: Skipped duplicate of question #{match.question_id} '
+                           f'({match.similarity:.0%} similar)')
+            else:
+                self.error(f'{label}: Skipped duplicate of {self.pending[match.batch_index][0]}')
+        return unique
+
+    def flush(self, processed_units):
+        imported = 0
+        if self.pending:
+            unique = self._drop_duplicates()
+            if unique:
+                questions = write_questions([parsed for parsed, _ in unique], self.job.created_by_id)
+                index_questions(
+                    [question.id for question in questions], flag_duplicates=False,
+                    known_signatures={question.id: sig for question, (_, sig) in zip(questions, unique)},
+                )
+                imported = len(questions)
+            self.pending = []
+
+        room = max(QuestionImportJob.MAX_ERRORS - len(self.job.errors), 0)
+        self.job.errors.extend(self.errors[:room])
+        QuestionImportJob.objects.filter(pk=self.job.pk).update(
+            processed_units=processed_units,
+            imported_count=F('imported_count') + imported,
+            error_count=F('error_count') + len(self.errors),
+            errors=self.job.errors,
+        )
+        self.errors = []
+
+
+def _default_topic():
+    subject = Subject.objects.first()
+    return Topic.objects.filter(subject=subject).first() if subject else None
+
+
+def _finish(job, status):
+    QuestionImportJob.objects.filter(pk=job.pk).update(status=status, finished_at=timezone.now())
+    invalidate_question_pools()
+
+
+def _fail(job, message):
+    job.errors = [message]
+    job.error_count = 1
+    job.status = 'failed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['errors', 'error_count', 'status', 'finished_at'])
+    return job
+
+
+def _start(job, total_units):
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.total_units = total_units
+    job.save(update_fields=['status', 'started_at', 'total_units'])
+
+
+def run_pdf_import(job_id):
+    """Run a pending PDF QuestionImportJob to completion."""
+    job = QuestionImportJob.objects.get(pk=job_id)
+    topic = job.topic or _default_topic()
+    if topic is None:
+        return _fail(job, 'No Subject/Topic found. Please create at least one in admin.')
+
+    path = job.file.path
+    try:
+        with pdfplumber.open(path) as pdf:
+            page_count = len(pdf.pages)
+    except Exception as e:
+        return _fail(job, f'Could not open PDF: {e}')
+
+    _start(job, page_count)
+
+    progress = JobProgress(job)
+    workers = getattr(settings, 'QUESTION_IMPORT_WORKERS', 1)
+    pages_done = 0
+    try:
+        for block_number, (pages_done, block) in enumerate(
+            iter_blocks(iter_page_chunks(path, page_count, workers)), start=1
+        ):
+            try:
+                parsed = parse_block(block, topic.id)
+            except BlockError as e:
+                progress.error(f'Block {block_number}: {e}')
+                continue
+            if parsed is not None:
+                progress.add(f'Block {block_number}', parsed)
+            if len(progress.pending) >= BATCH_SIZE:
+                progress.flush(pages_done)
+        progress.flush(page_count)
+    except Exception as e:
+        progress.error(f'Import aborted after page {pages_done}: {e}')
+        progress.pending = []
+        progress.flush(pages_done)
+        _finish(job, 'failed')
+        job.refresh_from_db()
+        return job
+
+    _finish(job, 'completed')
+    job.refresh_from_db()
+    return job
+
+
+# Spreadsheet imports ---------------------------------------------------------
+
+SPREADSHEET_SOURCES = {'.xlsx': 'xlsx', '.xlsm': 'xlsx', '.csv': 'csv'}
+OPTION_COLUMNS = ['option_a', 'option_b', 'option_c', 'option_d', 'option_e']
+REQUIRED_COLUMNS = ['question', 'option_a', 'option_b', 'answer']
+QUESTION_TYPES = {value for value, _ in Question.QUESTION_TYPE_CHOICES}
+DIFFICULTIES = {value for value, _ in Question.DIFFICULTY_CHOICES}
+
+
+def spreadsheet_source(filename):
+    """Return the import source for a file name, or None if it is not a spreadsheet."""
+    return SPREADSHEET_SOURCES.get(os.path.splitext(filename)[1].lower())
+
+
+def _normalise_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _xlsx_rows(path):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # max_row comes from the sheet's stored dimension, so it costs nothing.
+        yield (sheet.max_row or 1) - 1
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _csv_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield max(sum(1 for _ in f) - 1, 0)
+        f.seek(0)
+        yield from csv.reader(f)
+
+
+def open_spreadsheet(path, source):
+    """
+    Return ``(row_count, rows)`` where ``rows`` yields ``(row_number, {column: text})``
+    for every non-empty data row. Only one row is held in memory at a time.
+    """
+    rows = _xlsx_rows(path) if source == 'xlsx' else _csv_rows(path)
+    row_count = next(rows)
+    header = [_normalise_header(value) for value in next(rows, ())]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        rows.close()
+        raise RowError(f"Missing column(s): {', '.join(missing)}")
+
+    def records():
+        for row_number, values in enumerate(rows, start=2):
+            record = {column: _cell(value) for column, value in zip(header, values) if column}
+            if any(record.values()):
+                yield row_number, record
+
+    return row_count, records()
+
+
+class TopicLookup:
+    """Resolves subject/topic names (case-insensitively) to topic ids without per-row queries."""
+
+    def __init__(self, default_topic_id=None):
+        self.default_topic_id = default_topic_id
+        self.topics = {}
+        for topic_id, name, subject_name in Topic.objects.values_list('id', 'name', 'subject__name'):
+            self.topics[(subject_name.strip().lower(), name.strip().lower())] = topic_id
+
+    def resolve(self, subject_name, topic_name):
+        if not subject_name and not topic_name and self.default_topic_id:
+            return self.default_topic_id
+        topic_id = self.topics.get((subject_name.lower(), topic_name.lower()))
+        if topic_id is None:
+            raise RowError(f"Unknown subject/topic '{subject_name} / {topic_name}'")
+        return topic_id
+
+
+def parse_row(record, topics):
+    """Validate one spreadsheet row and return a ParsedQuestion, raising RowError if invalid."""
+    question_text = record.get('question', '')
+    if not question_text:
+        raise RowError('Question text is empty')
+
+    options = []
+    for column in OPTION_COLUMNS:
+        text = record.get(column, '')
+        if text:
+            options.append((column[-1].upper(), text))
+    if len(options) < 2:
+        raise RowError('At least two options are required')
+
+    keys = {key for key, _ in options}
+    answers = {answer.strip().upper() for answer in record.get('answer', '').split(',') if answer.strip()}
+    if not answers or not answers <= keys:
+        raise RowError(f"Answer '{record.get('answer', '')}' does not name a filled option")
+
+    difficulty = (record.get('difficulty') or 'medium').lower()
+    if difficulty not in DIFFICULTIES:
+        raise RowError(f"Unknown difficulty '{difficulty}'")
+    question_type = (record.get('question_type') or 'mcq').lower()
+    if question_type not in QUESTION_TYPES:
+        raise RowError(f"Unknown question type '{question_type}'")
+    try:
+        marks = int(record.get('marks') or 1)
+    except ValueError:
+        raise RowError(f"Marks '{record['marks']}' is not a whole number")
+    if not 1 <= marks <= 10:
+        raise RowError('Marks must be between 1 and 10')
+
+    return ParsedQuestion(
+        question_text=question_text,
+        options=[(text, key in answers) for key, text in options],
+        topic_id=topics.resolve(record.get('subject', ''), record.get('topic', '')),
+        difficulty=difficulty,
+        marks=marks,
+        explanation=record.get('explanation') or None,
+        question_type=question_type,
+    )
+
+
+def import_spreadsheet(job, path):
+    """Import the rows of an XLSX/CSV file at ``path`` into ``job``."""
+    try:
+        row_count, records = open_spreadsheet(path, job.source)
+    except RowError as e:
+        return _fail(job, str(e))
+    except Exception as e:
+        return _fail(job, f'Could not open spreadsheet: {e}')
+
+    _start(job, row_count)
+    topics = TopicLookup(job.topic_id)
+    progress = JobProgress(job)
+    rows_done = 0
+    try:
+        for row_number, record in records:
+            rows_done = row_number - 1
+            try:
+                progress.add(f'Row {row_number}', parse_row(record, topics))
+            except RowError as e:
+                progress.error(f'Row {row_number}: {e}')
+            if len(progress.pending) >= BATCH_SIZE:
+                progress.flush(rows_done)
+        progress.flush(max(rows_done, row_count))
+        if rows_done > row_count:
+            # The workbook did not record its dimensions, so the total was unknown.
+            QuestionImportJob.objects.filter(pk=job.pk).update(total_units=rows_done)
+    except Exception as e:
+        progress.error(f'Import aborted after row {rows_done + 1}: {e}')
+        progress.pending = []
+        progress.flush(rows_done)
+        _finish(job, 'failed')
+        job.refresh_from_db()
+        return job
+
+    _finish(job, 'completed')
+    job.refresh_from_db()
+    return job
+
+
+def run_spreadsheet_import(job_id):
+    """Run a pending XLSX/CSV QuestionImportJob to completion."""
+    job = QuestionImportJob.objects.get(pk=job_id)
+    return import_spreadsheet(job, job.file.path)
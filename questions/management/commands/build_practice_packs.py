@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from questions.practice_packs import build_all_packs
+
+
+class Command(BaseCommand):
+    help = 'Publish new offline practice pack versions for subjects whose questions changed.'
+
+    def handle(self, *args, **options):
+        published = build_all_packs()
+        self.stdout.write(self.style.SUCCESS(f'Published {published} practice packs.'))
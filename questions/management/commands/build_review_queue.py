@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from questions.answer_sheets import unpack
+from questions.models import BookmarkedQuestion, MockTestAttempt, QuestionAttempt, ReviewItem
+from questions.reviews import add_wrong_answers
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Queue historical wrong answers and bookmarks for spaced-repetition review.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        wrong_rows = QuestionAttempt.objects.filter(
+            is_correct=False, test_attempt__status='completed'
+        ).values_list('test_attempt__user_id', 'question_id').distinct()
+        for batch in batched(wrong_rows.iterator(chunk_size=batch_size), batch_size):
+            add_wrong_answers(batch)
+
+        # Attempts whose rows were dropped keep their answers only in the packed sheet.
+        packed_only = MockTestAttempt.objects.filter(status='completed', answer_sheet__isnull=False).exclude(
+            Exists(QuestionAttempt.objects.filter(test_attempt=OuterRef('pk')))
+        ).values_list('user_id', 'answer_sheet')
+        wrong_packed = (
+            (user_id, answer.question_id)
+            for user_id, sheet in packed_only.iterator(chunk_size=batch_size)
+            for answer in unpack(sheet) if answer.is_correct is False
+        )
+        for batch in batched(wrong_packed, batch_size):
+            add_wrong_answers(batch)
+
+        now = timezone.now()
+        bookmarks = BookmarkedQuestion.objects.values_list('user_id', 'question_id')
+        for batch in batched(bookmarks.iterator(chunk_size=batch_size), batch_size):
+            ReviewItem.objects.bulk_create([
+                ReviewItem(user_id=user_id, question_id=question_id, source='bookmark', due_at=now)
+                for user_id, question_id in batch
+            ], ignore_conflicts=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Review queue holds {ReviewItem.objects.count()} items.'))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from questions.models import Subject, Topic, Question, QuestionOption, MockTest, MockTestQuestion
+from questions.similarity import find_duplicates
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -19,32 +20,39 @@ class Command(BaseCommand):
             name='Algebra',
             defaults={'description': 'Algebra basics', 'difficulty_level': 'easy'}
         )
-        # Create questions
-        q1 = Question.objects.create(
-            topic=topic,
-            question_text='What is the value of x if 2x + 3 = 7?',
-            question_type='mcq',
-            difficulty='easy',
-            marks=1,
-            explanation='2x + 3 = 7 => 2x = 4 => x = 2.'
-        )
-        QuestionOption.objects.create(question=q1, option_text='1', is_correct=False, order=1)
-        QuestionOption.objects.create(question=q1, option_text='2', is_correct=True, order=2)
-        QuestionOption.objects.create(question=q1, option_text='3', is_correct=False, order=3)
-        QuestionOption.objects.create(question=q1, option_text='4', is_correct=False, order=4)
-
-        q2 = Question.objects.create(
-            topic=topic,
-            question_text='What is (a+b)^2?',
-            question_type='mcq',
-            difficulty='easy',
-            marks=1,
-            explanation='(a+b)^2 = a^2 + 2ab + b^2.'
-        )
-        QuestionOption.objects.create(question=q2, option_text='a^2 + b^2', is_correct=False, order=1)
-        QuestionOption.objects.create(question=q2, option_text='a^2 + 2ab + b^2', is_correct=True, order=2)
-        QuestionOption.objects.create(question=q2, option_text='a^2 - 2ab + b^2', is_correct=False, order=3)
-        QuestionOption.objects.create(question=q2, option_text='2a^2 + 2b^2', is_correct=False, order=4)
+        # Create questions, reusing existing near-duplicates so repeated runs don't grow the bank
+        demo_questions = [
+            {
+                'question_text': 'What is the value of x if 2x + 3 = 7?',
+                'explanation': '2x + 3 = 7 => 2x = 4 => x = 2.',
+                'options': [('1', False), ('2', True), ('3', False), ('4', False)],
+            },
+            {
+                'question_text': 'What is (a+b)^2?',
+                'explanation': '(a+b)^2 = a^2 + 2ab + b^2.',
+                'options': [('a^2 + b^2', False), ('a^2 + 2ab + b^2', True), ('a^2 - 2ab + b^2', False), ('2a^2 + 2b^2', False)],
+            },
+        ]
+        matches = find_duplicates([
+            (data['question_text'], [text for text, _ in data['options']]) for data in demo_questions
+        ])
+        questions = []
+        for data, match in zip(demo_questions, matches):
+            if match is not None and match.question_id is not None:
+                questions.append(Question.objects.get(pk=match.question_id))
+                continue
+            question = Question.objects.create(
+                topic=topic,
+                question_text=data['question_text'],
+                question_type='mcq',
+                difficulty='easy',
+                marks=1,
+                explanation=data['explanation']
+            )
+            for order, (text, is_correct) in enumerate(data['options'], start=1):
+                QuestionOption.objects.create(question=question, option_text=text, is_correct=is_correct, order=order)
+            questions.append(question)
+        q1, q2 = questions
 
         # Create a mock test
         mock_test = MockTest.objects.create(
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from questions.expiry import EXPIRY_ACTIONS, expire_overdue_attempts, expiry_action
+
+
+class Command(BaseCommand):
+    help = 'Grade or abandon in-progress mock test attempts that ran past their deadline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--action', choices=EXPIRY_ACTIONS, help='Defaults to settings.EXPIRED_ATTEMPT_ACTION.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        action = options['action'] or expiry_action()
+        expired = expire_overdue_attempts(batch_size=options['batch_size'], action=action)
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} overdue attempts ({action}).'))
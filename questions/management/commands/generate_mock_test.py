@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from questions.generator import BlueprintError, generate_mock_test
+from questions.models import MockTestBlueprint
+
+
+class Command(BaseCommand):
+    help = 'Generate a mock test from a stored blueprint or a blueprint JSON file.'
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--blueprint', type=int, help='Id of a MockTestBlueprint.')
+        source.add_argument('--file', help='Path to a JSON file with MockTestBlueprint fields.')
+        parser.add_argument('--name', help='Name of the generated mock test.')
+
+    def handle(self, *args, **options):
+        if options['blueprint']:
+            try:
+                blueprint = MockTestBlueprint.objects.get(pk=options['blueprint'])
+            except MockTestBlueprint.DoesNotExist:
+                raise CommandError(f"Blueprint {options['blueprint']} does not exist.")
+        else:
+            with open(options['file']) as f:
+                blueprint = MockTestBlueprint(**json.load(f))
+
+        try:
+            mock_test = generate_mock_test(blueprint, name=options['name'])
+        except BlueprintError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated '{mock_test.name}' (id {mock_test.id}) with {mock_test.total_questions} questions."
+        ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import User
+from questions.ingestion import import_spreadsheet, spreadsheet_source
+from questions.models import QuestionImportJob, Topic
+
+
+class Command(BaseCommand):
+    help = (
+        'Import questions from an XLSX or CSV file with one question per row. Columns: '
+        'subject, topic, question, option_a..option_e, answer (e.g. "B" or "A,C"), '
+        'and optionally difficulty, marks, explanation, question_type.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .xlsx or .csv file.')
+        parser.add_argument('--topic', type=int, help='Topic id for rows that leave subject and topic empty.')
+        parser.add_argument('--user', help='Email of the user recorded as the questions\' creator.')
+
+    def handle(self, *args, **options):
+        source = spreadsheet_source(options['path'])
+        if source is None:
+            raise CommandError('Only .xlsx and .csv files can be imported.')
+
+        topic = created_by = None
+        if options['topic']:
+            topic = Topic.objects.filter(pk=options['topic']).first()
+            if topic is None:
+                raise CommandError(f"Topic {options['topic']} does not exist.")
+        if options['user']:
+            created_by = User.objects.filter(email=options['user']).first()
+            if created_by is None:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        # The file is read in place rather than copied into media storage.
+        job = QuestionImportJob.objects.create(source=source, topic=topic, created_by=created_by)
+        job = import_spreadsheet(job, options['path'])
+
+        for error in job.errors[:20]:
+            self.stderr.write(error)
+        if job.error_count > 20:
+            self.stderr.write(f'... and {job.error_count - 20} more (see import job #{job.id}).')
+
+        message = f'Import job #{job.id} {job.status}: {job.imported_count} imported, {job.error_count} skipped.'
+        if job.status == 'failed':
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
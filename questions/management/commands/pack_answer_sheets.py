@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from questions.answer_sheets import PackedAnswer, pack
+from questions.grading import get_answer_key
+from questions.models import MockTestAttempt, QuestionAttempt
+
+
+class Command(BaseCommand):
+    help = 'Store packed answer sheets for graded attempts that predate them, optionally dropping their rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--drop-rows', action='store_true', help='Delete the QuestionAttempt rows once packed.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = MockTestAttempt.objects.filter(status='completed', answer_sheet__isnull=True)
+        packed = 0
+
+        while True:
+            attempts = list(pending.only('id', 'mock_test_id').order_by('id')[:batch_size])
+            if not attempts:
+                break
+
+            answers = {attempt.id: [] for attempt in attempts}
+            rows = QuestionAttempt.objects.filter(test_attempt__in=attempts).values_list(
+                'test_attempt_id', 'question_id', 'selected_option_id', 'is_correct',
+                'time_taken_seconds', 'is_marked_for_review',
+            )
+            for attempt_id, *answer in rows:
+                answers[attempt_id].append(PackedAnswer(*answer))
+
+            for attempt in attempts:
+                paper_order = {question_id: position for position, question_id in enumerate(get_answer_key(attempt.mock_test_id))}
+                attempt.answer_sheet = pack(sorted(
+                    answers[attempt.id], key=lambda answer: paper_order.get(answer.question_id, len(paper_order))
+                ))
+
+            with transaction.atomic():
+                MockTestAttempt.objects.bulk_update(attempts, ['answer_sheet'])
+                if options['drop_rows']:
+                    QuestionAttempt.objects.filter(test_attempt__in=attempts).delete()
+            packed += len(attempts)
+            self.stdout.write(f'Packed {packed} attempts...')
+
+        dropped = 0
+        if options['drop_rows']:
+            # Attempts graded with packing enabled may still have their rows.
+            packed_ids = MockTestAttempt.objects.filter(
+                status='completed', answer_sheet__isnull=False, question_attempts__isnull=False
+            ).values_list('id', flat=True).distinct()
+            while True:
+                batch = list(packed_ids[:batch_size])
+                if not batch:
+                    break
+                dropped += QuestionAttempt.objects.filter(test_attempt_id__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Packed answer sheets for {packed} attempts; dropped {dropped} rows of already packed attempts.'
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from questions.models import MockTest
+from questions.papers import publish_paper
+
+
+class Command(BaseCommand):
+    help = 'Build and cache published papers for active mock tests (run before a scheduled exam).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mock-test', type=int, action='append', dest='mock_test_ids',
+                            help='Only publish the given mock test id (repeatable).')
+
+    def handle(self, *args, **options):
+        mock_tests = MockTest.objects.filter(is_active=True)
+        if options['mock_test_ids']:
+            mock_tests = mock_tests.filter(id__in=options['mock_test_ids'])
+
+        for mock_test in mock_tests:
+            paper = publish_paper(mock_test)
+            self.stdout.write(f'{mock_test.name}: v{paper.version} ({paper.content_hash[:12]})')
+
+        self.stdout.write(self.style.SUCCESS('Papers published!'))
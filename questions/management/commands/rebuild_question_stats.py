@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from questions.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-question and per-option statistics from completed attempts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Question stats rebuilt for {count} questions.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from questions.models import Question
+from questions.similarity import index_questions
+
+
+class Command(BaseCommand):
+    help = 'Recompute MinHash fingerprints and LSH buckets for the question bank and flag near-duplicates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        question_ids = Question.objects.order_by('id').values_list('id', flat=True)
+        total = flagged = 0
+        last_id = 0
+
+        while True:
+            batch = list(question_ids.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            fingerprints = index_questions(batch)
+            total += len(fingerprints)
+            flagged += sum(1 for fingerprint in fingerprints if fingerprint.duplicate_of_id)
+            last_id = batch[-1]
+            self.stdout.write(f'Indexed {total} questions...')
+
+        self.stdout.write(self.style.SUCCESS(f'Similarity index rebuilt: {total} questions, {flagged} possible duplicates.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from questions.models import MockTestQuestion, Question
+from questions.regrade import BATCH_SIZE, regrade_questions
+
+
+class Command(BaseCommand):
+    help = 'Regrade completed attempts against the current answer keys of the given questions or mock tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('question_ids', nargs='*', type=int)
+        parser.add_argument('--mock-test', type=int, action='append', default=[], help='Regrade every question of this mock test.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        question_ids = set(options['question_ids'])
+        if options['mock_test']:
+            question_ids.update(
+                MockTestQuestion.objects.filter(mock_test_id__in=options['mock_test']).values_list('question_id', flat=True)
+            )
+        if not question_ids:
+            raise CommandError('Pass question ids or --mock-test.')
+        missing = question_ids - set(Question.objects.filter(id__in=question_ids).values_list('id', flat=True))
+        if missing:
+            raise CommandError(f"Unknown question ids: {', '.join(map(str, sorted(missing)))}")
+
+        def progress(summary):
+            self.stdout.write(f'Checked {summary.attempts_checked} attempts, {summary.attempts_changed} changed...')
+
+        summary = regrade_questions(question_ids, batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Regraded {summary.attempts_checked} attempts: {summary.attempts_changed} scores and '
+            f'{summary.answers_changed} answers changed (total score change {summary.score_change:+}).'
+        ))
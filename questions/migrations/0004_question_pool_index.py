@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0003_subject_field'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['topic', 'is_active', 'difficulty'], name='question_pool_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS questions_question_fts USING fts5(
+        question_text, explanation,
+        content='questions_question', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_question_fts_ai AFTER INSERT ON questions_question BEGIN
+        INSERT INTO questions_question_fts(rowid, question_text, explanation)
+        VALUES (new.id, new.question_text, coalesce(new.explanation, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_question_fts_ad AFTER DELETE ON questions_question BEGIN
+        INSERT INTO questions_question_fts(questions_question_fts, rowid, question_text, explanation)
+        VALUES ('delete', old.id, old.question_text, coalesce(old.explanation, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_question_fts_au AFTER UPDATE OF question_text, explanation ON questions_question BEGIN
+        INSERT INTO questions_question_fts(questions_question_fts, rowid, question_text, explanation)
+        VALUES ('delete', old.id, old.question_text, coalesce(old.explanation, ''));
+        INSERT INTO questions_question_fts(rowid, question_text, explanation)
+        VALUES (new.id, new.question_text, coalesce(new.explanation, ''));
+    END
+    """,
+    "INSERT INTO questions_question_fts(questions_question_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS questions_question_fts_au",
+    "DROP TRIGGER IF EXISTS questions_question_fts_ad",
+    "DROP TRIGGER IF EXISTS questions_question_fts_ai",
+    "DROP TABLE IF EXISTS questions_question_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE questions_question ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(question_text, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(explanation, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX questions_question_search_idx ON questions_question USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS questions_question_search_idx",
+    "ALTER TABLE questions_question DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_question_pool_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
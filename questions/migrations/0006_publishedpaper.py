@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0005_question_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedPaper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('payload', models.TextField()),
+                ('is_current', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('mock_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='published_papers', to='questions.mocktest')),
+            ],
+            options={
+                'ordering': ['mock_test', '-version'],
+                'unique_together': {('mock_test', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0007_questionimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionFingerprint',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='questions.question')),
+                ('signature', models.BinaryField()),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='questions.question')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionLSHBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_bands', to='questions.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'band'], name='question_lsh_bucket_idx')],
+                'unique_together': {('question', 'band')},
+            },
+        ),
+    ]
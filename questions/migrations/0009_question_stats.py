@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0008_question_similarity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionOptionStats',
+            fields=[
+                ('option', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='questions.questionoption')),
+                ('selections', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'question option stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='questions.question')),
+                ('attempts', models.IntegerField(default=0)),
+                ('correct_count', models.IntegerField(default=0)),
+                ('timed_attempts', models.IntegerField(default=0)),
+                ('total_time_seconds', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'question stats',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:37
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('questions', '0009_question_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MockTestBlueprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('test_type', models.CharField(choices=[('IOE', 'Institute of Engineering'), ('KU', 'Kathmandu University'), ('PU', 'Purbanchal University'), ('PoU', 'Pokhara University'), ('custom', 'Custom Test')], max_length=10)),
+                ('duration_minutes', models.IntegerField(validators=[django.core.validators.MinValueValidator(15), django.core.validators.MaxValueValidator(300)])),
+                ('passing_score', models.IntegerField(validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('is_free', models.BooleanField(default=False)),
+                ('price', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('sections', models.JSONField(default=list)),
+                ('total_marks', models.IntegerField(blank=True, help_text='Optional check against the sum of section marks', null=True)),
+                ('exclude_recent_days', models.PositiveIntegerField(default=30, help_text='Skip questions used in tests created this recently')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
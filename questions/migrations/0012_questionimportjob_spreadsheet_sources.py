@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0011_question_question_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionimportjob',
+            name='source',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel workbook'), ('csv', 'CSV')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0012_questionimportjob_spreadsheet_sources'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mocktestattempt',
+            index=models.Index(fields=['status', 'started_at'], name='attempt_status_started_idx'),
+        ),
+    ]
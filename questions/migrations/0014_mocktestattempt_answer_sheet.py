@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0013_mocktestattempt_status_started_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mocktestattempt',
+            name='answer_sheet',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0014_mocktestattempt_answer_sheet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mocktest',
+            name='shuffle',
+            field=models.BooleanField(default=True, help_text='Show questions and options in a different order to each attempt'),
+        ),
+        migrations.AddField(
+            model_name='mocktestattempt',
+            name='paper_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def retire_old_format_papers(apps, schema_editor):
+    # Papers published before the compact format are rebuilt on next open.
+    PublishedPaper = apps.get_model('questions', 'PublishedPaper')
+    PublishedPaper.objects.filter(is_current=True).exclude(payload__startswith='{"format":').update(is_current=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0015_attempt_paper_version_mocktest_shuffle'),
+    ]
+
+    operations = [
+        migrations.RunPython(retire_old_format_papers, migrations.RunPython.noop),
+    ]
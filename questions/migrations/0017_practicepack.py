@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0016_republish_compact_papers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PracticePack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('watermark', models.DateTimeField()),
+                ('question_count', models.IntegerField(default=0)),
+                ('payload', models.BinaryField()),
+                ('is_current', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['subject', '-version'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['topic', 'updated_at'], name='question_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='practicepack',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practice_packs', to='questions.subject'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='practicepack',
+            unique_together={('subject', 'version')},
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('questions', '0017_practicepack'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('wrong_answer', 'Wrong Answer'), ('bookmark', 'Bookmark')], max_length=15)),
+                ('ease_factor', models.FloatField(default=2.5)),
+                ('interval_days', models.IntegerField(default=0)),
+                ('repetitions', models.IntegerField(default=0)),
+                ('lapses', models.IntegerField(default=0)),
+                ('due_at', models.DateTimeField()),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='questions.question')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'due_at'], name='review_due_idx')],
+                'unique_together': {('user', 'question')},
+            },
+        ),
+    ]
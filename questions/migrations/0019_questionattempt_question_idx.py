@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0018_reviewitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionattempt',
+            index=models.Index(fields=['question', 'test_attempt'], name='question_attempt_question_idx'),
+        ),
+    ]
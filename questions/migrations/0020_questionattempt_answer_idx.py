@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0019_questionattempt_question_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionattempt',
+            index=models.Index(fields=['test_attempt', 'question', 'is_correct', 'time_taken_seconds'], name='question_attempt_answer_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0020_questionattempt_answer_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PracticePackTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.IntegerField()),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practice_pack_tombstones', to='questions.subject')),
+            ],
+            options={
+                'ordering': ['subject', 'removed_at'],
+                'indexes': [models.Index(fields=['subject', 'removed_at'], name='pack_tombstone_since_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -78,6 +79,11 @@ class Question(models.Model):
     
     class Meta:
         ordering = ['topic', 'difficulty', 'created_at']
+        indexes = [
+            models.Index(fields=['topic', 'is_active', 'difficulty'], name='question_pool_idx'),
+            models.Index(fields=['-created_at', '-id'], name='question_keyset_idx'),
+            models.Index(fields=['topic', 'updated_at'], name='question_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.topic.name} - {self.question_text[:50]}..."
@@ -115,6 +121,7 @@ class MockTest(models.Model):
     passing_score = models.IntegerField(validators=[MinValueValidator(0), MaxValueValidator(100)])
     is_free = models.BooleanField(default=False)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    shuffle = models.BooleanField(default=True, help_text="Show questions and options in a different order to each attempt")
     is_active = models.BooleanField(default=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -141,6 +148,60 @@ class MockTestQuestion(models.Model):
         return f"{self.mock_test.name} - Q{self.order}"
 
 
+class PublishedPaper(models.Model):
+    """Answer-free, pre-serialized snapshot of a MockTest as delivered to students."""
+    mock_test = models.ForeignKey(MockTest, on_delete=models.CASCADE, related_name='published_papers')
+    version = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64, db_index=True)
+    payload = models.TextField()
+    is_current = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['mock_test', '-version']
+        unique_together = ['mock_test', 'version']
+    
+    def __str__(self):
+        return f"{self.mock_test.name} - v{self.version}"
+
+
+class PracticePack(models.Model):
+    """Gzipped bundle of a subject's active questions, with answers, for offline practice."""
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='practice_packs')
+    version = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64)
+    watermark = models.DateTimeField()  # questions updated after this are served by delta sync
+    question_count = models.IntegerField(default=0)
+    payload = models.BinaryField()
+    is_current = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['subject', '-version']
+        unique_together = ['subject', 'version']
+    
+    def __str__(self):
+        return f"{self.subject.name} practice pack v{self.version}"
+    
+    @property
+    def size(self):
+        return len(self.payload)
+
+
+class PracticePackTombstone(models.Model):
+    """A question that left a subject (deleted or moved away), served as ``removed`` by delta sync."""
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='practice_pack_tombstones')
+    question_id = models.IntegerField()  # not a foreign key: the question may no longer exist
+    removed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['subject', 'removed_at']
+        indexes = [models.Index(fields=['subject', 'removed_at'], name='pack_tombstone_since_idx')]
+    
+    def __str__(self):
+        return f"{self.subject.name} - question {self.question_id} removed"
+
+
 class MockTestAttempt(models.Model):
     STATUS_CHOICES = [
         ('in_progress', 'In Progress'),
@@ -152,14 +213,19 @@ class MockTestAttempt(models.Model):
     mock_test = models.ForeignKey(MockTest, on_delete=models.CASCADE, related_name='attempts')
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    paper_version = models.PositiveIntegerField(null=True, blank=True)  # PublishedPaper version served to this attempt
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='in_progress')
     score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     total_marks = models.IntegerField(null=True, blank=True)
     accuracy_percentage = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     time_taken_minutes = models.IntegerField(null=True, blank=True)
+    answer_sheet = models.BinaryField(null=True, blank=True, editable=False)  # packed by questions.answer_sheets on grading
     
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['status', 'started_at'], name='attempt_status_started_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.mock_test.name} ({self.status})"
@@ -176,6 +242,15 @@ class QuestionAttempt(models.Model):
     
     class Meta:
         unique_together = ['test_attempt', 'question']
+        indexes = [
+            # Regrading finds the attempts that answered a question without scanning every answer.
+            models.Index(fields=['question', 'test_attempt'], name='question_attempt_question_idx'),
+            # Covers per-topic breakdowns: the grouped aggregate reads no QuestionAttempt row, only the index.
+            models.Index(
+                fields=['test_attempt', 'question', 'is_correct', 'time_taken_seconds'],
+                name='question_attempt_answer_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.test_attempt.id} - Q{self.question.id}"
@@ -191,3 +266,185 @@ class BookmarkedQuestion(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.question.id}"
+
+
+class ReviewItem(models.Model):
+    """A question in a user's spaced-repetition review queue (SM-2 scheduling)."""
+    SOURCE_CHOICES = [
+        ('wrong_answer', 'Wrong Answer'),
+        ('bookmark', 'Bookmark'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='review_items')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='+')
+    source = models.CharField(max_length=15, choices=SOURCE_CHOICES)
+    ease_factor = models.FloatField(default=2.5)
+    interval_days = models.IntegerField(default=0)
+    repetitions = models.IntegerField(default=0)
+    lapses = models.IntegerField(default=0)
+    due_at = models.DateTimeField()
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'question']
+        indexes = [
+            models.Index(fields=['user', 'due_at'], name='review_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - Q{self.question_id} due {self.due_at:%Y-%m-%d}"
+
+
+class QuestionImportJob(models.Model):
+    SOURCE_CHOICES = [
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel workbook'),
+        ('csv', 'CSV'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    MAX_ERRORS = 500
+    
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    file = models.FileField(upload_to='question_imports/')
+    topic = models.ForeignKey(Topic, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pending')
+    total_units = models.IntegerField(default=0)  # pages or rows, depending on source
+    processed_units = models.IntegerField(default=0)
+    imported_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.get_source_display()} import #{self.id} ({self.status})"
+    
+    @property
+    def progress_percentage(self):
+        if not self.total_units:
+            return 0
+        return round(self.processed_units / self.total_units * 100, 2)
+
+
+class QuestionFingerprint(models.Model):
+    """MinHash signature of a question's text and options, used for near-duplicate detection."""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint')
+    signature = models.BinaryField()
+    duplicate_of = models.ForeignKey(Question, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    similarity = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Fingerprint of Q{self.question_id}"
+
+
+class QuestionLSHBand(models.Model):
+    """One LSH band bucket of a question's MinHash signature."""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='lsh_bands')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+    
+    class Meta:
+        unique_together = ['question', 'band']
+        indexes = [
+            models.Index(fields=['bucket', 'band'], name='question_lsh_bucket_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Q{self.question_id} band {self.band}"
+
+
+class QuestionStats(models.Model):
+    """Running item statistics for a question, updated as attempts are graded."""
+    MIN_ATTEMPTS = 30  # below this the observed difficulty is not reported
+    
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    attempts = models.IntegerField(default=0)
+    correct_count = models.IntegerField(default=0)
+    timed_attempts = models.IntegerField(default=0)
+    total_time_seconds = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'question stats'
+    
+    def __str__(self):
+        return f"Stats for Q{self.question_id}"
+    
+    @property
+    def p_value(self):
+        """Share of attempts answered correctly (classical item difficulty)."""
+        return self.correct_count / self.attempts if self.attempts else None
+    
+    @property
+    def mean_time_seconds(self):
+        return self.total_time_seconds / self.timed_attempts if self.timed_attempts else None
+    
+    @property
+    def observed_difficulty(self):
+        if self.attempts < self.MIN_ATTEMPTS:
+            return None
+        if self.p_value >= 0.7:
+            return 'easy'
+        if self.p_value >= 0.4:
+            return 'medium'
+        return 'hard'
+
+
+class QuestionOptionStats(models.Model):
+    option = models.OneToOneField(QuestionOption, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    selections = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = 'question option stats'
+    
+    def __str__(self):
+        return f"Stats for option {self.option_id}"
+
+
+class MockTestBlueprint(models.Model):
+    """
+    Recipe for generating mock tests. ``sections`` is a list of
+    {"subject": id, "topic": id, "difficulty": "easy|medium|hard", "count": n, "marks": m};
+    subject, topic and difficulty are optional filters.
+    """
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    test_type = models.CharField(max_length=10, choices=MockTest.TEST_TYPE_CHOICES)
+    duration_minutes = models.IntegerField(validators=[MinValueValidator(15), MaxValueValidator(300)])
+    passing_score = models.IntegerField(validators=[MinValueValidator(0), MaxValueValidator(100)])
+    is_free = models.BooleanField(default=False)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    sections = models.JSONField(default=list)
+    total_marks = models.IntegerField(null=True, blank=True, help_text="Optional check against the sum of section marks")
+    exclude_recent_days = models.PositiveIntegerField(default=30, help_text="Skip questions used in tests created this recently")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_test_type_display()})"
+    
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .generator import BlueprintError, validate_sections
+        try:
+            validate_sections(self.sections, self.total_marks)
+        except BlueprintError as e:
+            raise ValidationError({'sections': str(e)})
@@ -0,0 +1,209 @@
+"""
+Published exam papers.
+
+A paper is the answer-free JSON a student receives when opening a MockTest. It
+is built once, stored as a PublishedPaper row and cached by content hash, so
+opening a test at exam start is a couple of cache reads rather than a walk
+over MockTestQuestion -> Question -> QuestionOption.
+
+Wire format (``PAPER_FORMAT``)::
+
+    {"format": 2,
+     "mock_test": {...},
+     "subjects": [[id, name], ...],
+     "topics": [[id, name, subject_index], ...],
+     "questions": [{"id", "order", "marks", "text", "type", "topic": topic_index,
+                    "options": [[option_id, text], ...]}, ...]}
+
+Subjects and topics appear once and are referenced by index, and nothing about
+correct answers or explanations is included. The paper is built from three
+``values_list`` queries without instantiating models or serializers.
+
+Signals mark the current paper stale when the test or any of its questions
+change; the next open rebuilds it, and a rebuild that produces identical
+content keeps the existing version.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import bump_version, versioned_key
+from .models import MockTest, MockTestQuestion, QuestionOption, Topic, PublishedPaper
+
+PAPER_TIMEOUT = 60 * 60 * 24  # 1 day
+PAPER_FORMAT = 2
+
+
+def _paper_namespace(mock_test_id):
+    return f'paper:{mock_test_id}'
+
+
+def _content_key(content_hash):
+    return f'questions:paper:content:{content_hash}'
+
+
+def build_paper(mock_test):
+    """Serialize a mock test into its canonical answer-free JSON text."""
+    slots = list(
+        MockTestQuestion.objects.filter(mock_test=mock_test).order_by('order').values_list(
+            'question_id', 'order', 'marks', 'question__question_text',
+            'question__question_type', 'question__topic_id',
+        )
+    )
+    question_ids = [slot[0] for slot in slots]
+
+    options = {question_id: [] for question_id in question_ids}
+    for question_id, option_id, text in QuestionOption.objects.filter(
+        question_id__in=question_ids
+    ).order_by('question_id', 'order', 'id').values_list('question_id', 'id', 'option_text'):
+        options[question_id].append([option_id, text])
+
+    subjects, topics = [], []
+    subject_index, topic_index = {}, {}
+    for topic_id, name, subject_id, subject_name in Topic.objects.filter(
+        id__in={slot[5] for slot in slots}
+    ).order_by('subject_id', 'id').values_list('id', 'name', 'subject_id', 'subject__name'):
+        if subject_id not in subject_index:
+            subject_index[subject_id] = len(subjects)
+            subjects.append([subject_id, subject_name])
+        topic_index[topic_id] = len(topics)
+        topics.append([topic_id, name, subject_index[subject_id]])
+
+    paper = {
+        'format': PAPER_FORMAT,
+        'mock_test': {
+            'id': mock_test.id,
+            'name': mock_test.name,
+            'test_type': mock_test.test_type,
+            'duration_minutes': mock_test.duration_minutes,
+            'total_questions': mock_test.total_questions,
+            'passing_score': mock_test.passing_score,
+        },
+        'subjects': subjects,
+        'topics': topics,
+        'questions': [
+            {
+                'id': question_id,
+                'order': order,
+                'marks': marks,
+                'text': text,
+                'type': question_type,
+                'topic': topic_index[topic_id],
+                'options': options[question_id],
+            }
+            for question_id, order, marks, text, question_type, topic_id in slots
+        ],
+    }
+    return json.dumps(paper, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def publish_paper(mock_test, if_missing=False):
+    """
+    Build the paper and store it as a new version if its content changed.
+
+    Publishing is serialized per mock test by locking its row, so concurrent
+    publishers never race for the same version number. With ``if_missing``
+    the current paper is rechecked under the lock and returned as is when
+    another request published it meanwhile, so only one request builds it.
+    """
+    with transaction.atomic():
+        MockTest.objects.select_for_update(of=('self',)).only('id').get(pk=mock_test.pk)
+        if if_missing:
+            pointer_key = _pointer_key(mock_test.pk)
+            current = PublishedPaper.objects.filter(mock_test=mock_test, is_current=True).first()
+            if current is not None:
+                _cache_paper(current, pointer_key)
+                return current
+
+        payload = build_paper(mock_test)
+        content_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        latest = PublishedPaper.objects.filter(mock_test=mock_test).order_by('-version').first()
+        if latest is not None and latest.content_hash == content_hash:
+            if not latest.is_current:
+                latest.is_current = True
+                latest.save(update_fields=['is_current'])
+            paper = latest
+        else:
+            PublishedPaper.objects.filter(mock_test=mock_test, is_current=True).update(is_current=False)
+            paper = PublishedPaper.objects.create(
+                mock_test=mock_test,
+                version=latest.version + 1 if latest else 1,
+                content_hash=content_hash,
+                payload=payload,
+            )
+
+    _cache_paper(paper)
+    return paper
+
+
+def _pointer_key(mock_test_id):
+    return versioned_key(_paper_namespace(mock_test_id), 'current', PAPER_FORMAT)
+
+
+def _cache_paper(paper, pointer_key=None):
+    """
+    Cache a paper and point the current-paper key at it. A publisher
+    overwrites the pointer. A reader passes the ``pointer_key`` it computed
+    before reading the database and only fills the pointer if it is still
+    empty, so a reader that loses a race with ``publish_paper`` or
+    ``invalidate_paper`` cannot write an older version back.
+    """
+    cache.set(_content_key(paper.content_hash), paper.payload, PAPER_TIMEOUT)
+    pointer = (paper.version, paper.content_hash)
+    if pointer_key is None:
+        cache.set(_pointer_key(paper.mock_test_id), pointer, PAPER_TIMEOUT)
+    else:
+        cache.add(pointer_key, pointer, PAPER_TIMEOUT)
+
+
+def invalidate_paper(mock_test_id):
+    PublishedPaper.objects.filter(mock_test_id=mock_test_id, is_current=True).update(is_current=False)
+    bump_version(_paper_namespace(mock_test_id))
+
+
+def get_paper_by_hash(content_hash):
+    payload = cache.get(_content_key(content_hash))
+    if payload is None:
+        paper = PublishedPaper.objects.filter(content_hash=content_hash).only('payload').first()
+        if paper is None:
+            return None
+        payload = paper.payload
+        cache.set(_content_key(content_hash), payload, PAPER_TIMEOUT)
+    return payload
+
+
+def get_current_paper(mock_test_id):
+    """
+    Return ``(version, content_hash, payload)`` for the current paper of a mock
+    test, publishing it first if it is missing or stale.
+    """
+    pointer_key = _pointer_key(mock_test_id)
+    pointer = cache.get(pointer_key)
+    if pointer is not None:
+        version, content_hash = pointer
+        payload = get_paper_by_hash(content_hash)
+        if payload is not None:
+            return version, content_hash, payload
+
+    paper = PublishedPaper.objects.filter(mock_test_id=mock_test_id, is_current=True).first()
+    if paper is None:
+        paper = publish_paper(MockTest.objects.get(pk=mock_test_id), if_missing=True)
+    else:
+        _cache_paper(paper, pointer_key)
+    return paper.version, paper.content_hash, paper.payload
+
+
+def get_paper_version(mock_test_id, version):
+    """Return ``(content_hash, payload)`` for a specific published version, or None."""
+    key = f'questions:paper:{mock_test_id}:v{version}'
+    content_hash = cache.get(key)
+    if content_hash is None:
+        paper = PublishedPaper.objects.filter(mock_test_id=mock_test_id, version=version).only('content_hash').first()
+        if paper is None:
+            return None
+        content_hash = paper.content_hash
+        cache.set(key, content_hash, PAPER_TIMEOUT)
+    payload = get_paper_by_hash(content_hash)
+    return None if payload is None else (content_hash, payload)
@@ -0,0 +1,171 @@
+"""
+Offline practice packs.
+
+A pack is a gzipped JSON bundle of every active question of a subject, with
+options, answers and explanations, built in the background and stored as a
+versioned PracticePack row. Clients download the current pack once, then keep
+it fresh with delta sync: questions changed since the client's watermark, by
+``Question.updated_at`` (option edits touch their question, see ``signals``).
+Questions deleted or moved to another subject leave a PracticePackTombstone
+in the subject they left, which delta sync reports as removed.
+
+Pack and delta bodies share one layout::
+
+    {"format": 1, "subject": [id, name], "version": n, "watermark": iso,
+     "topics": [[id, name], ...],
+     "questions": [{"id", "text", "type", "difficulty", "marks", "explanation",
+                    "topic": topic_index, "options": [[id, text, is_correct], ...]}],
+     "removed": [question_id, ...]}       # delta only
+
+``topics`` always lists the subject's active topics; a client drops questions
+whose topic is no longer listed.
+"""
+import gzip
+import hashlib
+import json
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Subject, Topic, Question, QuestionOption, PracticePack, PracticePackTombstone
+
+PACK_FORMAT = 1
+# Rows committed slightly after a sync read may carry an earlier updated_at;
+# watermarks trail the clock so such rows are picked up by the next sync.
+SYNC_LAG = timedelta(seconds=30)
+
+
+def _encode(body):
+    return json.dumps(body, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _topics(subject):
+    return list(
+        Topic.objects.filter(subject=subject, is_active=True).order_by('id').values_list('id', 'name')
+    )
+
+
+def _question_rows(questions, topic_index):
+    """Shape questions for the wire with two ``values_list`` queries."""
+    rows = list(questions.order_by('id').values_list(
+        'id', 'question_text', 'question_type', 'difficulty', 'marks', 'explanation', 'topic_id',
+    ))
+    options = {row[0]: [] for row in rows}
+    for question_id, option_id, text, is_correct in QuestionOption.objects.filter(
+        question_id__in=list(options)
+    ).order_by('question_id', 'order', 'id').values_list('question_id', 'id', 'option_text', 'is_correct'):
+        options[question_id].append([option_id, text, is_correct])
+
+    return [
+        {
+            'id': question_id,
+            'text': text,
+            'type': question_type,
+            'difficulty': difficulty,
+            'marks': marks,
+            'explanation': explanation,
+            'topic': topic_index[topic_id],
+            'options': options[question_id],
+        }
+        for question_id, text, question_type, difficulty, marks, explanation, topic_id in rows
+    ]
+
+
+def build_pack(subject):
+    """Publish a new pack version for ``subject`` if its content changed. Returns the current pack."""
+    watermark = timezone.now() - SYNC_LAG
+    topics = _topics(subject)
+    topic_index = {topic_id: index for index, (topic_id, _) in enumerate(topics)}
+    questions = _question_rows(
+        Question.objects.filter(topic_id__in=list(topic_index), is_active=True), topic_index
+    )
+
+    content = {'topics': topics, 'questions': questions}
+    content_hash = hashlib.sha256(_encode(content).encode('utf-8')).hexdigest()
+
+    with transaction.atomic():
+        latest = PracticePack.objects.select_for_update().filter(subject=subject).order_by('-version').first()
+        if latest is not None and latest.content_hash == content_hash:
+            return latest
+
+        version = latest.version + 1 if latest else 1
+        body = {
+            'format': PACK_FORMAT,
+            'subject': [subject.id, subject.name],
+            'version': version,
+            'watermark': format_watermark(watermark),
+            **content,
+        }
+        PracticePack.objects.filter(subject=subject, is_current=True).update(is_current=False)
+        return PracticePack.objects.create(
+            subject=subject,
+            version=version,
+            content_hash=content_hash,
+            watermark=watermark,
+            question_count=len(questions),
+            payload=gzip.compress(_encode(body).encode('utf-8'), compresslevel=9, mtime=0),
+        )
+
+
+def build_all_packs():
+    """Rebuild the pack of every active subject; returns how many got a new version."""
+    published = 0
+    for subject in Subject.objects.filter(is_active=True):
+        current = PracticePack.objects.filter(subject=subject, is_current=True).values_list('version', flat=True).first()
+        if build_pack(subject).version != current:
+            published += 1
+    return published
+
+
+def get_current_pack(subject_id):
+    return (
+        PracticePack.objects.filter(subject_id=subject_id, is_current=True)
+        .defer('payload').select_related('subject').first()
+    )
+
+
+def format_watermark(watermark):
+    # UTC with a 'Z' suffix, so the value survives being put in a query string unencoded.
+    return watermark.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def parse_watermark(value):
+    watermark = parse_datetime(value or '')
+    if watermark is None:
+        raise ValueError('since must be an ISO 8601 timestamp')
+    if timezone.is_naive(watermark):
+        watermark = timezone.make_aware(watermark, dt_timezone.utc)
+    return watermark
+
+
+def delta(subject, since):
+    """
+    Questions of ``subject`` changed after ``since``: active ones in full, and
+    deactivated, deleted or moved-away ones as ``removed`` ids. The returned
+    watermark is what the client sends next time.
+    """
+    now = timezone.now()
+    topics = _topics(subject)
+    topic_index = {topic_id: index for index, (topic_id, _) in enumerate(topics)}
+    changed = Question.objects.filter(topic__subject=subject, updated_at__gt=since)
+
+    questions = _question_rows(changed.filter(is_active=True, topic_id__in=list(topic_index)), topic_index)
+    removed = set(changed.filter(is_active=False).values_list('id', flat=True))
+    removed.update(PracticePackTombstone.objects.filter(
+        subject=subject, removed_at__gt=since,
+    ).values_list('question_id', flat=True))
+    # A question that moved away and back again is served in full instead.
+    removed.difference_update(question['id'] for question in questions)
+    pack = get_current_pack(subject.id)
+
+    return {
+        'format': PACK_FORMAT,
+        'subject': [subject.id, subject.name],
+        'version': pack.version if pack else None,
+        'watermark': format_watermark(max(since, now - SYNC_LAG)),
+        'topics': topics,
+        'questions': questions,
+        'removed': sorted(removed),
+    }
@@ -0,0 +1,64 @@
+"""
+Querysets shaped to match the nested serializers in ``serializers.py``.
+
+Each function loads exactly the relations its serializer walks, so serializing
+a page costs a fixed number of queries however many rows it contains. Keep
+these in step with the serializers when nesting changes.
+"""
+from django.db.models import Prefetch
+
+from .models import Question, Topic, MockTest, MockTestQuestion, MockTestAttempt, QuestionAttempt, BookmarkedQuestion, ReviewItem
+
+
+def topics():
+    """Topics for TopicSerializer (topic -> subject)."""
+    return Topic.objects.select_related('subject')
+
+
+def questions():
+    """Questions for QuestionSerializer (topic -> subject, options)."""
+    return Question.objects.select_related('topic__subject').prefetch_related('options')
+
+
+def test_questions():
+    """Paper rows for MockTestQuestionSerializer."""
+    return MockTestQuestion.objects.select_related('question__topic__subject').prefetch_related(
+        'question__options'
+    )
+
+
+def mock_tests():
+    """Mock tests for MockTestSerializer with their full paper."""
+    return MockTest.objects.prefetch_related(
+        Prefetch('test_questions', queryset=test_questions())
+    )
+
+
+def question_attempts():
+    """Answers for QuestionAttemptSerializer."""
+    return QuestionAttempt.objects.select_related(
+        'question__topic__subject', 'selected_option'
+    ).prefetch_related('question__options')
+
+
+def mock_test_attempts():
+    """
+    Attempts for MockTestAttemptSerializer (paper and every answer). Answer
+    rows are only loaded for attempts without a packed answer sheet.
+    """
+    return MockTestAttempt.objects.select_related('mock_test').prefetch_related(
+        Prefetch('mock_test__test_questions', queryset=test_questions()),
+        Prefetch('question_attempts', queryset=question_attempts().filter(test_attempt__answer_sheet__isnull=True)),
+    )
+
+
+def bookmarks():
+    """Bookmarks for BookmarkedQuestionSerializer."""
+    return BookmarkedQuestion.objects.select_related('question__topic__subject').prefetch_related(
+        'question__options'
+    ).order_by('-created_at')
+
+
+def review_items():
+    """Review queue entries for ReviewItemSerializer."""
+    return ReviewItem.objects.select_related('question__topic__subject').prefetch_related('question__options')
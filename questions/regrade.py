@@ -0,0 +1,196 @@
+"""
+Regrading after an answer key fix.
+
+When staff correct ``QuestionOption.is_correct``, every completed attempt that
+answered the affected questions is regraded. Each attempt is graded against
+the paper it was pinned to (its questions and marks, see
+``shuffling.pinned_paper``) with the current correct options, so unrelated
+edits to the mock test since then do not rescore it, and answers to questions
+that have left the paper stay on its sheet unchanged. Attempts are found
+through the ``(question, test_attempt)`` index on QuestionAttempt, plus, for
+attempts whose rows were dropped after packing, through the mock tests that
+contain the questions. Attempt ids are streamed and processed in batches, so
+memory stays bounded however many attempts are affected.
+
+Each batch reads the attempts, the answer rows of attempts without a packed
+sheet and the correct options of their pinned papers (the papers themselves
+come from the cache), then bulk updates the attempts, issues one UPDATE of
+``QuestionAttempt.is_correct`` per (question, new verdict), upserts the item
+statistics (old verdicts backed out with ``sign=-1``, new ones added) and
+queues newly wrong answers for review, which costs a statement per affected
+user. Receivers of ``attempts_regraded`` refresh anything else derived from
+scores.
+"""
+import json
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.dispatch import Signal
+
+from . import answer_sheets, reviews
+from .grading import AnswerKeyEntry, grade_answers, invalidate_answer_key
+from .models import MockTestAttempt, MockTestQuestion, QuestionAttempt, QuestionOption
+from .shuffling import pinned_paper
+from .stats import record_answers
+
+BATCH_SIZE = 500
+
+# Sent once per regraded batch with ``attempt_ids`` and ``user_ids`` of the attempts whose score changed.
+attempts_regraded = Signal()
+
+RegradeSummary = namedtuple('RegradeSummary', [
+    'attempts_checked', 'attempts_changed', 'answers_changed', 'score_change',
+])
+
+
+def affected_attempt_ids(question_ids):
+    """Yield the ids of completed attempts that may have answered ``question_ids``."""
+    with_rows = QuestionAttempt.objects.filter(
+        question_id__in=question_ids, test_attempt__status='completed'
+    ).order_by('test_attempt_id').values_list('test_attempt_id', flat=True).distinct()
+    yield from with_rows.iterator(chunk_size=BATCH_SIZE * 4)
+
+    packed_only = MockTestAttempt.objects.filter(
+        status='completed', answer_sheet__isnull=False,
+        mock_test_id__in=MockTestQuestion.objects.filter(question_id__in=question_ids).values('mock_test_id'),
+    ).exclude(
+        Exists(QuestionAttempt.objects.filter(test_attempt=OuterRef('pk')))
+    ).order_by('id').values_list('id', flat=True)
+    yield from packed_only.iterator(chunk_size=BATCH_SIZE * 4)
+
+
+def _batches(ids, size):
+    batch = []
+    for value in ids:
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _as_stats_rows(answers):
+    return [(a.question_id, a.selected_option_id, a.is_correct, a.time_taken_seconds) for a in answers]
+
+
+def _pinned_answer_keys(attempts):
+    """
+    Answer keys by ``(mock_test_id, paper_version)`` for ``attempts``: the
+    questions and marks of each pinned paper with the current correct options.
+    """
+    papers = {}
+    for attempt in attempts:
+        pin = (attempt.mock_test_id, attempt.paper_version)
+        if pin not in papers:
+            _, _, payload = pinned_paper(attempt)
+            papers[pin] = [(question['id'], question['marks']) for question in json.loads(payload)['questions']]
+
+    correct = defaultdict(set)
+    for question_id, option_id in QuestionOption.objects.filter(
+        question_id__in={question_id for slots in papers.values() for question_id, _ in slots}, is_correct=True,
+    ).values_list('question_id', 'id'):
+        correct[question_id].add(option_id)
+    return {
+        pin: {question_id: AnswerKeyEntry(frozenset(correct[question_id]), marks) for question_id, marks in slots}
+        for pin, slots in papers.items()
+    }
+
+
+def regrade_batch(attempt_ids):
+    """Regrade one batch of completed attempts; returns ``(checked, changed, answers_changed, score_change)``."""
+    attempts = list(
+        MockTestAttempt.objects.filter(pk__in=attempt_ids, status='completed').only(
+            'id', 'user_id', 'mock_test_id', 'paper_version', 'answer_sheet', 'score', 'total_marks',
+            'accuracy_percentage',
+        )
+    )
+    rows = {attempt.id: [] for attempt in attempts if not attempt.answer_sheet}
+    for attempt_id, *answer in QuestionAttempt.objects.filter(test_attempt_id__in=list(rows)).values_list(
+        'test_attempt_id', 'question_id', 'selected_option_id', 'is_correct',
+        'time_taken_seconds', 'is_marked_for_review',
+    ):
+        rows[attempt_id].append(answer_sheets.PackedAnswer(*answer))
+
+    answer_keys = _pinned_answer_keys(attempts)
+    changed = []
+    old_answers, new_answers = [], []
+    row_updates = defaultdict(list)
+    score_change = 0
+    for attempt in attempts:
+        answer_key = answer_keys[(attempt.mock_test_id, attempt.paper_version)]
+        if attempt.id in rows:
+            # Rows have no order of their own: paper order, then answers to questions no longer on it.
+            paper_order = {question_id: position for position, question_id in enumerate(answer_key)}
+            answers = sorted(
+                rows[attempt.id], key=lambda a: (paper_order.get(a.question_id, len(paper_order)), a.question_id)
+            )
+        else:
+            answers = answer_sheets.unpack(attempt.answer_sheet)
+        result, verdicts = grade_answers(answer_key, {a.question_id: a.selected_option_id for a in answers})
+
+        graded = []
+        for answer in answers:
+            verdict = verdicts.get(answer.question_id, answer.is_correct)
+            if verdict != answer.is_correct:
+                old_answers.append(answer)
+                answer = answer._replace(is_correct=verdict)
+                new_answers.append(answer)
+                row_updates[(answer.question_id, verdict)].append(attempt.id)
+            graded.append(answer)
+
+        old_score = float(attempt.score) if attempt.score is not None else None
+        if (old_score != result.score or attempt.total_marks != result.total_marks
+                or attempt.answer_sheet is None or graded != answers):
+            score_change += result.score - (old_score or 0)
+            attempt.score = result.score
+            attempt.total_marks = result.total_marks
+            attempt.accuracy_percentage = result.accuracy
+            attempt.answer_sheet = answer_sheets.pack(graded)
+            changed.append(attempt)
+
+    with transaction.atomic():
+        if changed:
+            MockTestAttempt.objects.bulk_update(
+                changed, ['score', 'total_marks', 'accuracy_percentage', 'answer_sheet']
+            )
+        for (question_id, verdict), ids in row_updates.items():
+            QuestionAttempt.objects.filter(test_attempt_id__in=ids, question_id=question_id).update(is_correct=verdict)
+        record_answers(_as_stats_rows(old_answers), sign=-1)
+        record_answers(_as_stats_rows(new_answers))
+        users = {attempt.id: attempt.user_id for attempt in attempts}
+        reviews.add_wrong_answers(
+            (users[attempt_id], question_id)
+            for (question_id, verdict), ids in row_updates.items() if verdict is False
+            for attempt_id in ids
+        )
+
+    if changed:
+        attempts_regraded.send(
+            sender=MockTestAttempt,
+            attempt_ids=[attempt.id for attempt in changed],
+            user_ids={attempt.user_id for attempt in changed},
+        )
+    return len(attempts), len(changed), len(new_answers), score_change
+
+
+def regrade_questions(question_ids, batch_size=BATCH_SIZE, progress=None):
+    """
+    Regrade every completed attempt that answered any of ``question_ids`` and
+    return a RegradeSummary. ``progress``, when given, is called with the
+    running summary after each batch.
+    """
+    question_ids = sorted(set(question_ids))
+    # Keys are already invalidated by the option signals; this also covers bulk updates that bypass them.
+    for mock_test_id in MockTestQuestion.objects.filter(
+        question_id__in=question_ids
+    ).values_list('mock_test_id', flat=True).distinct():
+        invalidate_answer_key(mock_test_id)
+
+    summary = RegradeSummary(0, 0, 0, 0.0)
+    for batch in _batches(affected_attempt_ids(question_ids), batch_size):
+        summary = RegradeSummary(*(total + part for total, part in zip(summary, regrade_batch(batch))))
+        if progress:
+            progress(summary)
+    return summary._replace(score_change=round(summary.score_change, 2))
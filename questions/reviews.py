@@ -0,0 +1,93 @@
+"""
+Spaced-repetition review queue.
+
+Questions a user answered wrongly, or bookmarked, become ReviewItems scheduled
+with SM-2: each review is graded 0-5, a grade below 3 restarts the item at a
+one-day interval, and otherwise the interval grows by the item's ease factor.
+The due set is read with one range query on the ``(user, due_at)`` index, so
+its cost does not depend on how long the user's answer history is.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import querysets
+from .models import ReviewItem
+
+MIN_EASE_FACTOR = 1.3
+PASSING_QUALITY = 3
+
+
+def schedule(item, quality, now=None):
+    """Apply one SM-2 review of ``quality`` (0-5) to ``item`` in place."""
+    now = now or timezone.now()
+    if quality < PASSING_QUALITY:
+        item.repetitions = 0
+        item.interval_days = 1
+        item.lapses += 1
+    else:
+        if item.repetitions == 0:
+            item.interval_days = 1
+        elif item.repetitions == 1:
+            item.interval_days = 6
+        else:
+            item.interval_days = round(item.interval_days * item.ease_factor)
+        item.repetitions += 1
+
+    item.ease_factor = max(
+        MIN_EASE_FACTOR,
+        item.ease_factor + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02),
+    )
+    item.due_at = now + timedelta(days=item.interval_days)
+    item.last_reviewed_at = now
+    return item
+
+
+def review(item, quality):
+    schedule(item, quality)
+    item.save(update_fields=['ease_factor', 'interval_days', 'repetitions', 'lapses', 'due_at', 'last_reviewed_at'])
+    return item
+
+
+def add_wrong_answers(pairs):
+    """
+    Queue ``(user_id, question_id)`` pairs that were just answered wrongly.
+    New pairs are due now; pairs already queued are pulled forward to now and
+    restart their repetitions, keeping their ease factor.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        ReviewItem.objects.bulk_create(
+            [ReviewItem(user_id=user_id, question_id=question_id, source='wrong_answer', due_at=now)
+             for user_id, question_id in pairs],
+            ignore_conflicts=True,
+        )
+        by_user = {}
+        for user_id, question_id in pairs:
+            by_user.setdefault(user_id, []).append(question_id)
+        for user_id, question_ids in by_user.items():
+            queued = ReviewItem.objects.filter(user_id=user_id, question_id__in=question_ids)
+            # Bookmarked items become wrong answers even when already due, so
+            # removing the bookmark later keeps them queued.
+            queued.filter(source='bookmark').update(source='wrong_answer')
+            queued.filter(due_at__gt=now).update(due_at=now, repetitions=0, interval_days=0)
+
+
+def add_bookmark(user_id, question_id):
+    ReviewItem.objects.get_or_create(
+        user_id=user_id, question_id=question_id,
+        defaults={'source': 'bookmark', 'due_at': timezone.now()},
+    )
+
+
+def remove_bookmark(user_id, question_id):
+    # Questions the user got wrong stay queued after the bookmark is removed.
+    ReviewItem.objects.filter(user_id=user_id, question_id=question_id, source='bookmark').delete()
+
+
+def due_items(user, limit=20, now=None):
+    return querysets.review_items().filter(user=user, due_at__lte=now or timezone.now()).order_by('due_at')[:limit]
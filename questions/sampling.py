@@ -0,0 +1,111 @@
+"""
+Random question sampling for practice sessions.
+
+Active question ids are kept in per-process pools keyed by
+``(subject, topic, difficulty)``. A pool is rebuilt with a single indexed
+``values_list`` query whenever the shared question bank version changes
+(bumped by signals on Question/Topic writes), so drawing k questions costs
+O(k) plus one primary-key fetch instead of ``ORDER BY RANDOM()`` over the
+whole subject.
+"""
+import random
+import threading
+
+from django.core.cache import cache
+
+from .caching import get_version, bump_version
+from .models import Question
+
+QUESTION_BANK_NAMESPACE = 'question_bank'
+RECENTLY_SEEN_LIMIT = 200
+RECENTLY_SEEN_TIMEOUT = 60 * 60 * 24 * 7  # 1 week
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def invalidate_question_pools():
+    """Mark every cached pool stale, e.g. after a bulk import."""
+    bump_version(QUESTION_BANK_NAMESPACE)
+
+
+def _build_pool(subject_id, topic_id=None, difficulty=None):
+    queryset = Question.objects.filter(
+        topic__subject_id=subject_id, topic__is_active=True, is_active=True
+    )
+    if topic_id is not None:
+        queryset = queryset.filter(topic_id=topic_id)
+    if difficulty is not None:
+        queryset = queryset.filter(difficulty=difficulty)
+    return list(queryset.order_by().values_list('id', flat=True))
+
+
+def get_pool(subject_id, topic_id=None, difficulty=None):
+    """Return the list of active question ids for a pool key."""
+    key = (subject_id, topic_id, difficulty)
+    version = get_version(QUESTION_BANK_NAMESPACE)
+
+    cached = _pools.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    pool = _build_pool(subject_id, topic_id, difficulty)
+    with _pools_lock:
+        _pools[key] = (version, pool)
+    return pool
+
+
+def _seen_key(user_id, subject_id):
+    return f'questions:practice:seen:{user_id}:{subject_id}'
+
+
+def get_recently_seen(user_id, subject_id):
+    return cache.get(_seen_key(user_id, subject_id), [])
+
+
+def mark_seen(user_id, subject_id, question_ids):
+    seen = get_recently_seen(user_id, subject_id)
+    seen = (seen + list(question_ids))[-RECENTLY_SEEN_LIMIT:]
+    cache.set(_seen_key(user_id, subject_id), seen, RECENTLY_SEEN_TIMEOUT)
+
+
+def sample_ids(pool, k, exclude=()):
+    """
+    Draw up to ``k`` distinct ids from ``pool``, preferring ids not in
+    ``exclude``. Cost is O(k + len(exclude)), independent of the pool size.
+    """
+    if not pool or k <= 0:
+        return []
+
+    exclude = set(exclude)
+    draw = random.sample(pool, min(len(pool), k + len(exclude)))
+    fresh = [question_id for question_id in draw if question_id not in exclude]
+    if len(fresh) >= k:
+        return fresh[:k]
+
+    # Not enough unseen questions left in the pool: top up with seen ones.
+    stale = [question_id for question_id in draw if question_id in exclude]
+    return fresh + stale[:k - len(fresh)]
+
+
+def sample_questions(subject_id, k=10, topic_id=None, difficulty=None, user=None):
+    """
+    Return ``k`` random active questions with topic, subject and options loaded.
+
+    When ``user`` is given, questions the user practised recently are avoided
+    while the pool still has fresh ones, and the drawn ids are recorded.
+    """
+    pool = get_pool(subject_id, topic_id, difficulty)
+    exclude = get_recently_seen(user.id, subject_id) if user is not None else ()
+    ids = sample_ids(pool, k, exclude)
+    if not ids:
+        return []
+
+    questions = Question.objects.filter(id__in=ids).select_related(
+        'topic__subject'
+    ).prefetch_related('options')
+    by_id = {question.id: question for question in questions}
+
+    if user is not None:
+        mark_seen(user.id, subject_id, ids)
+    return [by_id[question_id] for question_id in ids if question_id in by_id]
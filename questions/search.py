@@ -0,0 +1,90 @@
+"""
+Ranked full-text search over the question bank.
+
+The index itself lives in the database and is maintained there (see migration
+0005): an FTS5 external-content table kept in sync by triggers on SQLite, and a
+generated ``tsvector`` column with a GIN index on PostgreSQL. Both therefore
+follow every write to ``questions_question``, including ``bulk_create``.
+"""
+from django.db import connections
+from rest_framework.filters import SearchFilter
+
+FTS_TABLE = 'questions_question_fts'
+
+
+class SQLiteFTSBackend:
+    def is_available(self, connection):
+        return FTS_TABLE in connection.introspection.table_names()
+
+    def build_query(self, terms):
+        # Quote every term so user input is never parsed as FTS5 syntax, and
+        # allow prefix matches ("thermo" finds "thermodynamics").
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, terms):
+        return queryset.extra(
+            select={'search_rank': f'bm25({FTS_TABLE}, 2.0, 1.0)'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = questions_question.id', f'{FTS_TABLE} MATCH %s'],
+            params=[self.build_query(terms)],
+        ).order_by('search_rank')
+
+
+class PostgresFTSBackend:
+    def is_available(self, connection):
+        columns = connection.introspection.get_table_description(
+            connection.cursor(), 'questions_question'
+        )
+        return any(column.name == 'search_vector' for column in columns)
+
+    def build_query(self, terms):
+        return ' '.join(terms)
+
+    def search(self, queryset, terms):
+        tsquery = "websearch_to_tsquery('english', %s)"
+        query = self.build_query(terms)
+        return queryset.extra(
+            select={'search_rank': f'ts_rank_cd(questions_question.search_vector, {tsquery})'},
+            select_params=[query],
+            where=[f'questions_question.search_vector @@ {tsquery}'],
+            params=[query],
+        ).order_by('-search_rank')
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend(),
+    'postgresql': PostgresFTSBackend(),
+}
+
+_availability = {}
+
+
+def get_search_backend(using='default'):
+    """Return the full-text backend for a database alias, or None if unsupported."""
+    connection = connections[using]
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return None
+    if using not in _availability:
+        _availability[using] = backend.is_available(connection)
+    return backend if _availability[using] else None
+
+
+class QuestionSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on Question querysets.
+
+    Uses the ``search`` query parameter as before, but answers it from the
+    full-text index ordered by relevance. Falls back to the stock substring
+    search when the database has no index.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        backend = get_search_backend(queryset.db)
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        return backend.search(queryset, terms)
@@ -1,8 +1,25 @@
 from rest_framework import serializers
 from .models import (
     Question, QuestionOption, Subject, Topic, MockTest, MockTestQuestion,
-    MockTestAttempt, QuestionAttempt, BookmarkedQuestion
+    MockTestAttempt, QuestionAttempt, BookmarkedQuestion, QuestionImportJob, PracticePack,
+    ReviewItem
 )
+from .answer_sheets import as_question_attempts
+from .ingestion import spreadsheet_source
+
+
+def shows_answers(context, attempt=None):
+    """
+    Whether a paper serialized with ``context`` may reveal correct options and
+    explanations: to staff, for a completed ``attempt``, or when the view
+    decided so by setting ``show_answers``.
+    """
+    if 'show_answers' in context:
+        return context['show_answers']
+    if attempt is not None and attempt.status == 'completed':
+        return True
+    request = context.get('request')
+    return bool(request and request.user.is_staff)
 
 
 class QuestionOptionSerializer(serializers.ModelSerializer):
@@ -11,6 +28,13 @@ class QuestionOptionSerializer(serializers.ModelSerializer):
         fields = ['id', 'option_text', 'is_correct']
 
 
+class StudentQuestionOptionSerializer(serializers.ModelSerializer):
+    """An option as shown while a test is being taken: no answer."""
+    class Meta:
+        model = QuestionOption
+        fields = ['id', 'option_text']
+
+
 class SubjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subject
@@ -27,7 +51,6 @@ class TopicSerializer(serializers.ModelSerializer):
 
 class QuestionSerializer(serializers.ModelSerializer):
     options = QuestionOptionSerializer(many=True, read_only=True)
-    subject = SubjectSerializer(read_only=True)
     topic = TopicSerializer(read_only=True)
     
     class Meta:
@@ -39,17 +62,28 @@ class QuestionSerializer(serializers.ModelSerializer):
         ]
 
 
+class StudentQuestionSerializer(QuestionSerializer):
+    """A question as shown while a test is being taken: no correct option or explanation."""
+    options = StudentQuestionOptionSerializer(many=True, read_only=True)
+    
+    class Meta(QuestionSerializer.Meta):
+        fields = [field for field in QuestionSerializer.Meta.fields if field != 'explanation']
+
+
 class MockTestQuestionSerializer(serializers.ModelSerializer):
     question = QuestionSerializer(read_only=True)
     
     class Meta:
         model = MockTestQuestion
-        fields = ['id', 'question', 'order', 'points']
+        fields = ['id', 'question', 'order', 'marks']
+
+
+class StudentMockTestQuestionSerializer(MockTestQuestionSerializer):
+    question = StudentQuestionSerializer(read_only=True)
 
 
 class MockTestSerializer(serializers.ModelSerializer):
-    questions = MockTestQuestionSerializer(many=True, read_only=True)
-    subject = SubjectSerializer(read_only=True)
+    questions = MockTestQuestionSerializer(source='test_questions', many=True, read_only=True)
     
     class Meta:
         model = MockTest
@@ -58,6 +92,12 @@ class MockTestSerializer(serializers.ModelSerializer):
             'total_questions', 'passing_score', 'is_free', 'price',
             'is_active', 'questions', 'created_at', 'updated_at'
         ]
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not shows_answers(self.context):
+            fields['questions'] = StudentMockTestQuestionSerializer(source='test_questions', many=True, read_only=True)
+        return fields
 
 
 class QuestionAttemptSerializer(serializers.ModelSerializer):
@@ -68,20 +108,44 @@ class QuestionAttemptSerializer(serializers.ModelSerializer):
         model = QuestionAttempt
         fields = [
             'id', 'question', 'selected_option', 'is_correct',
-            'time_taken_seconds', 'created_at'
+            'time_taken_seconds', 'is_marked_for_review', 'answered_at'
         ]
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not shows_answers(self.context):
+            fields['question'] = StudentQuestionSerializer(read_only=True)
+            fields['selected_option'] = StudentQuestionOptionSerializer(read_only=True)
+        return fields
 
 
 class MockTestAttemptSerializer(serializers.ModelSerializer):
-    mock_test = MockTestSerializer(read_only=True)
-    question_attempts = QuestionAttemptSerializer(many=True, read_only=True)
+    # Answers are revealed per attempt, so the nested trees are built per object.
+    mock_test = serializers.SerializerMethodField()
+    question_attempts = serializers.SerializerMethodField()
     
     class Meta:
         model = MockTestAttempt
         fields = [
             'id', 'user', 'mock_test', 'started_at', 'completed_at',
-            'status', 'score', 'question_attempts', 'created_at'
+            'status', 'score', 'total_marks', 'accuracy_percentage',
+            'time_taken_minutes', 'question_attempts'
         ]
+    
+    def _answers_context(self, obj):
+        return {**self.context, 'show_answers': shows_answers(self.context, obj)}
+    
+    def get_mock_test(self, obj):
+        return MockTestSerializer(obj.mock_test, context=self._answers_context(obj)).data
+    
+    def get_question_attempts(self, obj):
+        if obj.answer_sheet:
+            # Graded attempts are rebuilt from the packed sheet and the already loaded paper.
+            questions = {tq.question_id: tq.question for tq in obj.mock_test.test_questions.all()}
+            question_attempts = as_question_attempts(obj, questions)
+        else:
+            question_attempts = obj.question_attempts.all()
+        return QuestionAttemptSerializer(question_attempts, many=True, context=self._answers_context(obj)).data
 
 
 class BookmarkedQuestionSerializer(serializers.ModelSerializer):
@@ -90,3 +154,73 @@ class BookmarkedQuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = BookmarkedQuestion
         fields = ['id', 'question', 'created_at']
+
+
+class AnswerEntrySerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    selected_option = serializers.IntegerField(required=False, allow_null=True)
+    option_index = serializers.IntegerField(required=False, allow_null=True, min_value=0)  # position as displayed
+    time_taken_seconds = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    is_marked_for_review = serializers.BooleanField(required=False, default=False)
+    
+    def validate(self, data):
+        if data.get('selected_option') is not None and data.get('option_index') is not None:
+            raise serializers.ValidationError('Send either selected_option or option_index, not both.')
+        return data
+
+
+class AnswerSheetSerializer(serializers.Serializer):
+    answers = AnswerEntrySerializer(many=True, allow_empty=False)
+    
+    def validate_answers(self, value):
+        if len(value) > 200:
+            raise serializers.ValidationError('A batch can contain at most 200 answers.')
+        question_ids = [answer['question'] for answer in value]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError('Each question may appear only once per batch.')
+        return value
+
+
+class QuestionImportJobSerializer(serializers.ModelSerializer):
+    progress_percentage = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = QuestionImportJob
+        fields = [
+            'id', 'source', 'topic', 'status', 'total_units', 'processed_units',
+            'progress_percentage', 'imported_count', 'error_count', 'errors',
+            'created_at', 'started_at', 'finished_at'
+        ]
+
+
+class SpreadsheetUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    topic = serializers.PrimaryKeyRelatedField(queryset=Topic.objects.all(), required=False, allow_null=True)
+    
+    def validate_file(self, value):
+        if spreadsheet_source(value.name) is None:
+            raise serializers.ValidationError("Upload an .xlsx or .csv file.")
+        return value
+
+
+class PracticePackSerializer(serializers.ModelSerializer):
+    subject_name = serializers.CharField(source='subject.name', read_only=True)
+    
+    class Meta:
+        model = PracticePack
+        fields = ['id', 'subject', 'subject_name', 'version', 'watermark', 'question_count', 'created_at']
+
+
+class ReviewItemSerializer(serializers.ModelSerializer):
+    question = QuestionSerializer(read_only=True)
+    
+    class Meta:
+        model = ReviewItem
+        fields = [
+            'id', 'question', 'source', 'ease_factor', 'interval_days', 'repetitions',
+            'lapses', 'due_at', 'last_reviewed_at'
+        ]
+
+
+class ReviewGradeSerializer(serializers.Serializer):
+    quality = serializers.IntegerField(min_value=0, max_value=5, help_text="0 = blackout ... 5 = perfect recall")
@@ -0,0 +1,106 @@
+"""
+Per-attempt question and option order.
+
+Each attempt sees the published paper in an order derived from a seed of
+``(attempt id, paper version)``; nothing about the order is stored. The same
+seed reproduces the same permutation, so answers given by displayed position
+can be mapped back to canonical QuestionOption ids. Shuffling a paper is a
+single Fisher-Yates pass over its questions and over each question's options.
+"""
+import hashlib
+import json
+import random
+
+from .answers import AnswerSheetError
+from .papers import get_current_paper, get_paper_version
+
+
+def _option_id_getter(paper):
+    # Format 1 papers, which attempts started before the compact format may
+    # still be pinned to, store options as {"id", "option_text"} objects.
+    if paper.get('format', 1) == 1:
+        return lambda option: option['id']
+    return lambda option: option[0]
+
+
+def _rng(attempt_id, paper_version, salt=''):
+    digest = hashlib.blake2b(f'{attempt_id}:{paper_version}:{salt}'.encode('ascii'), digest_size=8).digest()
+    return random.Random(int.from_bytes(digest, 'little'))
+
+
+def permutation(length, attempt_id, paper_version, salt=''):
+    """Return a list of ``range(length)`` indices in this attempt's order."""
+    order = list(range(length))
+    _rng(attempt_id, paper_version, salt).shuffle(order)
+    return order
+
+
+def _option_order(question, attempt_id, paper_version):
+    return permutation(len(question['options']), attempt_id, paper_version, question['id'])
+
+
+def shuffle_paper(paper, attempt_id, paper_version):
+    """Return a copy of a decoded paper with questions and options in the attempt's order."""
+    questions = paper['questions']
+    shuffled = []
+    for position, index in enumerate(permutation(len(questions), attempt_id, paper_version), start=1):
+        question = dict(questions[index])
+        options = question['options']
+        question['options'] = [options[i] for i in _option_order(question, attempt_id, paper_version)]
+        question['order'] = position
+        shuffled.append(question)
+    return {**paper, 'questions': shuffled}
+
+
+def pinned_paper(attempt):
+    """
+    ``(version, content_hash, payload)`` of the version the attempt started
+    on, or of the current paper if that version is gone or unrecorded.
+    """
+    found = attempt.paper_version and get_paper_version(attempt.mock_test_id, attempt.paper_version)
+    if found:
+        return (attempt.paper_version, *found)
+    return get_current_paper(attempt.mock_test_id)
+
+
+def attempt_payload(attempt, version, payload):
+    """The JSON text of a pinned paper as this attempt sees it."""
+    if not attempt.mock_test.shuffle:
+        return payload
+    paper = shuffle_paper(json.loads(payload), attempt.id, version)
+    return json.dumps(paper, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def resolve_option_indexes(attempt, answers):
+    """
+    Replace ``option_index`` (a position as displayed to this attempt) with the
+    canonical ``selected_option`` id in each answer that uses it.
+    """
+    if not any(answer.get('option_index') is not None for answer in answers):
+        return answers
+
+    version, _, payload = pinned_paper(attempt)
+    paper = json.loads(payload)
+    option_id = _option_id_getter(paper)
+    questions = {question['id']: question for question in paper['questions']}
+    errors = {}
+    resolved = []
+    for answer in answers:
+        answer = dict(answer)
+        index = answer.pop('option_index', None)
+        if index is not None:
+            question = questions.get(answer['question'])
+            if question is None:
+                errors[answer['question']] = 'Question is not part of this mock test.'
+                continue
+            if index >= len(question['options']):
+                errors[answer['question']] = 'Option index is out of range.'
+                continue
+            if attempt.mock_test.shuffle:
+                index = _option_order(question, attempt.id, version)[index]
+            answer['selected_option'] = option_id(question['options'][index])
+        resolved.append(answer)
+
+    if errors:
+        raise AnswerSheetError(errors)
+    return resolved
@@ -0,0 +1,115 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .grading import invalidate_answer_key
+from .models import Subject, Topic, Question, QuestionOption, MockTest, MockTestQuestion, PracticePackTombstone
+from .papers import invalidate_paper
+from .sampling import invalidate_question_pools
+from .similarity import index_questions
+
+
+def _deleted_via_cascade(kwargs, sender):
+    origin = kwargs.get('origin')
+    return origin is not None and getattr(origin, 'model', type(origin)) is not sender
+
+
+def _mock_tests_using(**question_filter):
+    return MockTestQuestion.objects.filter(**question_filter).values_list(
+        'mock_test_id', flat=True
+    ).distinct()
+
+
+@receiver([post_save, post_delete], sender=Topic)
+@receiver([post_save, post_delete], sender=Question)
+def question_bank_changed(sender, instance, **kwargs):
+    invalidate_question_pools()
+
+
+@receiver(post_save, sender=Subject)
+def subject_changed(sender, instance, **kwargs):
+    for mock_test_id in _mock_tests_using(question__topic__subject_id=instance.id):
+        invalidate_paper(mock_test_id)
+
+
+@receiver(post_save, sender=Topic)
+def topic_changed(sender, instance, **kwargs):
+    for mock_test_id in _mock_tests_using(question__topic_id=instance.id):
+        invalidate_paper(mock_test_id)
+
+
+@receiver(post_save, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    for mock_test_id in _mock_tests_using(question_id=instance.id):
+        invalidate_paper(mock_test_id)
+
+
+@receiver(post_save, sender=MockTest)
+def mock_test_changed(sender, instance, **kwargs):
+    invalidate_paper(instance.id)
+
+
+@receiver([post_save, post_delete], sender=MockTestQuestion)
+def mock_test_question_changed(sender, instance, **kwargs):
+    invalidate_answer_key(instance.mock_test_id)
+    invalidate_paper(instance.mock_test_id)
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def question_option_changed(sender, instance, **kwargs):
+    for mock_test_id in _mock_tests_using(question_id=instance.question_id):
+        invalidate_answer_key(mock_test_id)
+        invalidate_paper(mock_test_id)
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_questions([instance.id])
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def reindex_question_options(sender, instance, raw=False, **kwargs):
+    if raw or _deleted_via_cascade(kwargs, sender):
+        return
+    index_questions([instance.question_id])
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def touch_question(sender, instance, raw=False, **kwargs):
+    # Practice pack delta sync keys on Question.updated_at, so option edits must move it.
+    if raw or _deleted_via_cascade(kwargs, sender):
+        return
+    Question.objects.filter(pk=instance.question_id).update(updated_at=timezone.now())
+
+
+def _subject_of_topic(topic_id):
+    return Topic.objects.filter(pk=topic_id).values_list('subject_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_subject(sender, instance, raw=False, **kwargs):
+    # Delta sync only looks at a subject's current questions; a question moved
+    # to another subject needs a tombstone in the old one, written after the save.
+    if raw or instance.pk is None:
+        return
+    previous = Question.objects.filter(pk=instance.pk).values_list('topic_id', 'topic__subject_id').first()
+    if previous is not None and previous[0] != instance.topic_id:
+        instance._previous_subject_id = previous[1]
+
+
+@receiver(post_save, sender=Question)
+def tombstone_moved_question(sender, instance, raw=False, **kwargs):
+    previous_subject_id = instance.__dict__.pop('_previous_subject_id', None)
+    if raw or previous_subject_id is None:
+        return
+    if previous_subject_id != _subject_of_topic(instance.topic_id):
+        PracticePackTombstone.objects.create(subject_id=previous_subject_id, question_id=instance.id)
+
+
+@receiver(pre_delete, sender=Question)
+def tombstone_deleted_question(sender, instance, **kwargs):
+    subject_id = _subject_of_topic(instance.topic_id)
+    if subject_id is not None:
+        PracticePackTombstone.objects.create(subject_id=subject_id, question_id=instance.id)
@@ -0,0 +1,209 @@
+"""
+Near-duplicate detection for the question bank.
+
+Each question is reduced to a MinHash signature over word shingles of its text
+and options. The signature is split into LSH bands whose bucket hashes are
+stored in an indexed table, so finding candidates for a new question is a
+single indexed lookup instead of a pairwise scan; candidates are then
+confirmed by comparing full signatures.
+
+With 16 bands of 4 rows, pairs above roughly 0.5 Jaccard similarity become
+candidates, and only those at or above ``DUPLICATE_THRESHOLD`` are reported.
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import namedtuple
+
+from django.db import transaction
+
+from .models import Question, QuestionFingerprint, QuestionLSHBand
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.8
+LOOKUP_CHUNK_SIZE = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240901)  # fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+_SIGNATURE_FORMAT = f'<{NUM_PERMUTATIONS}I'
+_WORD_RE = re.compile(r'\w+')
+
+Match = namedtuple('Match', ['question_id', 'batch_index', 'similarity'])
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingles(question_text, option_texts=()):
+    """Word 3-grams of the normalised question text followed by its options."""
+    words = _WORD_RE.findall(' '.join([question_text, *sorted(option_texts)]).lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(question_text, option_texts=()):
+    hashes = [_hash64(shingle) for shingle in shingles(question_text, option_texts)]
+    prime, mask = _MERSENNE_PRIME, _MAX_HASH
+    return tuple(
+        min([((a * h + b) % prime) & mask for h in hashes])
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERMUTATIONS
+
+
+def band_buckets(sig):
+    """Return ``[(band, bucket)]`` with buckets folded into a signed 64-bit int."""
+    buckets = []
+    for band in range(BANDS):
+        rows = sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<{ROWS_PER_BAND}I', *rows), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+
+def pack_signature(sig):
+    return struct.pack(_SIGNATURE_FORMAT, *sig)
+
+
+def unpack_signature(data):
+    return struct.unpack(_SIGNATURE_FORMAT, bytes(data))
+
+
+def _candidates(signatures, exclude_ids=()):
+    """Map each signature index to the set of stored question ids sharing a band bucket."""
+    wanted = {}
+    for index, sig in enumerate(signatures):
+        for band_bucket in band_buckets(sig):
+            wanted.setdefault(band_bucket, []).append(index)
+
+    candidates = {index: set() for index in range(len(signatures))}
+    buckets = list({bucket for _, bucket in wanted})
+    for start in range(0, len(buckets), LOOKUP_CHUNK_SIZE):
+        rows = QuestionLSHBand.objects.filter(
+            bucket__in=buckets[start:start + LOOKUP_CHUNK_SIZE]
+        ).values_list('band', 'bucket', 'question_id')
+        for band, bucket, question_id in rows:
+            if question_id in exclude_ids:
+                continue
+            for index in wanted.get((band, bucket), ()):
+                candidates[index].add(question_id)
+    return candidates
+
+
+def _stored_signatures(question_ids):
+    rows = QuestionFingerprint.objects.filter(question_id__in=question_ids).values_list('question_id', 'signature')
+    return {question_id: unpack_signature(data) for question_id, data in rows}
+
+
+def find_duplicates(items, threshold=DUPLICATE_THRESHOLD, exclude_ids=(), signatures=None):
+    """
+    Check a batch of ``(question_text, option_texts)`` against the bank and
+    against earlier items of the same batch. Callers that already hold the
+    items' signatures can pass them to avoid recomputing them.
+
+    Returns one entry per item: None, or a Match naming either a stored
+    ``question_id`` or the ``batch_index`` of an earlier item in the batch.
+    """
+    if signatures is None:
+        signatures = [signature(text, options) for text, options in items]
+    candidates = _candidates(signatures, set(exclude_ids))
+    stored = _stored_signatures({qid for ids in candidates.values() for qid in ids})
+
+    batch_buckets = {}
+    matches = []
+    for index, sig in enumerate(signatures):
+        best = None
+        for question_id in candidates[index]:
+            score = similarity(sig, stored[question_id]) if question_id in stored else 0
+            if score >= threshold and (best is None or score > best.similarity):
+                best = Match(question_id, None, score)
+
+        earlier = set()
+        for band_bucket in band_buckets(sig):
+            earlier.update(batch_buckets.setdefault(band_bucket, []))
+            batch_buckets[band_bucket].append(index)
+        for other in earlier:
+            score = similarity(sig, signatures[other])
+            if score >= threshold and (best is None or score > best.similarity):
+                best = Match(None, other, score)
+
+        matches.append(best)
+    return matches
+
+
+def index_questions(question_ids, flag_duplicates=True, known_signatures=None):
+    """
+    (Re)compute fingerprints and LSH bands for the given questions. When
+    ``flag_duplicates`` is set, each question's closest older near-duplicate
+    is recorded on its fingerprint. ``known_signatures`` maps question ids to
+    signatures computed from their current text, which are used as-is.
+    """
+    question_ids = list(question_ids)
+    if not question_ids:
+        return []
+
+    computed = dict(known_signatures or {})
+    missing = [question_id for question_id in question_ids if question_id not in computed]
+    if missing:
+        questions = Question.objects.filter(id__in=missing).prefetch_related('options')
+        for question in questions:
+            computed[question.id] = signature(question.question_text, [o.option_text for o in question.options.all()])
+
+    ids = sorted(question_id for question_id in set(question_ids) if question_id in computed)
+    signatures = [computed[question_id] for question_id in ids]
+    fingerprints = [
+        QuestionFingerprint(question_id=question_id, signature=pack_signature(sig))
+        for question_id, sig in zip(ids, signatures)
+    ]
+
+    if flag_duplicates:
+        candidates = _candidates(signatures)
+        stored = _stored_signatures({qid for c in candidates.values() for qid in c})
+        stored.update(zip(ids, signatures))
+        batch_buckets = {}
+        for index, fingerprint in enumerate(fingerprints):
+            question_id = ids[index]
+            for band_bucket in band_buckets(signatures[index]):
+                candidates[index].update(batch_buckets.setdefault(band_bucket, []))
+                batch_buckets[band_bucket].append(question_id)
+
+            best_id, best_score = None, 0
+            for other_id in candidates[index]:
+                # Only an older question can be the original; the newer one is the copy.
+                if other_id >= question_id or other_id not in stored:
+                    continue
+                score = similarity(signatures[index], stored[other_id])
+                if score >= DUPLICATE_THRESHOLD and score > best_score:
+                    best_id, best_score = other_id, score
+            fingerprint.duplicate_of_id = best_id
+            fingerprint.similarity = best_score if best_id else None
+
+    with transaction.atomic():
+        QuestionLSHBand.objects.filter(question_id__in=ids).delete()
+        QuestionFingerprint.objects.bulk_create(
+            fingerprints,
+            update_conflicts=True,
+            unique_fields=['question'],
+            update_fields=['signature', 'duplicate_of', 'similarity', 'updated_at'],
+        )
+        QuestionLSHBand.objects.bulk_create([
+            QuestionLSHBand(question_id=question_id, band=band, bucket=bucket)
+            for question_id, sig in zip(ids, signatures)
+            for band, bucket in band_buckets(sig)
+        ])
+    return fingerprints
@@ -0,0 +1,159 @@
+"""
+Incrementally maintained item statistics.
+
+Grading produces per-question and per-option deltas which are folded into
+QuestionStats / QuestionOptionStats with one ``INSERT ... ON CONFLICT DO
+UPDATE`` statement each (supported by both SQLite and PostgreSQL), so
+recording an attempt costs a constant number of queries. Deltas may be
+negative, which lets a regrade back out an earlier verdict.
+"""
+from collections import Counter, defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from .answer_sheets import unpack
+from .models import MockTestAttempt, QuestionAttempt, QuestionStats, QuestionOptionStats
+
+UPSERT_CHUNK_SIZE = 200
+
+
+def upsert_increments(model, key_columns, columns, rows, maximum_columns=()):
+    """
+    Add ``rows`` of ``(*key, *deltas, *maximums)`` onto ``model``, creating
+    missing rows. ``key_columns`` is a column name or a tuple of them and must
+    match a unique constraint of the table; ``maximum_columns`` keep the
+    larger of the stored and the new value instead of adding.
+    """
+    if isinstance(key_columns, str):
+        key_columns = (key_columns,)
+    table = model._meta.db_table
+    extra_columns = ['updated_at'] if any(f.name == 'updated_at' for f in model._meta.fields) else []
+    insert_columns = [*key_columns, *columns, *maximum_columns, *extra_columns]
+    placeholders = '(' + ', '.join(['%s'] * len(insert_columns)) + ')'
+    greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+    assignments = [f'{column} = {table}.{column} + excluded.{column}' for column in columns]
+    assignments += [f'{column} = {greatest}({table}.{column}, excluded.{column})' for column in maximum_columns]
+    assignments += [f'{column} = excluded.{column}' for column in extra_columns]
+    now = [timezone.now()] if extra_columns else []
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            params = [value for row in chunk for value in (*row, *now)]
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(insert_columns)}) '
+                f'VALUES {", ".join([placeholders] * len(chunk))} '
+                f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {", ".join(assignments)}',
+                params,
+            )
+
+
+def attempt_deltas(answers, sign=1):
+    """
+    Turn ``(question_id, selected_option_id, is_correct, time_taken_seconds)``
+    tuples into ``(question_deltas, option_deltas)``. Unanswered questions do
+    not count as attempts.
+    """
+    questions = defaultdict(lambda: [0, 0, 0, 0])
+    options = Counter()
+    for question_id, option_id, is_correct, time_taken in answers:
+        if option_id is None:
+            continue
+        delta = questions[question_id]
+        delta[0] += sign
+        if is_correct:
+            delta[1] += sign
+        if time_taken is not None:
+            delta[2] += sign
+            delta[3] += sign * time_taken
+        options[option_id] += sign
+    return dict(questions), dict(options)
+
+
+def apply_deltas(question_deltas, option_deltas):
+    with transaction.atomic():
+        if question_deltas:
+            upsert_increments(
+                QuestionStats, 'question_id',
+                ['attempts', 'correct_count', 'timed_attempts', 'total_time_seconds'],
+                [(question_id, *delta) for question_id, delta in question_deltas.items()],
+            )
+        if option_deltas:
+            upsert_increments(
+                QuestionOptionStats, 'option_id', ['selections'],
+                [(option_id, delta) for option_id, delta in option_deltas.items() if delta],
+            )
+
+
+def record_answers(answers, sign=1):
+    """Fold graded answers into the running statistics."""
+    apply_deltas(*attempt_deltas(answers, sign))
+
+
+def _packed_only_deltas(batch_size):
+    """Deltas from completed attempts whose answers survive only as a packed sheet."""
+    attempts = MockTestAttempt.objects.filter(
+        status='completed', answer_sheet__isnull=False,
+    ).exclude(
+        Exists(QuestionAttempt.objects.filter(test_attempt=OuterRef('pk')))
+    ).order_by().values_list('answer_sheet', flat=True)
+
+    questions = defaultdict(lambda: [0, 0, 0, 0])
+    options = Counter()
+    for sheet in attempts.iterator(chunk_size=batch_size):
+        question_deltas, option_deltas = attempt_deltas(
+            (a.question_id, a.selected_option_id, a.is_correct, a.time_taken_seconds) for a in unpack(sheet)
+        )
+        for question_id, delta in question_deltas.items():
+            questions[question_id] = [total + d for total, d in zip(questions[question_id], delta)]
+        options.update(option_deltas)
+    return dict(questions), dict(options)
+
+
+def rebuild_stats(batch_size=1000):
+    """
+    Recompute all statistics from completed attempts: grouped queries over
+    answer rows, plus the packed sheets of attempts whose rows were dropped.
+    """
+    graded = QuestionAttempt.objects.filter(
+        test_attempt__status='completed', selected_option__isnull=False
+    ).order_by()
+    question_rows = graded.values('question_id').annotate(
+        attempts=Count('id'),
+        correct_count=Count('id', filter=Q(is_correct=True)),
+        timed_attempts=Count('time_taken_seconds'),
+        total_time_seconds=Sum('time_taken_seconds'),
+    )
+    option_rows = graded.values('selected_option_id').annotate(selections=Count('id'))
+
+    with transaction.atomic():
+        QuestionStats.objects.all().delete()
+        QuestionOptionStats.objects.all().delete()
+
+        batch = []
+        for row in question_rows.iterator(chunk_size=batch_size):
+            batch.append(QuestionStats(
+                question_id=row['question_id'],
+                attempts=row['attempts'],
+                correct_count=row['correct_count'],
+                timed_attempts=row['timed_attempts'],
+                total_time_seconds=row['total_time_seconds'] or 0,
+            ))
+            if len(batch) >= batch_size:
+                QuestionStats.objects.bulk_create(batch)
+                batch = []
+        QuestionStats.objects.bulk_create(batch)
+
+        batch = []
+        for row in option_rows.iterator(chunk_size=batch_size):
+            batch.append(QuestionOptionStats(option_id=row['selected_option_id'], selections=row['selections']))
+            if len(batch) >= batch_size:
+                QuestionOptionStats.objects.bulk_create(batch)
+                batch = []
+        QuestionOptionStats.objects.bulk_create(batch)
+
+        apply_deltas(*_packed_only_deltas(batch_size))
+
+    return QuestionStats.objects.count()
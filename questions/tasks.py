@@ -0,0 +1,51 @@
+from celery import shared_task
+
+from . import expiry
+from .autosave import flush_all
+from .practice_packs import build_all_packs
+from .ingestion import run_pdf_import, run_spreadsheet_import
+from .regrade import regrade_questions
+
+
+@shared_task
+def import_questions_from_pdf(job_id):
+    """Run a queued PDF question import job"""
+    job = run_pdf_import(job_id)
+    return f"Import job {job.id} {job.status}: {job.imported_count} imported, {job.error_count} errors"
+
+
+@shared_task
+def import_questions_from_spreadsheet(job_id):
+    """Run a queued XLSX/CSV question import job"""
+    job = run_spreadsheet_import(job_id)
+    return f"Import job {job.id} {job.status}: {job.imported_count} imported, {job.error_count} errors"
+
+
+@shared_task(ignore_result=True)
+def flush_autosaved_answers():
+    """Write buffered answers of in-progress attempts to the database"""
+    return flush_all()
+
+
+@shared_task
+def expire_overdue_attempts():
+    """Grade or abandon in-progress attempts that ran past their deadline"""
+    expired = expiry.expire_overdue_attempts()
+    return f"Expired {expired} overdue attempts"
+
+
+@shared_task
+def build_practice_packs():
+    """Publish new offline practice pack versions for subjects whose questions changed"""
+    published = build_all_packs()
+    return f"Published {published} practice packs"
+
+
+@shared_task
+def regrade_questions_task(question_ids):
+    """Regrade completed attempts after the answer key of some questions changed"""
+    summary = regrade_questions(question_ids)
+    return (
+        f"Regraded {summary.attempts_checked} attempts: {summary.attempts_changed} scores and "
+        f"{summary.answers_changed} answers changed (total score change {summary.score_change:+})"
+    )
@@ -0,0 +1,586 @@
+import json
+import struct
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from analytics.models import LeaderboardEntry, UserDailyStats
+from . import autosave, reviews
+from .answer_sheets import MAX_TIME, PackedAnswer, attempt_answers, pack, unpack
+from .caching import LockTimeout, acquire_lock, release_lock
+from .expiry import expire_overdue_attempts
+from .grading import AnswerKeyEntry, get_answer_key, grade_answers, grade_attempt
+from .papers import _cache_paper, _pointer_key, get_current_paper
+from .regrade import regrade_questions
+from .shuffling import _option_order, resolve_option_indexes
+from .models import (
+    Subject, Topic, Question, QuestionOption, MockTest, MockTestQuestion,
+    MockTestAttempt, QuestionAttempt, BookmarkedQuestion, PublishedPaper, QuestionStats, ReviewItem
+)
+
+
+class QueryCountTestMixin:
+    """
+    Asserts that an endpoint issues the same number of queries however many
+    rows it returns. ``grow`` is called between the two requests to add data.
+    """
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, grow):
+        before = self.count_queries(url)
+        grow()
+        after = self.count_queries(url)
+        self.assertEqual(before, after, f'{url} issued {before} queries before growth and {after} after')
+
+
+class SerializerQueryCountTests(QueryCountTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='student@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.mock_test = MockTest.objects.create(
+            name='IOE Mock', description='Mock', test_type='IOE',
+            duration_minutes=120, total_questions=100, passing_score=40
+        )
+        self.attempt = MockTestAttempt.objects.create(user=self.user, mock_test=self.mock_test)
+        self.add_questions(2)
+
+    def add_questions(self, count):
+        for _ in range(count):
+            subject = Subject.objects.create(name=f'Subject {Subject.objects.count()}', description='')
+            topic = Topic.objects.create(subject=subject, name='Topic', description='')
+            question = Question.objects.create(topic=topic, question_text='Question?')
+            options = [
+                QuestionOption.objects.create(question=question, option_text=f'Option {i}', order=i, is_correct=i == 0)
+                for i in range(4)
+            ]
+            MockTestQuestion.objects.create(
+                mock_test=self.mock_test, question=question,
+                order=MockTestQuestion.objects.count() + 1
+            )
+            QuestionAttempt.objects.create(test_attempt=self.attempt, question=question, selected_option=options[0])
+            BookmarkedQuestion.objects.create(user=self.user, question=question)
+
+    def grow(self):
+        self.add_questions(5)
+
+    def test_question_list(self):
+        self.assertConstantQueries('/api/questions/', self.grow)
+
+    def test_topic_list(self):
+        self.assertConstantQueries('/api/questions/topics/', self.grow)
+
+    def test_mock_test_list(self):
+        self.assertConstantQueries('/api/questions/mock-tests/', self.grow)
+
+    def test_mock_test_detail(self):
+        self.assertConstantQueries(f'/api/questions/mock-tests/{self.mock_test.id}/', self.grow)
+
+    def test_attempt_detail(self):
+        self.assertConstantQueries(f'/api/questions/attempts/{self.attempt.id}/', self.grow)
+
+    def test_attempt_list(self):
+        self.assertConstantQueries('/api/questions/attempts/', self.grow)
+
+    def test_bookmarks(self):
+        self.assertConstantQueries('/api/questions/bookmarked/', self.grow)
+
+
+class PaperFixtureMixin:
+    def create_paper(self, question_count=2):
+        self.user = User.objects.create_user(email='student@example.com', password='pass')
+        self.mock_test = MockTest.objects.create(
+            name='IOE Mock', description='Mock', test_type='IOE',
+            duration_minutes=120, total_questions=question_count, passing_score=40
+        )
+        subject = Subject.objects.create(name='Physics', description='')
+        topic = Topic.objects.create(subject=subject, name='Optics', description='')
+        self.questions = []
+        for order in range(1, question_count + 1):
+            question = Question.objects.create(topic=topic, question_text=f'Question {order}?')
+            question.option_list = [
+                QuestionOption.objects.create(question=question, option_text=f'Option {i}', order=i, is_correct=i == 0)
+                for i in range(4)
+            ]
+            MockTestQuestion.objects.create(mock_test=self.mock_test, question=question, order=order)
+            self.questions.append(question)
+        self.attempt = MockTestAttempt.objects.create(user=self.user, mock_test=self.mock_test)
+
+
+@override_settings(ANSWER_AUTOSAVE_FLUSH_SECONDS=3600)
+class AutosaveBufferTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper()
+        # Warm the answer key so validation in another thread needs no database access.
+        get_answer_key(self.mock_test.id)
+
+    def answer(self, question, option_index=None, seconds=None):
+        return {
+            'question': question.id,
+            'selected_option': None if option_index is None else question.option_list[option_index].id,
+            'time_taken_seconds': seconds,
+        }
+
+    def stored(self):
+        return dict(
+            QuestionAttempt.objects.filter(test_attempt=self.attempt).values_list('question_id', 'time_taken_seconds')
+        )
+
+    def pending(self):
+        return cache.get(autosave._buffer_key(self.attempt.id))['pending']
+
+    def test_later_answers_replace_pending_ones(self):
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 0, seconds=5)])
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 1, seconds=9)])
+        self.assertEqual(autosave.flush_attempt(self.attempt.id), 1)
+        self.assertEqual(self.stored(), {self.questions[0].id: 9})
+        self.assertEqual(self.pending(), {})
+
+    def test_save_during_flush_is_kept(self):
+        question = self.questions[1]
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 0, seconds=5)])
+        real_upsert = autosave.upsert_answers
+        saver = threading.Thread(
+            target=autosave.buffer_answers, args=(self.attempt, [self.answer(question, seconds=7)])
+        )
+
+        def upsert_while_saving(attempt_answers):
+            # Another request saves while the flush is between reading and clearing the buffer.
+            saver.start()
+            saver.join(0.2)
+            self.assertTrue(saver.is_alive(), 'the save should wait for the flush lock')
+            return real_upsert(attempt_answers)
+
+        with mock.patch.object(autosave, 'upsert_answers', side_effect=upsert_while_saving):
+            self.assertEqual(autosave.flush_attempt(self.attempt.id), 1)
+        saver.join()
+
+        self.assertEqual(list(self.pending()), [question.id])
+        autosave.flush_attempt(self.attempt.id)
+        self.assertEqual(self.stored(), {self.questions[0].id: 5, question.id: 7})
+
+    def test_concurrent_saves_do_not_overwrite_each_other(self):
+        savers = [
+            threading.Thread(target=autosave.buffer_answers, args=(self.attempt, [self.answer(question, seconds=i)]))
+            for i, question in enumerate(self.questions)
+        ]
+        for saver in savers:
+            saver.start()
+        for saver in savers:
+            saver.join()
+        self.assertEqual(set(self.pending()), {question.id for question in self.questions})
+
+    def test_flush_all_skips_locked_buffers(self):
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 0, seconds=5)])
+        token = acquire_lock(autosave._lock_name(self.attempt.id))
+        try:
+            self.assertEqual(autosave.flush_all(), 0)
+        finally:
+            release_lock(autosave._lock_name(self.attempt.id), token)
+        self.assertEqual(list(self.pending()), [self.questions[0].id])
+
+        self.assertEqual(autosave.flush_all(), 1)
+        self.assertEqual(self.stored(), {self.questions[0].id: 5})
+        self.assertEqual(self.pending(), {})
+
+    def test_submit_grades_buffered_answers(self):
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 0, seconds=5)])
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(f'/api/questions/mock-tests/{self.attempt.id}/submit/')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['correct_answers'], 1)
+        self.assertIsNone(cache.get(autosave._buffer_key(self.attempt.id)))
+
+    def test_submit_with_busy_buffer_asks_to_retry(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(autosave, 'cache_lock', side_effect=LockTimeout('busy')):
+            response = client.post(f'/api/questions/mock-tests/{self.attempt.id}/submit/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(MockTestAttempt.objects.get(pk=self.attempt.pk).status, 'in_progress')
+
+    def test_expiry_sweep_skips_locked_buffers(self):
+        MockTestAttempt.objects.filter(pk=self.attempt.pk).update(started_at=timezone.now() - timedelta(days=1))
+        autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 0, seconds=5)])
+        token = acquire_lock(autosave._lock_name(self.attempt.id))
+        try:
+            self.assertEqual(expire_overdue_attempts(action='grade'), 0)
+        finally:
+            release_lock(autosave._lock_name(self.attempt.id), token)
+        self.assertEqual(MockTestAttempt.objects.get(pk=self.attempt.pk).status, 'in_progress')
+
+        self.assertEqual(expire_overdue_attempts(action='grade'), 1)
+        attempt = MockTestAttempt.objects.get(pk=self.attempt.pk)
+        self.assertEqual(attempt.status, 'completed')
+        self.assertEqual(attempt_answers(attempt)[0].time_taken_seconds, 5)
+
+    def test_overdue_buffer_flushes_inline(self):
+        with override_settings(ANSWER_AUTOSAVE_FLUSH_SECONDS=0):
+            autosave.buffer_answers(self.attempt, [self.answer(self.questions[0], 2, seconds=3)])
+        self.assertEqual(self.stored(), {self.questions[0].id: 3})
+        self.assertEqual(self.pending(), {})
+
+
+class OptionIndexTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper()
+
+    def expected_option(self, question, index, version):
+        return question.option_list[_option_order({'id': question.id, 'options': question.option_list}, self.attempt.id, version)[index]].id
+
+    def test_current_format(self):
+        version, _, _ = get_current_paper(self.mock_test.id)
+        self.attempt.paper_version = version
+        question = self.questions[0]
+        resolved = resolve_option_indexes(self.attempt, [{'question': question.id, 'option_index': 2}])
+        self.assertEqual(resolved, [{'question': question.id, 'selected_option': self.expected_option(question, 2, version)}])
+
+    def test_format_1_pinned_paper(self):
+        # A paper published before the compact format, as pinned by an older attempt.
+        payload = json.dumps({
+            'mock_test': {'id': self.mock_test.id, 'name': self.mock_test.name},
+            'questions': [
+                {
+                    'id': question.id, 'order': order, 'marks': 1, 'question_text': question.question_text,
+                    'options': [{'id': option.id, 'option_text': option.option_text} for option in question.option_list],
+                }
+                for order, question in enumerate(self.questions, start=1)
+            ],
+        })
+        PublishedPaper.objects.create(mock_test=self.mock_test, version=7, content_hash='f' * 64, payload=payload, is_current=False)
+        self.attempt.paper_version = 7
+        question = self.questions[1]
+        resolved = resolve_option_indexes(self.attempt, [{'question': question.id, 'option_index': 3}])
+        self.assertEqual(resolved, [{'question': question.id, 'selected_option': self.expected_option(question, 3, 7)}])
+
+
+class AnswerSheetTests(TestCase):
+    def test_round_trip(self):
+        answers = [
+            PackedAnswer(1, None, None, None, False),
+            PackedAnswer(2, 20, True, 0, True),
+            PackedAnswer(3, 30, False, MAX_TIME, False),
+            PackedAnswer(2 ** 32, 2 ** 63 - 1, None, 1, True),
+        ]
+        self.assertEqual(unpack(pack(answers)), answers)
+
+    def test_format_1_sheets_are_read(self):
+        record = struct.Struct('<IIHB')
+        sheet = b'\x01' + record.pack(7, 70, 12, 2) + record.pack(8, 0, 0xFFFF, 1)
+        self.assertEqual(unpack(sheet), [
+            PackedAnswer(7, 70, True, 12, False),
+            PackedAnswer(8, None, None, None, True),
+        ])
+
+    def test_out_of_range_times_are_clamped(self):
+        sheet = pack([
+            PackedAnswer(1, 10, True, MAX_TIME + 1, False),
+            PackedAnswer(2, 20, False, 10 ** 6, False),
+            PackedAnswer(3, None, None, -5, False),
+        ])
+        self.assertEqual([answer.time_taken_seconds for answer in unpack(sheet)], [MAX_TIME, MAX_TIME, 0])
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            unpack(b'\x09' + pack([PackedAnswer(1, 10, True, 5, False)])[1:])
+
+
+@override_settings(KEEP_QUESTION_ATTEMPT_ROWS=False)
+class PackedGradingTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper(question_count=3)
+
+    def test_grading_without_rows(self):
+        right, wrong, skipped = self.questions
+        QuestionAttempt.objects.create(
+            test_attempt=self.attempt, question=right, selected_option=right.option_list[0], time_taken_seconds=40,
+        )
+        QuestionAttempt.objects.create(
+            test_attempt=self.attempt, question=wrong, selected_option=wrong.option_list[2], is_marked_for_review=True,
+        )
+        QuestionAttempt.objects.create(test_attempt=self.attempt, question=skipped)
+
+        result = grade_attempt(self.attempt)
+
+        self.assertEqual((result.correct_answers, result.answered), (1, 2))
+        self.assertFalse(QuestionAttempt.objects.filter(test_attempt=self.attempt).exists())
+        attempt = MockTestAttempt.objects.get(pk=self.attempt.pk)
+        self.assertEqual(attempt.status, 'completed')
+        self.assertEqual(float(attempt.score), result.score)
+        self.assertEqual(attempt_answers(attempt), [
+            PackedAnswer(right.id, right.option_list[0].id, True, 40, False),
+            PackedAnswer(wrong.id, wrong.option_list[2].id, False, None, True),
+            PackedAnswer(skipped.id, None, None, None, False),
+        ])
+        self.assertEqual(
+            dict(QuestionStats.objects.values_list('question_id', 'correct_count')), {right.id: 1, wrong.id: 0},
+        )
+        self.assertEqual(list(ReviewItem.objects.values_list('question_id', flat=True)), [wrong.id])
+
+
+class AnswerVisibilityTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def options(self, questions):
+        return [option for question in questions for option in question['options']]
+
+    def test_mock_test_hides_answers_from_students(self):
+        body = self.client.get(f'/api/questions/mock-tests/{self.mock_test.id}/').json()
+        questions = [row['question'] for row in body['questions']]
+        self.assertTrue(all('is_correct' not in option for option in self.options(questions)))
+        self.assertTrue(all('explanation' not in question for question in questions))
+
+    def test_mock_test_shows_answers_to_staff(self):
+        staff = User.objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client.force_authenticate(staff)
+        body = self.client.get(f'/api/questions/mock-tests/{self.mock_test.id}/').json()
+        self.assertTrue(all('is_correct' in option for option in self.options(row['question'] for row in body['questions'])))
+
+    def test_attempt_reveals_answers_once_completed(self):
+        question = self.questions[0]
+        QuestionAttempt.objects.create(test_attempt=self.attempt, question=question, selected_option=question.option_list[1])
+        url = f'/api/questions/attempts/{self.attempt.id}/'
+
+        body = self.client.get(url).json()
+        self.assertNotIn('is_correct', body['question_attempts'][0]['selected_option'])
+        self.assertTrue(all('is_correct' not in option for option in self.options(
+            row['question'] for row in body['mock_test']['questions']
+        )))
+
+        grade_attempt(self.attempt)
+        body = self.client.get(url).json()
+        self.assertFalse(body['question_attempts'][0]['selected_option']['is_correct'])
+        self.assertTrue(all('is_correct' in option for option in self.options(
+            row['question'] for row in body['mock_test']['questions']
+        )))
+
+
+class RegradeTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper(question_count=3)
+        self.attempt.paper_version = get_current_paper(self.mock_test.id)[0]
+        self.attempt.save(update_fields=['paper_version'])
+        for question, option_index in zip(self.questions, [0, 1, 0]):
+            QuestionAttempt.objects.create(
+                test_attempt=self.attempt, question=question, selected_option=question.option_list[option_index],
+            )
+        grade_attempt(self.attempt)
+
+    def fix_key(self, question, option_index):
+        for index, option in enumerate(question.option_list):
+            option.is_correct = index == option_index
+            option.save()
+
+    def test_key_fix_rescores_against_the_pinned_paper(self):
+        removed = self.questions[2]
+        MockTestQuestion.objects.filter(mock_test=self.mock_test, question=removed).delete()
+        added = Question.objects.create(topic=removed.topic, question_text='Added later?')
+        MockTestQuestion.objects.create(mock_test=self.mock_test, question=added, order=4, marks=5)
+        self.fix_key(self.questions[1], 1)
+
+        summary = regrade_questions([self.questions[1].id])
+
+        self.assertEqual((summary.attempts_checked, summary.attempts_changed, summary.answers_changed), (1, 1, 1))
+        attempt = MockTestAttempt.objects.get(pk=self.attempt.pk)
+        self.assertEqual((float(attempt.score), attempt.total_marks), (100.0, 3))
+        self.assertEqual(
+            [(answer.question_id, answer.is_correct) for answer in attempt_answers(attempt)],
+            [(question.id, True) for question in self.questions],
+        )
+
+    def test_key_fix_updates_rollups_and_leaderboards(self):
+        self.assertEqual(UserDailyStats.objects.get(user=self.user).score_sum, 66.67)
+        self.fix_key(self.questions[1], 1)
+
+        regrade_questions([self.questions[1].id])
+
+        stats = UserDailyStats.objects.get(user=self.user)
+        self.assertEqual((stats.tests_taken, stats.score_sum, stats.best_score, stats.correct_count), (1, 100.0, 100.0, 3))
+        self.assertEqual(
+            dict(LeaderboardEntry.objects.filter(user=self.user).values_list('timeframe', 'average_score')),
+            {'all': 100.0, 'week': 100.0, 'month': 100.0},
+        )
+
+    def test_unrelated_paper_edit_does_not_rescore(self):
+        MockTestQuestion.objects.filter(mock_test=self.mock_test, question=self.questions[2]).update(marks=10)
+        summary = regrade_questions([self.questions[0].id])
+        self.assertEqual(summary.attempts_changed, 0)
+        self.assertEqual(float(MockTestAttempt.objects.get(pk=self.attempt.pk).score), 66.67)
+
+
+class GradingTests(PaperFixtureMixin, TestCase):
+    answer_key = {
+        1: AnswerKeyEntry(frozenset({10}), 2),
+        2: AnswerKeyEntry(frozenset({20}), 3),
+        3: AnswerKeyEntry(frozenset({30, 31}), 5),
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_scores_by_marks(self):
+        result, verdicts = grade_answers(self.answer_key, {1: 11, 2: 20, 3: 31})
+        self.assertEqual(verdicts, {1: False, 2: True, 3: True})
+        self.assertEqual((result.obtained_marks, result.total_marks, result.score), (8, 10, 80.0))
+        self.assertEqual((result.answered, result.correct_answers, result.accuracy), (3, 2, 66.67))
+
+    def test_unanswered_questions_score_nothing(self):
+        result, verdicts = grade_answers(self.answer_key, {1: 10, 2: None})
+        self.assertEqual(verdicts, {1: True, 2: None})
+        self.assertEqual((result.total_questions, result.answered, result.score, result.accuracy), (3, 1, 20.0, 100.0))
+
+    def test_answers_to_questions_off_the_paper_are_ignored(self):
+        result, verdicts = grade_answers(self.answer_key, {99: 990, 2: 20})
+        self.assertEqual(verdicts, {2: True})
+        self.assertEqual((result.answered, result.obtained_marks, result.total_marks), (1, 3, 10))
+
+    def grading_queries(self, question_count):
+        cache.clear()
+        self.create_paper(question_count)
+        for question in self.questions:
+            QuestionAttempt.objects.create(
+                test_attempt=self.attempt, question=question, selected_option=question.option_list[1],
+            )
+        with CaptureQueriesContext(connection) as context:
+            grade_attempt(self.attempt)
+        # Clear the fixture so the next paper can be created from scratch.
+        self.user.delete()
+        self.mock_test.delete()
+        self.questions[0].topic.subject.delete()
+        return len(context.captured_queries)
+
+    def test_constant_queries_however_long_the_paper(self):
+        self.assertEqual(self.grading_queries(2), self.grading_queries(12))
+
+    def test_option_edit_invalidates_the_answer_key(self):
+        self.create_paper()
+        question = self.questions[0]
+        self.assertEqual(get_answer_key(self.mock_test.id)[question.id].correct_option_ids, {question.option_list[0].id})
+
+        option = question.option_list[2]
+        option.is_correct = True
+        option.save()
+        self.assertEqual(
+            get_answer_key(self.mock_test.id)[question.id].correct_option_ids,
+            {question.option_list[0].id, option.id},
+        )
+
+
+class ReviewScheduleTests(PaperFixtureMixin, TestCase):
+    now = timezone.now()
+
+    def test_passing_grades_grow_the_interval(self):
+        item = ReviewItem()
+        steps = []
+        for quality in (5, 5, 4):
+            reviews.schedule(item, quality, now=self.now)
+            steps.append((item.repetitions, item.interval_days, round(item.ease_factor, 2)))
+        self.assertEqual(steps, [(1, 1, 2.6), (2, 6, 2.7), (3, 16, 2.7)])
+        self.assertEqual(item.due_at, self.now + timedelta(days=16))
+        self.assertEqual((item.last_reviewed_at, item.lapses), (self.now, 0))
+
+    def test_failing_grade_restarts_the_item(self):
+        item = ReviewItem(repetitions=3, interval_days=16, ease_factor=2.5)
+        reviews.schedule(item, 2, now=self.now)
+        self.assertEqual((item.repetitions, item.interval_days, item.lapses), (0, 1, 1))
+        self.assertAlmostEqual(item.ease_factor, 2.18)
+        self.assertEqual(item.due_at, self.now + timedelta(days=1))
+
+    def test_ease_factor_has_a_floor(self):
+        item = ReviewItem()
+        for _ in range(10):
+            reviews.schedule(item, 0, now=self.now)
+        self.assertEqual(item.ease_factor, reviews.MIN_EASE_FACTOR)
+
+    def test_due_items_are_oldest_first(self):
+        self.create_paper(question_count=4)
+        offsets = [-1, -3, 2, -2]  # days from now; the third is not due yet
+        for question, days in zip(self.questions, offsets):
+            ReviewItem.objects.create(
+                user=self.user, question=question, source='wrong_answer', due_at=self.now + timedelta(days=days),
+            )
+        due = reviews.due_items(self.user, now=self.now)
+        self.assertEqual([item.question_id for item in due], [self.questions[i].id for i in (1, 3, 0)])
+        self.assertEqual(len(reviews.due_items(self.user, limit=2, now=self.now)), 2)
+
+
+class KeysetPaginationTests(TestCase):
+    url = '/api/questions/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='student@example.com', password='pass'))
+        topic = Topic.objects.create(
+            subject=Subject.objects.create(name='Physics', description=''), name='Optics', description='',
+        )
+        Question.objects.bulk_create([Question(topic=topic, question_text=f'Question {i}?') for i in range(5)])
+
+    def test_cursor_pages_cover_every_row_once(self):
+        seen = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, 200, response.content)
+            body = response.json()
+            self.assertNotIn('count', body)
+            seen += [question['id'] for question in body['results']]
+            if body['next'] is None:
+                break
+            response = self.client.get(body['next'])
+        self.assertEqual(seen, list(Question.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_invalid_cursor_is_a_bad_request(self):
+        for cursor in ('not-base64!', 'bm9waXBl', 'eHx5'):
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn('cursor', response.json())
+
+    def test_ordering_with_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': '', 'ordering': 'difficulty'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.json())
+        self.assertEqual(self.client.get(self.url, {'ordering': 'difficulty'}).status_code, 200)
+
+
+class PaperCacheTests(PaperFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_paper()
+
+    def test_late_reader_cannot_restore_an_older_paper(self):
+        first_version = get_current_paper(self.mock_test.id)[0]
+        stale = PublishedPaper.objects.get(mock_test=self.mock_test, version=first_version)
+        # A reader that missed the cache computes its pointer key, then reads the current row...
+        pointer_key = _pointer_key(self.mock_test.id)
+
+        # ...while the paper is edited and republished.
+        question = self.questions[0]
+        question.question_text = 'Edited?'
+        question.save()
+        current_version = get_current_paper(self.mock_test.id)[0]
+        self.assertGreater(current_version, first_version)
+
+        _cache_paper(stale, pointer_key)
+        _cache_paper(stale, _pointer_key(self.mock_test.id))
+        self.assertEqual(get_current_paper(self.mock_test.id)[0], current_version)
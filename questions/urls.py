@@ -8,14 +8,21 @@ urlpatterns = [
     path('', views.QuestionListView.as_view(), name='question-list'),
     path('<int:pk>/', views.QuestionDetailView.as_view(), name='question-detail'),
 
-    # PDF upload for MCQ extraction (staff only)
+    # PDF and spreadsheet question imports (staff only)
     path('upload-pdf/', views.PDFUploadView.as_view(), name='upload-pdf'),
+    path('import/', views.SpreadsheetImportView.as_view(), name='import-spreadsheet'),
+    path('import-jobs/<int:pk>/', views.QuestionImportJobDetailView.as_view(), name='import-job-detail'),
     
     # Mock test related URLs
     path('mock-tests/', views.MockTestListView.as_view(), name='mock-test-list'),
     path('mock-tests/<int:pk>/', views.MockTestDetailView.as_view(), name='mock-test-detail'),
+    path('mock-tests/<int:pk>/paper/', views.MockTestPaperView.as_view(), name='mock-test-paper'),
     path('mock-tests/<int:pk>/start/', views.StartMockTestView.as_view(), name='start-mock-test'),
     path('mock-tests/<int:pk>/submit/', views.SubmitMockTestView.as_view(), name='submit-mock-test'),
+    path('attempts/', views.MockTestAttemptListView.as_view(), name='attempt-list'),
+    path('attempts/<int:pk>/', views.MockTestAttemptDetailView.as_view(), name='attempt-detail'),
+    path('attempts/<int:pk>/paper/', views.AttemptPaperView.as_view(), name='attempt-paper'),
+    path('attempts/<int:pk>/answers/', views.SaveAnswersView.as_view(), name='save-answers'),
     
     # Subject and topic URLs
     path('subjects/', views.SubjectListView.as_view(), name='subject-list'),
@@ -25,6 +32,11 @@ urlpatterns = [
     
     # Practice and bookmark URLs
     path('practice/<int:subject_id>/', views.PracticeView.as_view(), name='practice'),
+    path('practice-packs/', views.PracticePackListView.as_view(), name='practice-pack-list'),
+    path('practice-packs/<int:subject_id>/', views.PracticePackDownloadView.as_view(), name='practice-pack-download'),
+    path('practice-packs/<int:subject_id>/delta/', views.PracticePackDeltaView.as_view(), name='practice-pack-delta'),
     path('bookmark/<int:question_id>/', views.BookmarkQuestionView.as_view(), name='bookmark-question'),
     path('bookmarked/', views.BookmarkedQuestionsView.as_view(), name='bookmarked-questions'),
+    path('reviews/due/', views.DueReviewsView.as_view(), name='due-reviews'),
+    path('reviews/<int:pk>/', views.ReviewQuestionView.as_view(), name='review-question'),
 ]
@@ -2,8 +2,11 @@ from rest_framework import generics, permissions, status
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from django.shortcuts import render, redirect
+from django.http import HttpResponse
+from django.conf import settings
 from .forms import PDFUploadForm
-import pdfplumber
+from .models import QuestionImportJob
+from .tasks import import_questions_from_pdf, import_questions_from_spreadsheet
 @method_decorator(staff_member_required, name='dispatch')
 class PDFUploadView(generics.GenericAPIView):
     """Staff-only view for uploading a PDF and extracting MCQs."""
@@ -13,95 +16,76 @@ class PDFUploadView(generics.GenericAPIView):
 
     def post(self, request):
         form = PDFUploadForm(request.POST, request.FILES)
-        imported_count = 0
-        errors = []
-        if form.is_valid():
-            pdf_file = form.cleaned_data['pdf_file']
-            with pdfplumber.open(pdf_file) as pdf:
-                text = "\n".join(page.extract_text() or '' for page in pdf.pages)
-
-            # Simple MCQ parser: expects format as described
-            import re
-            question_blocks = re.split(r'\n\d+\. ', text)
-            for block in question_blocks:
-                if not block.strip():
-                    continue
-                # Extract question, options, and answer
-                lines = block.strip().split('\n')
-                if len(lines) < 3:
-                    continue
-                question_text = lines[0].strip()
-                options = []
-                answer = None
-                for line in lines[1:]:
-                    opt_match = re.match(r'([A-D])\)\s*(.+)', line)
-                    if opt_match:
-                        options.append((opt_match.group(1), opt_match.group(2).strip()))
-                    ans_match = re.match(r'Answer[:\s]+([A-D])', line, re.IGNORECASE)
-                    if ans_match:
-                        answer = ans_match.group(1)
-                if not question_text or len(options) < 2 or not answer:
-                    errors.append(f"Skipped: '{question_text[:40]}...' (missing options/answer)")
-                    continue
-                # Create Question and Options (assign to first Subject/Topic for demo)
-                from .models import Subject, Topic, Question, QuestionOption
-                subject = Subject.objects.first()
-                topic = Topic.objects.filter(subject=subject).first()
-                if not subject or not topic:
-                    errors.append("No Subject/Topic found. Please create at least one in admin.")
-                    break
-                q = Question.objects.create(
-                    topic=topic,
-                    question_text=question_text,
-                    question_type='mcq',
-                    difficulty='medium',
-                    marks=1,
-                    is_active=True,
-                    created_by=request.user if request.user.is_authenticated else None
-                )
-                for idx, (opt_key, opt_text) in enumerate(options):
-                    QuestionOption.objects.create(
-                        question=q,
-                        option_text=opt_text,
-                        is_correct=(opt_key.upper() == answer.upper()),
-                        order=idx+1
-                    )
-                imported_count += 1
-            return render(request, 'questions/pdf_upload.html', {
-                'form': form,
-                'imported_count': imported_count,
-                'errors': errors,
-                'extracted_text': text
-            })
-        return render(request, 'questions/pdf_upload.html', {'form': form})
+        if not form.is_valid():
+            return render(request, 'questions/pdf_upload.html', {'form': form})
+        
+        job = QuestionImportJob.objects.create(
+            source='pdf',
+            file=form.cleaned_data['pdf_file'],
+            topic=form.cleaned_data['topic'],
+            created_by=request.user if request.user.is_authenticated else None
+        )
+        
+        # Run the import in the background (conditionally async based on settings)
+        if getattr(settings, 'USE_CELERY_ASYNC', False):
+            import_questions_from_pdf.delay(job.id)
+        else:
+            # Run synchronously in development
+            import_questions_from_pdf(job.id)
+            job.refresh_from_db()
+        
+        return render(request, 'questions/pdf_upload.html', {
+            'form': PDFUploadForm(),
+            'job': job,
+            'imported_count': job.imported_count,
+            'errors': job.errors
+        })
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
+from django.db import transaction
+from hamro_engineering.pagination import KeysetOrPageNumberPagination
 
-from .models import Question, QuestionOption, Subject, Topic, MockTest, MockTestQuestion, MockTestAttempt, QuestionAttempt, BookmarkedQuestion
+from .models import Question, QuestionOption, Subject, Topic, MockTest, MockTestQuestion, MockTestAttempt, QuestionAttempt, BookmarkedQuestion, PracticePack, ReviewItem
 from .serializers import (
     QuestionSerializer, QuestionOptionSerializer, SubjectSerializer, TopicSerializer,
     MockTestSerializer, MockTestQuestionSerializer, MockTestAttemptSerializer,
-    QuestionAttemptSerializer, BookmarkedQuestionSerializer
+    QuestionAttemptSerializer, BookmarkedQuestionSerializer, AnswerSheetSerializer,
+    QuestionImportJobSerializer, SpreadsheetUploadSerializer, PracticePackSerializer,
+    ReviewItemSerializer, ReviewGradeSerializer
 )
+from . import querysets
+from .grading import grade_attempt
+from .answers import AnswerSheetError
+from .autosave import buffer_answers, closing_buffer, flush_attempt
+from .caching import LockTimeout
+from .expiry import deadline, expire_attempt, expire_overdue_attempts, is_overdue
+from .sampling import sample_questions
+from .search import QuestionSearchFilter
+from .papers import get_current_paper
+from . import practice_packs, reviews
+from .shuffling import attempt_payload, pinned_paper, resolve_option_indexes
+from .ingestion import spreadsheet_source
 
 
 class QuestionListView(generics.ListCreateAPIView):
-    queryset = Question.objects.all()
+    queryset = querysets.questions()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, QuestionSearchFilter, OrderingFilter]
     filterset_fields = ['topic__subject', 'topic', 'difficulty', 'question_type']
     search_fields = ['question_text', 'explanation']
     ordering_fields = ['created_at', 'difficulty']
+    pagination_class = KeysetOrPageNumberPagination
 
 
 class QuestionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Question.objects.all()
+    queryset = querysets.questions()
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -119,32 +103,105 @@ class SubjectDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 
 class TopicListView(generics.ListCreateAPIView):
-    queryset = Topic.objects.all()
+    queryset = querysets.topics()
     serializer_class = TopicSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
 class TopicDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Topic.objects.all()
+    queryset = querysets.topics()
     serializer_class = TopicSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
+def _answers_busy():
+    # The attempt's autosave buffer stayed locked by another save or flush.
+    return Response({
+        'message': 'Answers are being saved, please retry'
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 class MockTestListView(generics.ListCreateAPIView):
-    queryset = MockTest.objects.all()
+    queryset = querysets.mock_tests()
     serializer_class = MockTestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ['test_type', 'is_active']
-    search_fields = ['title', 'description']
+    search_fields = ['name', 'description']
 
 
 class MockTestDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = MockTest.objects.all()
+    queryset = querysets.mock_tests()
     serializer_class = MockTestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
+class MockTestAttemptListView(generics.ListAPIView):
+    serializer_class = MockTestAttemptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        expire_overdue_attempts(user=self.request.user)
+        return querysets.mock_test_attempts().filter(user=self.request.user)
+
+
+class MockTestAttemptDetailView(generics.RetrieveAPIView):
+    serializer_class = MockTestAttemptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return querysets.mock_test_attempts().filter(user=self.request.user)
+    
+    def retrieve(self, request, *args, **kwargs):
+        attempt = get_object_or_404(MockTestAttempt.objects.only('id'), pk=kwargs['pk'], user=request.user)
+        try:
+            # Include answers still waiting in the autosave buffer.
+            flush_attempt(attempt.id)
+        except LockTimeout:
+            return _answers_busy()
+        expire_overdue_attempts(user=request.user, id=attempt.id)
+        return super().retrieve(request, *args, **kwargs)
+
+
+class MockTestPaperView(generics.GenericAPIView):
+    """Serve the published, answer-free paper of a mock test with a strong ETag."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        get_object_or_404(MockTest.objects.only('id'), pk=pk, is_active=True)
+        version, content_hash, payload = get_current_paper(pk)
+        etag = f'"{content_hash}"'
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(payload, content_type='application/json')
+        response['ETag'] = etag
+        response['X-Paper-Version'] = str(version)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class AttemptPaperView(generics.GenericAPIView):
+    """Serve an attempt's paper, with questions and options in that attempt's order."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, pk):
+        attempt = get_object_or_404(MockTestAttempt.objects.select_related('mock_test'), pk=pk, user=request.user)
+        version, content_hash, payload = pinned_paper(attempt)
+        # The order depends only on the attempt and the paper version, so the ETag does too.
+        etag = f'"{content_hash}-{attempt.id}"'
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(attempt_payload(attempt, version, payload), content_type='application/json')
+        response['ETag'] = etag
+        response['X-Paper-Version'] = str(version)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
 class StartMockTestView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
@@ -158,17 +215,24 @@ class StartMockTestView(generics.GenericAPIView):
             status='in_progress'
         ).first()
         
-        if active_attempt:
+        if active_attempt and is_overdue(active_attempt):
+            try:
+                expire_attempt(active_attempt)
+            except LockTimeout:
+                return _answers_busy()
+        
+        if active_attempt and active_attempt.status == 'in_progress':
             return Response({
                 'message': 'You already have an active attempt for this test',
                 'attempt_id': active_attempt.id
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create new attempt
+        # Create new attempt, pinned to the paper version it will be served
         attempt = MockTestAttempt.objects.create(
             user=request.user,
             mock_test=mock_test,
-            started_at=timezone.now()
+            started_at=timezone.now(),
+            paper_version=get_current_paper(mock_test.id)[0]
         )
         
         return Response({
@@ -177,35 +241,77 @@ class StartMockTestView(generics.GenericAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class SubmitMockTestView(generics.GenericAPIView):
+class SaveAnswersView(generics.GenericAPIView):
+    """Autosave a full answer sheet, or a partial batch of it, in one request."""
+    serializer_class = AnswerSheetSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, pk):
-        attempt = get_object_or_404(MockTestAttempt, pk=pk, user=request.user)
+        attempt = get_object_or_404(MockTestAttempt.objects.select_related('mock_test'), pk=pk, user=request.user)
         
-        if attempt.status == 'completed':
+        if is_overdue(attempt):
+            try:
+                expire_attempt(attempt)
+            except LockTimeout:
+                return _answers_busy()
             return Response({
-                'message': 'This attempt is already completed'
+                'message': 'Time is up for this attempt',
+                'status': attempt.status
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Mark attempt as completed
-        attempt.status = 'completed'
-        attempt.completed_at = timezone.now()
-        attempt.save()
+        if attempt.status != 'in_progress':
+            return Response({
+                'message': 'Answers can only be saved for an attempt in progress'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate score
-        total_questions = attempt.mock_test.questions.count()
-        correct_answers = attempt.question_attempts.filter(is_correct=True).count()
-        score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        attempt.score = score
-        attempt.save()
+        try:
+            answers = resolve_option_indexes(attempt, serializer.validated_data['answers'])
+            saved = buffer_answers(attempt, answers)
+        except AnswerSheetError as e:
+            return Response({
+                'message': 'Invalid answers',
+                'errors': e.args[0]
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except LockTimeout:
+            return _answers_busy()
+        
+        return Response({
+            'message': 'Answers saved successfully',
+            'saved': saved
+        }, status=status.HTTP_200_OK)
+
+
+class SubmitMockTestView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, pk):
+        attempt = get_object_or_404(MockTestAttempt.objects.only('id'), pk=pk, user=request.user)
+        try:
+            # The buffer lock is taken before the row lock, in the same order as an inline flush.
+            with closing_buffer(attempt.id), transaction.atomic():
+                attempt = MockTestAttempt.objects.select_for_update(of=('self',)).select_related('mock_test').get(pk=attempt.pk)
+                
+                if attempt.status != 'in_progress':
+                    return Response({
+                        'message': f'This attempt is already {attempt.get_status_display().lower()}'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                
+                # A late submit is graded as of the deadline; answers saved after it were refused.
+                result = grade_attempt(attempt, completed_at=min(timezone.now(), deadline(attempt)))
+        except LockTimeout:
+            return _answers_busy()
         
         return Response({
             'message': 'Mock test submitted successfully',
-            'score': score,
-            'total_questions': total_questions,
-            'correct_answers': correct_answers
+            'score': result.score,
+            'total_questions': result.total_questions,
+            'correct_answers': result.correct_answers,
+            'obtained_marks': result.obtained_marks,
+            'total_marks': result.total_marks,
+            'accuracy': result.accuracy
         }, status=status.HTTP_200_OK)
 
 
@@ -214,8 +320,62 @@ class PracticeView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        subject_id = self.kwargs['subject_id']
-        return Question.objects.filter(subject_id=subject_id).order_by('?')[:10]
+        params = self.request.query_params
+        try:
+            count = min(max(int(params.get('count', 10)), 1), 20)
+            topic_id = int(params['topic']) if params.get('topic') else None
+        except ValueError:
+            raise ValidationError({'detail': 'count and topic must be integers'})
+        
+        return sample_questions(
+            self.kwargs['subject_id'],
+            k=count,
+            topic_id=topic_id,
+            difficulty=params.get('difficulty') or None,
+            user=None if params.get('exclude_seen') in ('0', 'false') else self.request.user
+        )
+
+
+class PracticePackListView(generics.ListAPIView):
+    """Current offline practice pack of each subject."""
+    serializer_class = PracticePackSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    
+    def get_queryset(self):
+        return PracticePack.objects.filter(is_current=True, subject__is_active=True).defer('payload').select_related('subject')
+
+
+class PracticePackDownloadView(generics.GenericAPIView):
+    """Download a subject's current practice pack as gzipped JSON."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, subject_id):
+        pack = get_object_or_404(PracticePack, subject_id=subject_id, subject__is_active=True, is_current=True)
+        etag = f'"{pack.content_hash}"'
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(bytes(pack.payload), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['X-Pack-Version'] = str(pack.version)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class PracticePackDeltaView(generics.GenericAPIView):
+    """Questions of a subject changed since the client's pack or last sync (``?since=<watermark>``)."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, subject_id):
+        subject = get_object_or_404(Subject, pk=subject_id, is_active=True)
+        try:
+            since = practice_packs.parse_watermark(request.query_params.get('since'))
+        except ValueError as e:
+            raise ValidationError({'since': str(e)})
+        return Response(practice_packs.delta(subject, since))
 
 
 class BookmarkQuestionView(generics.GenericAPIView):
@@ -233,10 +393,12 @@ class BookmarkQuestionView(generics.GenericAPIView):
         
         if not created:
             bookmark.delete()
+            reviews.remove_bookmark(user.id, question.id)
             return Response({
                 'message': 'Question removed from bookmarks'
             }, status=status.HTTP_200_OK)
         
+        reviews.add_bookmark(user.id, question.id)
         return Response({
             'message': 'Question added to bookmarks'
         }, status=status.HTTP_201_CREATED)
@@ -247,4 +409,68 @@ class BookmarkedQuestionsView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return BookmarkedQuestion.objects.filter(user=self.request.user)
+        return querysets.bookmarks().filter(user=self.request.user)
+
+
+class DueReviewsView(generics.ListAPIView):
+    """Questions due for spaced-repetition review now, most overdue first (``?limit=``, at most 100)."""
+    serializer_class = ReviewItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    
+    def get_queryset(self):
+        try:
+            limit = min(max(int(self.request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({'detail': 'limit must be an integer'})
+        return reviews.due_items(self.request.user, limit)
+
+
+class ReviewQuestionView(generics.GenericAPIView):
+    """Record how well a review item was recalled and schedule its next review."""
+    serializer_class = ReviewGradeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, pk):
+        item = get_object_or_404(ReviewItem, pk=pk, user=request.user)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reviews.review(item, serializer.validated_data['quality'])
+        return Response({
+            'id': item.id,
+            'interval_days': item.interval_days,
+            'due_at': item.due_at
+        }, status=status.HTTP_200_OK)
+
+
+class SpreadsheetImportView(generics.GenericAPIView):
+    """Staff-only bulk import of questions from an XLSX or CSV file, one question per row."""
+    serializer_class = SpreadsheetUploadSerializer
+    permission_classes = [permissions.IsAdminUser]
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        
+        job = QuestionImportJob.objects.create(
+            source=spreadsheet_source(upload.name),
+            file=upload,
+            topic=serializer.validated_data.get('topic'),
+            created_by=request.user
+        )
+        
+        if getattr(settings, 'USE_CELERY_ASYNC', False):
+            import_questions_from_spreadsheet.delay(job.id)
+        else:
+            import_questions_from_spreadsheet(job.id)
+            job.refresh_from_db()
+        
+        return Response(QuestionImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class QuestionImportJobDetailView(generics.RetrieveAPIView):
+    """Progress and per-block errors of a background question import."""
+    queryset = QuestionImportJob.objects.all()
+    serializer_class = QuestionImportJobSerializer
+    permission_classes = [permissions.IsAdminUser]
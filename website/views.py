@@ -83,6 +83,7 @@ from notifications.models import Announcement
 from questions.models import MockTest, Subject
 from colleges.models import College
 from payments.models import SubscriptionPlan, UserSubscription
+from analytics.rollups import current_streak, user_totals
 
 # Payment unlock view
 @login_required
@@ -160,6 +161,8 @@ def dashboard(request):
         'active_subscription': active_subscription,
         'available_tests': available_tests,
         'recent_activity': recent_activity,
+        'progress': user_totals(user),
+        'streak': current_streak(user),
     }
     return render(request, 'website/dashboard.html', context)
 